@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.clients.http import JsonHTTPClient
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ClobPublicClient(JsonHTTPClient):
+    # CLOB 公開 REST 端點 (不需認證)，共用 aiohttp 連線池
+    name = "CLOB"
+    base_url_setting = "CLOB_URL"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: int = settings.CLOB_MAX_CONCURRENCY,
+        max_retries: int = settings.CLOB_MAX_RETRIES,
+        chunk_size: int = 50,
+        timeout: float = 5,
+    ):
+        super().__init__(base_url, max_concurrency, max_retries, timeout)
+        self.chunk_size = chunk_size
+
+    async def get_books(self, token_ids: List[str]) -> List[Dict]:
+        # POST /books 一次查多個 token，超過 chunk_size 時分批並行
+        chunks = [token_ids[i:i + self.chunk_size] for i in range(0, len(token_ids), self.chunk_size)]
+
+        results = await asyncio.gather(
+            *(self._request_json("POST", "/books", [{"token_id": token_id} for token_id in chunk]) for chunk in chunks),
+            return_exceptions=True,
+        )
+
+        books = []
+
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ 取得 order book 失敗 ({len(chunk)} tokens): {result}")
+                continue
+
+            books.extend(result or [])
+
+        return books
+
+    async def get_tick_size(self, token_id: str) -> Optional[str]:
+        data = await self._request_json("GET", f"/tick-size?token_id={token_id}")
+
+        return f"{float(data['minimum_tick_size']):g}" if data else None
+
+    async def get_neg_risk(self, token_id: str) -> bool:
+        data = await self._request_json("GET", f"/neg-risk?token_id={token_id}")
+
+        return bool(data and data.get("neg_risk"))
+
+    async def get_fee_rate_bps(self, token_id: str) -> int:
+        data = await self._request_json("GET", f"/fee-rate?token_id={token_id}")
+
+        return int((data or {}).get("base_fee") or 0)
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MARKET_KEY = '"market"'
+
+
+def routing_key(raw_msg: str) -> str:
+    # 同一個 market (condition id) 的 Up/Down 事件必須落在同一個 consumer 以保持順序
+    pos = raw_msg.find(_MARKET_KEY)
+
+    if pos == -1:
+        return ""
+
+    start = raw_msg.find('"', pos + len(_MARKET_KEY)) + 1
+    end = raw_msg.find('"', start)
+
+    if start == 0 or end == -1:
+        return ""
+
+    return raw_msg[start:end]
+
+
+def split_by_market(raw_msg: str) -> List[Tuple[str, str]]:
+    # 訂閱後的 book 批次與 REST 補齊都是多個 market 的 list frame，
+    # 依 market 拆成多個 frame，各自落在對應的 consumer，否則會與該 market 的增量亂序
+    if raw_msg[:1] != "[" or raw_msg.count(_MARKET_KEY) < 2:
+        return [(routing_key(raw_msg), raw_msg)]
+
+    try:
+        events = json.loads(raw_msg)
+
+    except ValueError:
+        return [(routing_key(raw_msg), raw_msg)]
+
+    groups: Dict[str, List[dict]] = {}
+
+    for event in events:
+        market = event.get("market") if isinstance(event, dict) else None
+        groups.setdefault(market or "", []).append(event)
+
+    if len(groups) == 1:
+        return [(next(iter(groups)), raw_msg)]
+
+    return [(market, json.dumps(group)) for market, group in groups.items()]
+
+
+class FrameDispatcher:
+    def __init__(
+        self,
+        callback: Callable[[str, int], Awaitable[None]],
+        workers: int = settings.WS_DISPATCH_WORKERS,
+        queue_size: int = settings.WS_DISPATCH_QUEUE_SIZE,
+        max_batch: int = settings.WS_DISPATCH_MAX_BATCH,
+    ):
+        self.callback = callback
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+
+        self.queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(self.workers)
+        ]
+        self.tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.processed = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.errors = 0
+
+        self.backpressure_events = 0
+        self.backpressure_wait_ns = 0
+        self._last_backpressure_log = 0.0
+
+    def start(self):
+        if self.tasks:
+            return
+
+        self.tasks = [
+            asyncio.create_task(self._worker(queue)) for queue in self.queues
+        ]
+
+    async def stop(self, drain: bool = True):
+        if drain:
+            for queue in self.queues:
+                await queue.join()
+
+        for task in self.tasks:
+            task.cancel()
+
+        for task in self.tasks:
+            try:
+                await task
+
+            except asyncio.CancelledError:
+                pass
+
+        self.tasks = []
+
+    async def submit(self, frame: str, recv_ns: int):
+        if self.workers == 1:
+            await self._put(self.queues[0], frame, recv_ns)
+            return
+
+        for key, part in split_by_market(frame):
+            await self._put(self.queues[hash(key) % self.workers], part, recv_ns)
+
+    async def _put(self, queue: asyncio.Queue, frame: str, recv_ns: int):
+        self.submitted += 1
+
+        if not queue.full():
+            queue.put_nowait((frame, recv_ns))
+            return
+
+        # queue 已滿: 暫停讀取 socket，讓壓力回推到 TCP 層而不是無限堆積
+        self.backpressure_events += 1
+        wait_start = time.perf_counter_ns()
+
+        await queue.put((frame, recv_ns))
+
+        self.backpressure_wait_ns += time.perf_counter_ns() - wait_start
+        self._report_backpressure()
+
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "batches": self.batches,
+            "max_batch": self.max_batch_seen,
+            "errors": self.errors,
+            "depth": self.depth(),
+            "backpressure_events": self.backpressure_events,
+            "backpressure_wait_ms": self.backpressure_wait_ns // 1_000_000,
+        }
+
+    def _report_backpressure(self):
+        now = time.monotonic()
+
+        if now - self._last_backpressure_log < 5:
+            return
+
+        self._last_backpressure_log = now
+
+        logger.warning(
+            f"⚠️ [WS] Dispatch 壅塞 {self.backpressure_events} 次，"
+            f"累計等待 {self.backpressure_wait_ns / 1e6:.0f} ms (目前深度 {self.depth()})"
+        )
+
+    async def _worker(self, queue: asyncio.Queue):
+        batch: List[Tuple[str, int]] = []
+
+        while True:
+            batch.append(await queue.get())
+
+            # 順便帶走已經在 buffer 裡的 frame，減少排程切換
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            size = len(batch)
+            self.batches += 1
+
+            if size > self.max_batch_seen:
+                self.max_batch_seen = size
+
+            for frame, recv_ns in batch:
+                try:
+                    await self.callback(frame, recv_ns)
+
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"❌ [WS] 訊息處理失敗: {e}", exc_info=True)
+
+            self.processed += size
+            batch.clear()
+
+            for _ in range(size):
+                queue.task_done()
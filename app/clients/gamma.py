@@ -0,0 +1,65 @@
+import json
+import logging
+from typing import Dict, Optional
+
+from app.clients.http import JsonHTTPClient
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def market_slug(asset: str, start_timestamp: int) -> str:
+    return f"{asset.lower()}-updown-15m-{start_timestamp}"
+
+
+def parse_market(data: Optional[Dict], slug: str) -> Optional[Dict]:
+    if not data:
+        logger.warning(f"⚠️ 找不到市場 (Data Empty): {slug}")
+        return None
+
+    outcomes_str = data.get("outcomes", "[]")
+    token_ids_str = data.get("clobTokenIds", "[]")
+
+    outcomes = json.loads(outcomes_str)
+    token_ids = json.loads(token_ids_str)
+
+    if len(outcomes) != 2 or len(token_ids) != 2:
+        logger.warning(f"⚠️ Outcomes 與 Token IDs 數量不符: {slug}")
+        return None
+
+    result = {}
+
+    for token_id, outcome in zip(token_ids, outcomes):
+        result[outcome.lower()] = token_id
+
+    title = data.get("question")
+    result["title"] = title
+
+    logger.info(f"✅ 成功鎖定: {title}")
+
+    return result
+
+
+class GammaClient(JsonHTTPClient):
+    name = "Gamma"
+    base_url_setting = "GAMMA_URL"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: int = settings.GAMMA_MAX_CONCURRENCY,
+        max_retries: int = settings.GAMMA_MAX_RETRIES,
+        timeout: float = 5,
+    ):
+        super().__init__(base_url, max_concurrency, max_retries, timeout)
+
+    async def get_market(self, asset: str, start_timestamp: int) -> Optional[Dict]:
+        slug = market_slug(asset, start_timestamp)
+
+        try:
+            data = await self._request_json("GET", f"/markets/slug/{slug}")
+            return parse_market(data, slug)
+
+        except Exception as e:
+            logger.error(f"❌ 取得市場失敗({slug}): {e}")
+            return None
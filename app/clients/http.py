@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import aiohttp
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RetryableHTTPError(Exception):
+    pass
+
+
+class JsonHTTPClient:
+    # Gamma / CLOB 公開 REST 共用: 持久連線池、併發上限、429 / 5xx 與連線錯誤的 full jitter 重試
+    # 子類別設定 name (log 用) 與 base_url_setting (未指定 base_url 時使用的 settings 欄位)
+    name = "HTTP"
+    base_url_setting: str
+
+    def __init__(self, base_url: Optional[str], max_concurrency: int, max_retries: int, timeout: float):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            # 持久連線池: 視窗切換時不必重新 TCP/TLS 握手
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=120,
+                ttl_dns_cache=300,
+            )
+
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+        return self.session
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+        self.session = None
+
+    async def _request_json(self, method: str, path: str, payload=None):
+        # base_url 於呼叫時才讀取，方便測試時改指向本機 stand-in
+        url = f"{self.base_url or getattr(settings, self.base_url_setting)}{path}"
+        session = await self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    async with session.request(method, url, json=payload) as response:
+                        if response.status == 404:
+                            return None
+
+                        if response.status == 429 or response.status >= 500:
+                            raise RetryableHTTPError(f"HTTP {response.status}")
+
+                        response.raise_for_status()
+
+                        return await response.json(content_type=None)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError, RetryableHTTPError) as e:
+                if attempt >= self.max_retries:
+                    raise
+
+                # full jitter 指數退避，避免多個資產同時重試撞在一起
+                delay = random.uniform(0, min(5.0, 0.2 * 2 ** attempt))
+
+                logger.warning(f"⚠️ {self.name} 請求失敗 ({e})，{delay:.2f}s 後重試 ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+        return None
@@ -0,0 +1,269 @@
+import json
+import logging
+from operator import itemgetter
+from typing import Container, Dict, List, Optional, Union
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+
+except ImportError:
+    _json_loads = json.loads
+    JSON_BACKEND = "json"
+
+logger = logging.getLogger(__name__)
+
+_ASSET_KEY = '"asset_id"'
+
+
+# 價格 -> 數量；book 快照的數量保留原始字串，由 OrderBook 讀取時才轉成 float
+Levels = Dict[float, Union[float, str]]
+
+
+class BookEvent:
+    __slots__ = ("asset_id", "market", "timestamp", "bids", "asks")
+
+    event_type = "book"
+
+    def __init__(self, asset_id: str, market: str, timestamp: Optional[int], bids: Levels, asks: Levels):
+        self.asset_id = asset_id
+        self.market = market
+        self.timestamp = timestamp
+        self.bids = bids
+        self.asks = asks
+
+
+class PriceChange:
+    __slots__ = ("asset_id", "side", "price", "size")
+
+    def __init__(self, asset_id: str, side: str, price: float, size: float):
+        self.asset_id = asset_id
+        self.side = side
+        self.price = price
+        self.size = size
+
+
+class PriceChangeEvent:
+    __slots__ = ("market", "timestamp", "changes")
+
+    event_type = "price_change"
+
+    def __init__(self, market: str, timestamp: Optional[int], changes: List[PriceChange]):
+        self.market = market
+        self.timestamp = timestamp
+        self.changes = changes
+
+
+class TickSizeChangeEvent:
+    __slots__ = ("asset_id", "market", "timestamp", "old_tick_size", "new_tick_size")
+
+    event_type = "tick_size_change"
+
+    def __init__(self, asset_id: str, market: str, timestamp: Optional[int], old_tick_size: float, new_tick_size: float):
+        self.asset_id = asset_id
+        self.market = market
+        self.timestamp = timestamp
+        self.old_tick_size = old_tick_size
+        self.new_tick_size = new_tick_size
+
+
+MarketEvent = Union[BookEvent, PriceChangeEvent, TickSizeChangeEvent]
+
+
+_PRICE_CACHE_MAX = 16384
+
+
+class _PriceCache(dict):
+    # 價格只落在 0~1 的 tick 上，字串 -> float 的結果可以安全快取
+    # 同一價格可能有不同寫法 ("0.5" / "0.50")，超過 _PRICE_CACHE_MAX 筆就整個清空重建
+    def __missing__(self, key: str) -> float:
+        if len(self) >= _PRICE_CACHE_MAX:
+            self.clear()
+
+        value = self[key] = float(key)
+        return value
+
+
+_price_cache = _PriceCache()
+_parse_price = _price_cache.__getitem__
+
+_get_price = itemgetter("price")
+_get_size = itemgetter("size")
+
+
+def _parse_ts(value) -> Optional[int]:
+    # timestamp 為 epoch ms 字串，解碼時轉成整數，之後一路沿用到寫入端
+    return int(value) if value else None
+
+
+def _parse_levels(raw_levels: List[dict]) -> Levels:
+    # map/zip 讓逐筆轉換留在 C 層，比 list comprehension 快上不少
+    # 數量不轉 float: 快照中大部分價位在下一個快照前都不會被讀到，float() 佔了解析時間的一半以上
+    return dict(zip(map(_parse_price, map(_get_price, raw_levels)), map(_get_size, raw_levels)))
+
+
+class MarketMessageDecoder:
+    def __init__(self, subscribed: Optional[Container[str]] = None):
+        # 只解碼已訂閱 token 的事件；None 代表全部解碼
+        self.subscribed = subscribed
+
+        self.decoded = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def decode(self, raw_msg: Union[str, bytes]) -> List[MarketEvent]:
+        if isinstance(raw_msg, (bytes, bytearray)):
+            raw_msg = raw_msg.decode()
+
+        first = raw_msg[:1]
+
+        # PONG 等非 JSON 控制訊息
+        if first != "{" and first != "[":
+            self.skipped += 1
+            return []
+
+        if self.subscribed is not None and not self._has_subscribed_asset(raw_msg):
+            self.skipped += 1
+            return []
+
+        data = None
+        decoded = self.decoded
+
+        try:
+            data = _json_loads(raw_msg)
+
+            if isinstance(data, list):
+                events = []
+
+                for item in data:
+                    event = self._decode_event(item)
+
+                    if event is not None:
+                        events.append(event)
+
+                return events
+
+            event = self._decode_event(data)
+
+            return [event] if event is not None else []
+
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ 訊息解碼失敗 ({type(e).__name__}: {e}): {raw_msg[:200]}")
+
+            if not isinstance(data, list):
+                return []
+
+            # 失敗時才逐一重試，list frame 中單一事件格式錯誤不影響其他事件
+            self.decoded = decoded
+
+            return self._decode_each(data)
+
+    def _decode_each(self, items: List[dict]) -> List[MarketEvent]:
+        events = []
+
+        for item in items:
+            try:
+                event = self._decode_event(item)
+
+            except Exception:
+                continue
+
+            if event is not None:
+                events.append(event)
+
+        return events
+
+    def _has_subscribed_asset(self, raw_msg: str) -> bool:
+        # 不做 JSON 解析，直接掃描字串中的 asset_id 欄位
+        subscribed = self.subscribed
+        key_len = len(_ASSET_KEY)
+
+        pos = raw_msg.find(_ASSET_KEY)
+
+        while pos != -1:
+            start = raw_msg.find('"', pos + key_len) + 1
+            end = raw_msg.find('"', start)
+
+            if start == 0 or end == -1:
+                return False
+
+            if raw_msg[start:end] in subscribed:
+                return True
+
+            pos = raw_msg.find(_ASSET_KEY, end)
+
+        return False
+
+    def _decode_event(self, data: dict) -> Optional[MarketEvent]:
+        event_type = data.get("event_type")
+        subscribed = self.subscribed
+
+        if event_type == "book":
+            asset_id = data["asset_id"]
+
+            if subscribed is not None and asset_id not in subscribed:
+                return None
+
+            self.decoded += 1
+
+            return BookEvent(
+                asset_id,
+                data.get("market"),
+                _parse_ts(data.get("timestamp")),
+                _parse_levels(data.get("bids") or ()),
+                _parse_levels(data.get("asks") or ()),
+            )
+
+        if event_type == "price_change":
+            changes = []
+            raw_changes = data.get("price_changes")
+
+            if raw_changes is not None:
+                # 新版格式: 每筆 change 自帶 asset_id
+                for change in raw_changes:
+                    asset_id = change["asset_id"]
+
+                    if subscribed is not None and asset_id not in subscribed:
+                        continue
+
+                    changes.append(PriceChange(
+                        asset_id, change["side"], _parse_price(change["price"]), float(change["size"])))
+
+            else:
+                # 舊版格式: 整個事件屬於同一個 asset_id
+                asset_id = data["asset_id"]
+
+                if subscribed is not None and asset_id not in subscribed:
+                    return None
+
+                for change in data.get("changes") or ():
+                    changes.append(PriceChange(
+                        asset_id, change["side"], _parse_price(change["price"]), float(change["size"])))
+
+            if not changes:
+                return None
+
+            self.decoded += 1
+
+            return PriceChangeEvent(data.get("market"), _parse_ts(data.get("timestamp")), changes)
+
+        if event_type == "tick_size_change":
+            asset_id = data["asset_id"]
+
+            if subscribed is not None and asset_id not in subscribed:
+                return None
+
+            self.decoded += 1
+
+            return TickSizeChangeEvent(
+                asset_id,
+                data.get("market"),
+                _parse_ts(data.get("timestamp")),
+                float(data["old_tick_size"]),
+                float(data["new_tick_size"]),
+            )
+
+        return None
@@ -1,80 +1,101 @@
-import requests
 import json
 import logging
+import os
+from pathlib import Path
+from typing import Optional
+
 from app.config import settings
-from py_clob_client.client import ClobClient
 
 logger = logging.getLogger(__name__)
 
 
 class PolymarketClient:
-    def __init__(self):
-        self.gamma_url = settings.GAMMA_URL
-
-        HOST = settings.CLOB_URL
-        PRIVATE_KEY = settings.PRIVATE_KEY
-        CHAIN_ID = settings.CHAIN_ID
-        FUNDER = settings.FUNDER
-
-        self.client = ClobClient(
-            HOST,
-            key=PRIVATE_KEY,
-            chain_id=CHAIN_ID,
-            signature_type=1,
-            funder=FUNDER
-        )
+    # 公開市場資料由 GammaClient 以 async 取得；ClobClient 與 API creds 在第一次使用 .client 時才建立
+    # py_clob_client 匯入成本高，且 derive creds 需要一次網路往返，因此延後並將 creds 快取到 CLOB_CREDS_PATH
+    def __init__(self, creds_path: Optional[str] = settings.CLOB_CREDS_PATH):
+        self.creds_path = Path(creds_path) if creds_path else None
 
-        creds = self.client.create_or_derive_api_creds()
-        self.client.set_api_creds(creds)
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._build_clob_client()
+
+        return self._client
 
     # ==========================================
-    # 1. Public Data
+    # 1. Private Data
     # ==========================================
-    def get_market(self, asset: str, start_timestamp: int):
+    def _build_clob_client(self):
+        from py_clob_client.client import ClobClient
 
-        slug = f"{asset.lower()}-updown-15m-{start_timestamp}"
-        url = f"{self.gamma_url}/markets/slug/{slug}"
+        if not settings.PRIVATE_KEY:
+            raise RuntimeError("未設定 PRIVATE_KEY，無法使用需要認證的 CLOB 功能")
 
-        try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-
-            data = response.json()
+        client = ClobClient(
+            settings.CLOB_URL,
+            key=settings.PRIVATE_KEY,
+            chain_id=settings.CHAIN_ID,
+            signature_type=1,
+            funder=settings.FUNDER
+        )
 
-            if not data:
-                logger.warning(f"⚠️ 找不到市場 (Data Empty): {slug}")
-                return None
+        creds = self._load_creds(client.get_address())
 
-            outcomes_str = data.get("outcomes", "[]")
-            token_ids_str = data.get("clobTokenIds", "[]")
+        if creds is None:
+            creds = client.create_or_derive_api_creds()
+            self._save_creds(client.get_address(), creds)
 
-            outcomes = json.loads(outcomes_str)
-            token_ids = json.loads(token_ids_str)
+            logger.info("🔑 已取得 CLOB API creds")
 
-            if len(outcomes) != 2 or len(token_ids) != 2:
-                logger.warning(f"⚠️ Outcomes 與 Token IDs 數量不符: {slug}")
-                return None
+        client.set_api_creds(creds)
 
-            result = {}
+        return client
 
-            for token_id, outcome in zip(token_ids, outcomes):
-                result[outcome.lower()] = token_id
+    def _load_creds(self, address: str):
+        from py_clob_client.clob_types import ApiCreds
 
-            title = data.get("question")
-            result["title"] = title
+        if self.creds_path is None or not self.creds_path.exists():
+            return None
 
-            logger.info(f"✅ 成功鎖定: {title}")
+        try:
+            data = json.loads(self.creds_path.read_text())
 
-            return result
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 讀取 creds 快取失敗，重新取得: {e}")
+            return None
 
-        except Exception as e:
-            logger.error(f"❌ 取得市場失敗({slug}): {e}")
+        # 換了錢包或 CLOB 端點就不能沿用
+        if data.get("address") != address or data.get("host") != settings.CLOB_URL:
             return None
 
-        # ==========================================
-        # 2. Private Data
-        # ==========================================
+        return ApiCreds(data["api_key"], data["api_secret"], data["api_passphrase"])
+
+    def _save_creds(self, address: str, creds):
+        if self.creds_path is None:
+            return
+
+        payload = {
+            "address": address,
+            "host": settings.CLOB_URL,
+            "api_key": creds.api_key,
+            "api_secret": creds.api_secret,
+            "api_passphrase": creds.api_passphrase,
+        }
+
+        try:
+            self.creds_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # 只有擁有者可讀寫
+            fd = os.open(self.creds_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+            with os.fdopen(fd, "w") as f:
+                json.dump(payload, f)
+
+        except OSError as e:
+            logger.warning(f"⚠️ 寫入 creds 快取失敗: {e}")
 
-        # ==========================================
-        # 3. Trading Actions
-        # ==========================================
+    # ==========================================
+    # 2. Trading Actions
+    # ==========================================
@@ -2,51 +2,97 @@ import asyncio
 import websockets
 import json
 import logging
+import random
+import time
 from app.config import settings
-from typing import List, Callable, Awaitable
+from app.clients.dispatch import FrameDispatcher
+from app.core.metrics import WS_RECONNECTS
+from app.replay.recorder import FeedRecorder
+from typing import Dict, List, Callable, Awaitable, Optional
 
 logger = logging.getLogger(__name__)
 
 
 class PolymarketWSClient:
-    def __init__(self):
+    def __init__(
+        self,
+        dispatch_mode: str = settings.WS_DISPATCH_MODE,
+        recorder: Optional[FeedRecorder] = None,
+        dispatcher: Optional[FrameDispatcher] = None,
+        name: str = "WS",
+    ):
         self.ws_url = settings.WS_URL
         self.ws = None
+        self.name = name
 
         self.callback = None
         self.keep_running = False
 
+        self.dispatch_mode = dispatch_mode
+
+        # 由連線池共用的 dispatcher 由連線池負責啟動與停止
+        self.dispatcher: Optional[FrameDispatcher] = dispatcher
+        self.owns_dispatcher = dispatcher is None
+
+        self.recorder = recorder
+
         self.current_subscriptions = set()
         self.lock = asyncio.Lock()
 
-    async def start(self, callback: Callable[[str], Awaitable[None]]):
+        # 斷線處理 (由 Collector 設定):
+        # - on_disconnect(name, tokens): 連線中斷當下，讓上層把這些 token 的狀態標記為失效
+        # - book_source(tokens): 重新訂閱後以 REST 取得 book 快照，當作 book frame 送入 pipeline
+        # - on_reconnect(name, tokens, down_since, resumed_at): 狀態恢復後回報缺口區間
+        self.on_disconnect: Optional[Callable[[str, List[str]], None]] = None
+        self.book_source: Optional[Callable[[List[str]], Awaitable[List[Dict]]]] = None
+        self.on_reconnect: Optional[Callable[[str, List[str], float, float], Awaitable[None]]] = None
+
+        self.reconnect_base = settings.WS_RECONNECT_BASE_SEC
+        self.reconnect_max = settings.WS_RECONNECT_MAX_SEC
+        self.reconnect_attempts = 0
+        self.down_since: Optional[float] = None
+        self.recovery_task: Optional[asyncio.Task] = None
+
+    async def start(self, callback: Callable[[str, int], Awaitable[None]]):
         url = f"{self.ws_url}/ws/market"
 
         self.callback = callback
         self.keep_running = True
 
+        if self.owns_dispatcher and self.dispatch_mode == "pipeline":
+            self.dispatcher = FrameDispatcher(callback)
+            self.dispatcher.start()
+
         while self.keep_running:
             try:
-                logger.info(f"🔌 [WS] 正在連接: {url}")
+                logger.info(f"🔌 [{self.name}] 正在連接: {url}")
 
                 async with websockets.connect(url, ping_interval=20) as ws:
                     self.ws = ws
-                    logger.info(f"✅ [WS] 連線成功")
+                    logger.info(f"✅ [{self.name}] 連線成功")
 
                     keep_alive_task = asyncio.create_task(
                         self._keep_alive_loop())
 
                     if self.current_subscriptions:
                         logger.info(
-                            f"🔄 [WS] 偵測到重連，自動補訂閱 {len(self.current_subscriptions)} 筆")
+                            f"🔄 [{self.name}] 偵測到重連，自動補訂閱 {len(self.current_subscriptions)} 筆")
 
                         subscriptions_list = list(self.current_subscriptions)
                         await self.subscribe(subscriptions_list)
 
+                        if self.down_since is not None:
+                            # 與讀取訊息並行: REST 快照與 WS 訊息走同一條 dispatch 路徑
+                            self.recovery_task = asyncio.create_task(
+                                self._recover(subscriptions_list, self.down_since))
+
                     try:
                         async for message in ws:
-                            if self.callback:
-                                asyncio.create_task(self.callback(message))
+                            # 收到資料才算連線恢復，連上後立刻被切斷的情況會繼續退避
+                            if self.reconnect_attempts:
+                                self.reconnect_attempts = 0
+
+                            await self._deliver(message, time.perf_counter_ns())
 
                     finally:
                         if keep_alive_task:
@@ -60,17 +106,95 @@ class PolymarketWSClient:
 
                         self.ws = None
 
-            except (websockets.exceptions.ConnectionClosed, asyncio.TimeoutError):
-                logger.warning("⚠️ [WS] 連線中斷，5秒後準備重新連線...")
+                        # 補齊尚未完成就再次斷線時，缺口延續到下一次成功補齊
+                        if self.recovery_task:
+                            self.recovery_task.cancel()
+                            self.recovery_task = None
+
+            except (websockets.exceptions.ConnectionClosed, asyncio.TimeoutError, OSError) as e:
                 self.ws = None
 
+                # 主動停止時的斷線是預期行為
+                if self.keep_running:
+                    logger.warning(f"⚠️ [{self.name}] 連線中斷: {e!r}")
+
             except Exception as e:
-                logger.error(f"❌ [WS] 發生錯誤: {e}", exc_info=True)
+                logger.error(f"❌ [{self.name}] 發生錯誤: {e}", exc_info=True)
                 self.ws = None
 
-            # 重新連線
-            if self.keep_running:
-                await asyncio.sleep(5)
+            if not self.keep_running:
+                break
+
+            self._mark_down()
+
+            # 重新連線: 第一次立即重試，之後指數退避 (full jitter)
+            WS_RECONNECTS.inc()
+            delay = self._backoff_delay()
+            self.reconnect_attempts += 1
+
+            if delay > 0:
+                logger.info(f"⏳ [{self.name}] {delay:.2f}s 後重新連線 (第 {self.reconnect_attempts} 次)")
+                await asyncio.sleep(delay)
+
+        if self.recovery_task:
+            self.recovery_task.cancel()
+
+        if self.owns_dispatcher and self.dispatcher:
+            await self.dispatcher.stop()
+
+    async def _deliver(self, message: str, recv_ns: int):
+        if self.recorder:
+            self.recorder.record_frame(message)
+
+        if self.dispatcher:
+            await self.dispatcher.submit(message, recv_ns)
+
+        elif self.callback:
+            asyncio.create_task(self.callback(message, recv_ns))
+
+    def _backoff_delay(self) -> float:
+        if self.reconnect_attempts == 0:
+            return 0.0
+
+        return random.uniform(0, min(self.reconnect_max, self.reconnect_base * 2 ** (self.reconnect_attempts - 1)))
+
+    def _mark_down(self):
+        # 連線期間的缺口只記第一次中斷時間，持續重試失敗不會覆蓋
+        if self.down_since is not None or not self.current_subscriptions:
+            return
+
+        self.down_since = time.time()
+
+        if self.on_disconnect:
+            self.on_disconnect(self.name, list(self.current_subscriptions))
+
+    async def _recover(self, tokens: List[str], down_since: float):
+        if self.book_source:
+            try:
+                books = await self.book_source(tokens)
+
+                if books:
+                    frame = json.dumps([{**book, "event_type": "book"} for book in books])
+                    await self._deliver(frame, time.perf_counter_ns())
+
+                logger.info(f"📚 [{self.name}] 已由 REST 補齊 {len(books)}/{len(tokens)} 個 order book")
+
+            except Exception as e:
+                logger.error(f"❌ [{self.name}] REST order book 補齊失敗: {e}")
+
+        resumed_at = time.time()
+
+        self.down_since = None
+        self.recovery_task = None
+
+        if self.on_reconnect:
+            await self.on_reconnect(self.name, tokens, down_since, resumed_at)
+
+    async def stop(self):
+        self.keep_running = False
+
+        if self.ws:
+            await self.ws.close()
 
     async def subscribe(self, asset_ids: List[str]):
         self.current_subscriptions.update(asset_ids)
@@ -80,7 +204,7 @@ class PolymarketWSClient:
             "operation": "subscribe"
         }
 
-        logger.debug(f"📤 [WS] 發送訂閱封包: {msg}")
+        logger.debug(f"📤 [{self.name}] 發送訂閱封包: {msg}")
         await self._send_json(msg)
 
     async def unsubscribe(self, asset_ids: List[str]):
@@ -89,7 +213,7 @@ class PolymarketWSClient:
             "operation": "unsubscribe"
         }
 
-        logger.debug(f"📤 [WS] 發送取消訂閱: {msg}")
+        logger.debug(f"📤 [{self.name}] 發送取消訂閱: {msg}")
         await self._send_json(msg)
 
         self.current_subscriptions.difference_update(asset_ids)
@@ -101,10 +225,10 @@ class PolymarketWSClient:
                     await self.ws.send(json.dumps(payload))
 
                 except Exception as e:
-                    logger.error(f"❌ [WS] 發送失敗: {e}")
+                    logger.error(f"❌ [{self.name}] 發送失敗: {e}")
 
             else:
-                logger.warning("⚠️ [WS] 未連線，無法發送訊息")
+                logger.warning(f"⚠️ [{self.name}] 未連線，無法發送訊息")
 
     async def _keep_alive_loop(self):
         try:
@@ -115,11 +239,11 @@ class PolymarketWSClient:
                     try:
                         payload = {"type": "ping"}
 
-                        logger.debug("[WS] 發送 Ping")
+                        logger.debug(f"[{self.name}] 發送 Ping")
                         await self.ws.send(json.dumps(payload))
 
                     except Exception as e:
-                        logger.debug(f"[WS] Ping 失敗: {e}")
+                        logger.debug(f"[{self.name}] Ping 失敗: {e}")
                         break
 
         except asyncio.CancelledError:
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.clients.dispatch import FrameDispatcher
+from app.clients.polymarket_ws import PolymarketWSClient
+from app.config import settings
+from app.replay.recorder import FeedRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class PolymarketWSPool:
+    # 將訂閱分散到多條 WebSocket 連線:
+    # - 先補滿 pool_size 條連線，之後指派給負載最低且未達 max_tokens 的連線；全部滿載時再開新連線
+    # - 每條連線各自重連，只補訂閱自己負責的 token
+    # - 所有連線的訊息匯入同一個 FrameDispatcher
+    # 對外介面與 PolymarketWSClient 相同 (start / stop / subscribe / unsubscribe)
+    def __init__(
+        self,
+        pool_size: int = settings.WS_POOL_SIZE,
+        max_tokens: int = settings.WS_MAX_TOKENS_PER_CONN,
+        dispatch_mode: str = settings.WS_DISPATCH_MODE,
+        recorder: Optional[FeedRecorder] = None,
+    ):
+        self.pool_size = max(1, pool_size)
+        self.max_tokens = max_tokens
+        self.dispatch_mode = dispatch_mode
+        self.recorder = recorder
+
+        self.callback = None
+        self.dispatcher: Optional[FrameDispatcher] = None
+
+        self.connections: List[PolymarketWSClient] = []
+        self.tasks: List[asyncio.Task] = []
+        self.owners: Dict[str, PolymarketWSClient] = {}
+
+        self.lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+
+        # 斷線處理 hook，開新連線時套用 (說明見 PolymarketWSClient)
+        self.on_disconnect: Optional[Callable[[str, List[str]], None]] = None
+        self.book_source: Optional[Callable[[List[str]], Awaitable[List[Dict]]]] = None
+        self.on_reconnect: Optional[Callable[[str, List[str], float, float], Awaitable[None]]] = None
+
+    @property
+    def current_subscriptions(self) -> Set[str]:
+        return set(self.owners)
+
+    async def start(self, callback: Callable[[str, int], Awaitable[None]]):
+        self.callback = callback
+        self._stopped.clear()
+
+        if self.dispatch_mode == "pipeline":
+            self.dispatcher = FrameDispatcher(callback)
+            self.dispatcher.start()
+
+        # start 之前就已指派訂閱的連線
+        for connection in self.connections:
+            self._launch(connection)
+
+        logger.info(f"🔌 [WS Pool] 啟動 (連線數 {self.pool_size}，每條上限 {self.max_tokens} tokens)")
+
+        try:
+            await self._stopped.wait()
+
+        finally:
+            for connection in self.connections:
+                await connection.stop()
+
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+            if self.dispatcher:
+                await self.dispatcher.stop()
+
+    async def stop(self):
+        self._stopped.set()
+
+        for connection in self.connections:
+            await connection.stop()
+
+    async def subscribe(self, asset_ids: List[str]):
+        async with self.lock:
+            assigned: Dict[PolymarketWSClient, List[str]] = {}
+
+            for asset_id in asset_ids:
+                if asset_id in self.owners:
+                    continue
+
+                connection = self._pick_connection(assigned)
+                assigned.setdefault(connection, []).append(asset_id)
+                self.owners[asset_id] = connection
+
+        for connection, tokens in assigned.items():
+            if connection.ws is None:
+                # 尚未連上的連線在連線成功時會一併訂閱
+                connection.current_subscriptions.update(tokens)
+
+            else:
+                await connection.subscribe(tokens)
+
+    async def unsubscribe(self, asset_ids: List[str]):
+        grouped: Dict[PolymarketWSClient, List[str]] = {}
+
+        async with self.lock:
+            for asset_id in asset_ids:
+                connection = self.owners.pop(asset_id, None)
+
+                if connection:
+                    grouped.setdefault(connection, []).append(asset_id)
+
+        for connection, tokens in grouped.items():
+            await connection.unsubscribe(tokens)
+
+    def load(self) -> Dict[str, int]:
+        return {connection.name: len(connection.current_subscriptions) for connection in self.connections}
+
+    def _pick_connection(self, pending: Dict[PolymarketWSClient, List[str]]) -> PolymarketWSClient:
+        if len(self.connections) < self.pool_size:
+            return self._open_connection()
+
+        def load(connection: PolymarketWSClient) -> int:
+            return len(connection.current_subscriptions) + len(pending.get(connection, ()))
+
+        connection = min(self.connections, key=load)
+
+        if load(connection) < self.max_tokens:
+            return connection
+
+        logger.warning(f"⚠️ [WS Pool] {len(self.connections)} 條連線皆已達 {self.max_tokens} tokens，新增連線")
+
+        return self._open_connection()
+
+    def _open_connection(self) -> PolymarketWSClient:
+        connection = PolymarketWSClient(
+            dispatch_mode=self.dispatch_mode,
+            recorder=self.recorder,
+            dispatcher=self.dispatcher,
+            name=f"WS-{len(self.connections) + 1}",
+        )
+
+        connection.on_disconnect = self.on_disconnect
+        connection.book_source = self.book_source
+        connection.on_reconnect = self.on_reconnect
+
+        self.connections.append(connection)
+
+        if self.callback:
+            self._launch(connection)
+
+        return connection
+
+    def _launch(self, connection: PolymarketWSClient):
+        connection.dispatcher = self.dispatcher
+        connection.owns_dispatcher = False
+
+        self.tasks.append(asyncio.create_task(connection.start(self.callback)))
@@ -17,10 +17,93 @@ class Settings:
     # Default to Polygon Mainnet
     CHAIN_ID = int(os.getenv("CHAIN_ID", 137))
 
+    # CLOB API creds 快取 (第一次需要認證時 derive 後寫入，空字串 = 不快取)
+    CLOB_CREDS_PATH = os.getenv("CLOB_CREDS_PATH", "data/clob_creds.json")
+
+    # Gamma API 連線池 (非同步市場查詢)
+    GAMMA_MAX_CONCURRENCY = int(os.getenv("GAMMA_MAX_CONCURRENCY", 8))
+    GAMMA_MAX_RETRIES = int(os.getenv("GAMMA_MAX_RETRIES", 3))
+
+    # 時段切換: 提前幾秒訂閱下一時段、邊界後保留舊市場幾秒
+    WINDOW_PRELOAD_SEC = float(os.getenv("WINDOW_PRELOAD_SEC", 30))
+    WINDOW_OVERLAP_SEC = float(os.getenv("WINDOW_OVERLAP_SEC", 5))
+
+    # 啟用新時段後，背景預先解析之後幾個時段的市場資料
+    MARKET_WARM_WINDOWS = int(os.getenv("MARKET_WARM_WINDOWS", 1))
+
+    # WebSocket 訊息分派 (pipeline: 固定數量 consumer 並保持同市場順序 / task: 每則訊息各自 create_task)
+    WS_DISPATCH_MODE = os.getenv("WS_DISPATCH_MODE", "pipeline")
+    WS_DISPATCH_WORKERS = int(os.getenv("WS_DISPATCH_WORKERS", 4))
+    WS_DISPATCH_QUEUE_SIZE = int(os.getenv("WS_DISPATCH_QUEUE_SIZE", 2000))
+    WS_DISPATCH_MAX_BATCH = int(os.getenv("WS_DISPATCH_MAX_BATCH", 64))
+
+    # WebSocket 連線池 (訂閱分散到多條連線，各自重連)
+    WS_POOL_SIZE = int(os.getenv("WS_POOL_SIZE", 1))
+    WS_MAX_TOKENS_PER_CONN = int(os.getenv("WS_MAX_TOKENS_PER_CONN", 100))
+
+    # 斷線重連: 第一次立即重連，之後以 BASE 秒起跳指數退避，最長 MAX 秒
+    WS_RECONNECT_BASE_SEC = float(os.getenv("WS_RECONNECT_BASE_SEC", 0.5))
+    WS_RECONNECT_MAX_SEC = float(os.getenv("WS_RECONNECT_MAX_SEC", 30))
+
+    # CLOB 公開 REST (重連後補齊 order book)
+    CLOB_MAX_CONCURRENCY = int(os.getenv("CLOB_MAX_CONCURRENCY", 8))
+    CLOB_MAX_RETRIES = int(os.getenv("CLOB_MAX_RETRIES", 2))
+
+    # 套利下單 (off = 只偵測不下單，dry_run = 送往本機 stand-in，live = 送往 CLOB_URL)
+    EXEC_MODE = os.getenv("EXEC_MODE", "off")
+    EXEC_DRY_RUN_URL = os.getenv("EXEC_DRY_RUN_URL", "http://127.0.0.1:8766")
+    EXEC_ORDER_TYPE = os.getenv("EXEC_ORDER_TYPE", "FOK")
+    EXEC_MAX_SIZE = float(os.getenv("EXEC_MAX_SIZE", 10))
+    EXEC_COOLDOWN_SEC = float(os.getenv("EXEC_COOLDOWN_SEC", 5))
+
+    # Collector 寫入緩衝 (CONFLATE_MS=0 代表每個 tick 都寫入，>0 代表每個市場每 N ms 最多一筆)
+    COLLECTOR_CONFLATE_MS = int(os.getenv("COLLECTOR_CONFLATE_MS", 0))
+    COLLECTOR_BUFFER_MAX = int(os.getenv("COLLECTOR_BUFFER_MAX", 10000))
+
+    # 只在最佳買價/數量改變時寫入，並定期補寫 heartbeat 列 (0 = 關閉)
+    COLLECTOR_DEDUP = os.getenv("COLLECTOR_DEDUP", "0") == "1"
+    COLLECTOR_HEARTBEAT_SEC = float(os.getenv("COLLECTOR_HEARTBEAT_SEC", 60))
+
+    # 原始訊息錄製 (供 run_replay.py 重播)
+    RECORD_FEED = os.getenv("RECORD_FEED", "0") == "1"
+    RECORD_DIR = os.getenv("RECORD_DIR", "data/feeds")
+
+    # 套利偵測 (手續費為成交金額比例)
+    ARB_FEE_RATE = float(os.getenv("ARB_FEE_RATE", 0.0))
+    ARB_MIN_EDGE = float(os.getenv("ARB_MIN_EDGE", 0.0))
+
+    # SQLite ticks schema (1: 原始 TEXT/REAL 格式, 2: 整數精簡格式)
+    DB_SCHEMA_VERSION = int(os.getenv("DB_SCHEMA_VERSION", 1))
+
+    # ticks 分區 (none = 單一檔案，day / week = 每個資產每日/每週一個檔案)，保留天數 0 = 永久保留
+    DB_PARTITION = os.getenv("DB_PARTITION", "none")
+    DB_RETENTION_DAYS = float(os.getenv("DB_RETENTION_DAYS", 0))
+
+    # ticks 寫入方式: thread = 專屬寫入執行緒 (group commit)，async = 經由 aiosqlite 逐批寫入
+    DB_WRITER = os.getenv("DB_WRITER", "thread")
+    DB_WRITER_MAX_DELAY_MS = int(os.getenv("DB_WRITER_MAX_DELAY_MS", 50))
+    DB_WRITER_MAX_BATCH = int(os.getenv("DB_WRITER_MAX_BATCH", 5000))
+    DB_WRITER_MAX_BACKLOG = int(os.getenv("DB_WRITER_MAX_BACKLOG", 50000))
+    DB_WRITER_CACHE_MB = int(os.getenv("DB_WRITER_CACHE_MB", 8))
+
+    # Prometheus metrics 端點 (0 = 關閉)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+
+    # Profiling (也可用 run_collector.py --profile 開啟)
+    PROFILE = os.getenv("PROFILE", "0") == "1"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+    PROFILE_SAMPLE_SEC = float(os.getenv("PROFILE_SAMPLE_SEC", 0))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+
     # Log 設定
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_MAX_BYTES = int(os.getenv("LOG_MAX_MB", 10)) * 1024 * 1024
     LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
 
+    # log 格式 (text / json)；同一行程式碼每 RATE_LIMIT_SEC 秒最多輸出 BURST 則 (0 = 不限制)
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_RATE_LIMIT_SEC = float(os.getenv("LOG_RATE_LIMIT_SEC", 10))
+    LOG_RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", 20))
+
 
 settings = Settings()
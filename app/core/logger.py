@@ -1,7 +1,13 @@
+import atexit
+import json
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Tuple
 from app.config import settings
 
 # 建立存 logs 的資料夾
@@ -13,12 +19,120 @@ FORMATTER = logging.Formatter(
 )
 
 
-def setup_logger(name: str = None, log_file: str = "app.log", level=logging.INFO):
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+class JsonFormatter(logging.Formatter):
+    # 一行一筆 JSON，方便 log 收集工具解析
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
 
-    if logger.handlers:
-        return logger
+        suppressed = getattr(record, "suppressed", 0)
+
+        if suppressed:
+            payload["suppressed"] = suppressed
+
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    # 同一個呼叫位置 (檔案 + 行號) 每 window 秒最多放行 burst 則；
+    # 超出的只計數，下一則放行的訊息附上「已略過 N 則」，關閉時補輸出剩餘的摘要
+    def __init__(self, window: float = settings.LOG_RATE_LIMIT_SEC, burst: int = settings.LOG_RATE_LIMIT_BURST):
+        super().__init__()
+
+        self.window = window
+        self.burst = burst
+
+        # key -> [window 開始時間, 已放行數, 已略過數, 最後一筆被略過的 record]
+        self.sites: Dict[Tuple[str, int], list] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0:
+            return True
+
+        now = record.created
+        key = (record.pathname, record.lineno)
+
+        with self.lock:
+            site = self.sites.get(key)
+
+            if site is None:
+                self.sites[key] = [now, 1, 0, None]
+                return True
+
+            if now - site[0] >= self.window:
+                suppressed = site[2]
+                site[:] = [now, 1, 0, None]
+
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg} (已略過 {suppressed} 則相似訊息)"
+
+                return True
+
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+
+            site[2] += 1
+            site[3] = record
+
+            return False
+
+    def drain(self):
+        # 回傳尚未輸出摘要的最後一筆被略過 record (已附上略過數)
+        with self.lock:
+            pending = []
+
+            for site in self.sites.values():
+                suppressed, record = site[2], site[3]
+
+                if suppressed and record is not None:
+                    record.exc_info = None
+                    record.exc_text = None
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg} (已略過 {suppressed} 則相似訊息)"
+                    pending.append(record)
+
+                site[2], site[3] = 0, None
+
+            return pending
+
+
+class _LogPipeline:
+    # 呼叫端只把 record 放進 queue，格式化與檔案 I/O 由背景 QueueListener 執行緒處理
+    def __init__(self, handlers, rate_limit: RateLimitFilter):
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+        self.handler = QueueHandler(self.queue)
+        self.handler.addFilter(rate_limit)
+        self.rate_limit = rate_limit
+
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.running = True
+
+        atexit.register(self.stop)
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+
+        for record in self.rate_limit.drain():
+            self.queue.put_nowait(self.handler.prepare(record))
+
+        self.listener.stop()
+
+
+def _build_handlers(log_file: str):
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else FORMATTER
 
     file_handler = RotatingFileHandler(
         LOG_DIR / log_file,
@@ -27,14 +141,34 @@ def setup_logger(name: str = None, log_file: str = "app.log", level=logging.INFO
         encoding="utf-8"
     )
 
-    file_handler.setFormatter(FORMATTER)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(formatter)
 
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(FORMATTER)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(formatter)
+
+    return [file_handler, console_handler]
+
+
+def setup_logger(name: str = None, log_file: str = "app.log", level=logging.INFO):
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    if logger.handlers:
+        return logger
+
+    pipeline = _LogPipeline(_build_handlers(log_file), RateLimitFilter())
+    logger.addHandler(pipeline.handler)
+    _pipelines.append(pipeline)
 
     return logger
 
 
+def shutdown_logging():
+    # 等待 queue 內的 log 全部寫出 (程式結束前呼叫；atexit 也會呼叫)
+    for pipeline in _pipelines:
+        pipeline.stop()
+
+
+_pipelines = []
+
 logger = setup_logger()
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 熱路徑上的計時 (perf_counter + histogram) 只在開啟 metrics 端點時執行；
+# counter 只是整數加一，一律開啟
+METRICS_ENABLED = settings.METRICS_PORT > 0
+
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+        fn: Optional[Callable[[], float]] = None,
+    ):
+        self.kind = kind
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.buckets = buckets
+
+        # fn: 於 scrape 時才讀取的值 (queue 深度、訂閱數等)，熱路徑零成本
+        self.fn = fn
+
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+        # 無 label 的 metric 先建立 child，尚未發生時也會輸出 0
+        if not self.label_names and fn is None:
+            self.labels()
+
+    def labels(self, *values: str):
+        # 呼叫端應在初始化時先取得 child 並保存，熱路徑上直接操作 child
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+
+        if child is None:
+            child = self._new_child()
+            self.children[key] = child
+
+        return child
+
+    def _new_child(self):
+        if self.kind == "counter":
+            return Counter()
+
+        if self.kind == "gauge":
+            return Gauge()
+
+        return Histogram(self.buckets)
+
+    # 無 label 的 metric 直接當作 child 使用
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+        if self.fn is not None:
+            try:
+                lines.append(f"{self.name} {_format_value(self.fn())}")
+
+            except Exception as e:
+                logger.debug(f"metric {self.name} 讀取失敗: {e}")
+
+            return lines
+
+        for key, child in self.children.items():
+            if self.kind == "histogram":
+                cumulative = 0
+
+                for bound, count in zip(child.buckets + (float("inf"),), child.counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+                lines.append(f"{self.name}_count{labels} {child.count}")
+
+            else:
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}")
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        existing = self.families.get(family.name)
+
+        # 同名且為一般 metric 時沿用既有物件；callback metric 以最新註冊者為準
+        if existing is not None and family.fn is None:
+            return existing
+
+        self.families[family.name] = family
+
+        return family
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = (), fn=None) -> MetricFamily:
+        return self._register(MetricFamily("counter", name, help_text, labels, fn=fn))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (), fn=None) -> MetricFamily:
+        return self._register(MetricFamily("gauge", name, help_text, labels, fn=fn))
+
+    def histogram(
+        self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS, labels: Sequence[str] = ()
+    ) -> MetricFamily:
+        return self._register(MetricFamily("histogram", name, help_text, labels, buckets=buckets))
+
+    def render(self) -> str:
+        lines = []
+
+        for family in self.families.values():
+            lines.extend(family.render())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ==========================================
+# Collector pipeline metrics
+# ==========================================
+FRAMES_RECEIVED = registry.counter(
+    "collector_frames_received_total", "WebSocket 訊息數 (依事件類型)", labels=("event_type",))
+DECODE_SECONDS = registry.histogram(
+    "collector_decode_seconds", "單一 frame 解碼時間")
+BATCH_ROWS = registry.histogram(
+    "collector_db_batch_rows", "每次寫入 DB 的筆數", buckets=SIZE_BUCKETS)
+SAVE_SECONDS = registry.histogram(
+    "collector_db_save_seconds", "save_ticks_batch 耗時")
+TICK_CONFLICTS = registry.counter(
+    "collector_db_conflict_rows_total", "v2 主鍵衝突而未寫入的 tick 筆數")
+WS_RECONNECTS = registry.counter(
+    "collector_ws_reconnects_total", "WebSocket 重新連線次數")
+GAP_SECONDS = registry.histogram(
+    "collector_gap_seconds", "斷線到 order book 補齊的缺口長度",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300))
+
+
+class MetricsServer:
+    # 極簡的 Prometheus 端點: GET /metrics，只綁 127.0.0.1
+    def __init__(self, port: int = settings.METRICS_PORT, host: str = "127.0.0.1"):
+        self.port = port
+        self.host = host
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"📈 Metrics 端點: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+
+            # 讀掉 header
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode(errors="ignore").split()
+
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body = registry.render().encode()
+                status = "200 OK"
+
+            else:
+                body = b"not found\n"
+                status = "404 Not Found"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+
+        except Exception as e:
+            logger.debug(f"metrics 請求處理失敗: {e}")
+
+        finally:
+            writer.close()
@@ -0,0 +1,184 @@
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StageStats:
+    __slots__ = ("name", "count", "total_ns", "max_ns", "samples")
+
+    def __init__(self, name: str, max_samples: int = 50000):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+        # 只保留最近的樣本計算百分位數，記憶體固定
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, elapsed_ns: int):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.samples.append(elapsed_ns)
+
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, q: float) -> int:
+        if not self.samples:
+            return 0
+
+        ordered = sorted(self.samples)
+
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class SamplingProfiler:
+    # 背景執行緒定期讀取 sys._current_frames()，累計成 folded stacks
+    # (flamegraph.pl / speedscope 可直接讀取)
+    def __init__(self, interval: float = 0.005, duration: float = 0):
+        self.interval = interval
+        self.duration = duration
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.duration if self.duration > 0 else None
+
+        while not self._stop.wait(self.interval):
+            if deadline and time.monotonic() >= deadline:
+                logger.info(f"🔬 取樣結束 ({self.samples} 次)")
+                return
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+
+                stack = []
+
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                    frame = frame.f_back
+
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+            self.samples += 1
+
+    def write_folded(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    # 未開啟時各 stage 只多一次屬性判斷: if profiler.enabled
+    def __init__(self):
+        self.enabled = False
+        self.stages: Dict[str, StageStats] = {}
+        self.sampler: Optional[SamplingProfiler] = None
+        self.output_dir = Path(settings.PROFILE_DIR)
+        self.started_at = 0.0
+
+    def stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+
+        if stats is None:
+            stats = StageStats(name)
+            self.stages[name] = stats
+
+        return stats
+
+    def enable(
+        self,
+        output_dir: str = settings.PROFILE_DIR,
+        sample_seconds: float = settings.PROFILE_SAMPLE_SEC,
+        sample_interval_ms: float = settings.PROFILE_SAMPLE_INTERVAL_MS,
+    ):
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self.output_dir = Path(output_dir)
+        self.started_at = time.time()
+
+        if sample_interval_ms > 0:
+            self.sampler = SamplingProfiler(sample_interval_ms / 1000, sample_seconds)
+            self.sampler.start()
+
+        logger.info(
+            f"🔬 Profiling 開啟 (取樣間隔 {sample_interval_ms} ms，"
+            f"{'全程' if sample_seconds <= 0 else f'{sample_seconds} 秒'})，輸出至 {self.output_dir}")
+
+    def report(self) -> str:
+        wall_ns = max(1, int((time.time() - self.started_at) * 1e9))
+        lines = [
+            f"{'stage':<16}{'count':>10}{'total_ms':>12}{'wall_%':>8}"
+            f"{'mean_us':>10}{'p50_us':>10}{'p99_us':>10}{'max_us':>10}"
+        ]
+
+        for stats in sorted(self.stages.values(), key=lambda s: s.total_ns, reverse=True):
+            mean = stats.total_ns / stats.count if stats.count else 0
+            lines.append(
+                f"{stats.name:<16}{stats.count:>10}{stats.total_ns / 1e6:>12.1f}"
+                f"{stats.total_ns / wall_ns * 100:>8.2f}{mean / 1000:>10.1f}"
+                f"{stats.percentile(0.5) / 1000:>10.1f}{stats.percentile(0.99) / 1000:>10.1f}"
+                f"{stats.max_ns / 1000:>10.1f}"
+            )
+
+        return "\n".join(lines)
+
+    def dump(self):
+        if not self.enabled:
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+
+        stages_path = self.output_dir / f"stages-{stamp}.txt"
+        stages_path.write_text(self.report() + "\n", encoding="utf-8")
+
+        message = f"🔬 Profiling 輸出: {stages_path}"
+
+        if self.sampler and self.sampler.samples:
+            folded_path = self.output_dir / f"stacks-{stamp}.folded"
+            self.sampler.write_folded(folded_path)
+            message += f", {folded_path} ({self.sampler.samples} 次取樣)"
+
+        logger.info(message)
+
+    def shutdown(self):
+        if not self.enabled:
+            return
+
+        if self.sampler:
+            self.sampler.stop()
+
+        self.dump()
+
+
+profiler = Profiler()
@@ -0,0 +1,350 @@
+import asyncio
+import json
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import aiohttp
+from eth_keys.datatypes import PrivateKey
+from hexbytes import HexBytes
+from py_clob_client.clob_types import ApiCreds, OrderType, RequestArgs
+from py_clob_client.config import get_contract_config
+from py_clob_client.endpoints import POST_ORDER
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.order_builder.builder import ROUNDING_CONFIG, OrderBuilder
+from py_clob_client.order_builder.constants import BUY
+from py_clob_client.signer import Signer
+from py_clob_client.utilities import order_to_json
+from py_order_utils.builders import OrderBuilder as UtilsOrderBuilder
+from py_order_utils.model import OrderData
+from py_order_utils.signer import Signer as UtilsSigner
+
+from app.clients.clob_public import ClobPublicClient
+from app.clients.polymarket import PolymarketClient
+from app.config import settings
+from app.strategy.arbitrage import ArbitrageOpportunity
+
+logger = logging.getLogger(__name__)
+
+EXEC_OFF = "off"
+EXEC_DRY_RUN = "dry_run"
+EXEC_LIVE = "live"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class SigningContext:
+    # 每個 token 預先解析好的下單參數與簽章器，訊號觸發時只需計算數量並簽章
+    __slots__ = ("token_id", "tick_size", "round_config", "neg_risk", "fee_rate_bps", "order_builder")
+
+    def __init__(self, token_id: str, tick_size: str, neg_risk: bool, fee_rate_bps: int, order_builder):
+        self.token_id = token_id
+        self.tick_size = tick_size
+        self.round_config = ROUNDING_CONFIG[tick_size]
+        self.neg_risk = neg_risk
+        self.fee_rate_bps = str(fee_rate_bps)
+        self.order_builder = order_builder
+
+
+class LegResult:
+    __slots__ = ("token_id", "price", "size", "sign_ns", "ack_ns", "status", "order_id", "error")
+
+    def __init__(self, token_id: str, price: float, size: float):
+        self.token_id = token_id
+        self.price = price
+        self.size = size
+
+        # sign_ns: 簽章耗時；ack_ns: 訊號觸發到收到交易所回應
+        self.sign_ns = 0
+        self.ack_ns = 0
+        self.status: Optional[str] = None
+        self.order_id: Optional[str] = None
+        self.error: Optional[str] = None
+
+
+class ExecutionReport:
+    __slots__ = ("market_id", "signal_latency_ns", "legs")
+
+    def __init__(self, market_id, signal_latency_ns: int, legs: List[LegResult]):
+        self.market_id = market_id
+        self.signal_latency_ns = signal_latency_ns
+        self.legs = legs
+
+    @property
+    def ok(self) -> bool:
+        return all(leg.error is None for leg in self.legs)
+
+
+class OrderExecutor:
+    # 套利下單路徑:
+    # - prepare(): 時段開始前預先取得 tick size / neg_risk / fee，建好各交易所合約的簽章器並暖好 HTTP 連線
+    # - on_opportunity(): 同步複製訊號內容後排入背景，Up / Down 兩腳各自簽章、並行送出
+    # dry_run 模式送往 EXEC_DRY_RUN_URL (本機 stand-in)，未設定 PRIVATE_KEY 時使用臨時金鑰
+    def __init__(
+        self,
+        client=None,
+        mode: str = settings.EXEC_MODE,
+        order_type: str = settings.EXEC_ORDER_TYPE,
+        max_size: float = settings.EXEC_MAX_SIZE,
+        cooldown_sec: float = settings.EXEC_COOLDOWN_SEC,
+        max_reports: int = 1000,
+    ):
+        # client: PolymarketClient，live 模式使用其已認證的 ClobClient (未提供時於第一次 prepare 建立)
+        self.client = client
+        self.mode = mode
+        self.order_type = getattr(OrderType, order_type)
+        self.max_size = max_size
+        self.cooldown_ns = int(cooldown_sec * 1e9)
+
+        self.base_url = settings.EXEC_DRY_RUN_URL if mode == EXEC_DRY_RUN else settings.CLOB_URL
+        self.public = ClobPublicClient(base_url=self.base_url)
+
+        self.contexts: Dict[str, SigningContext] = {}
+        self.last_fired: Dict[object, int] = {}
+        # 有腳下單失敗 (可能留下單邊部位) 的市場，不再觸發直到人工處理後呼叫 resume()
+        self.halted: Dict[object, ExecutionReport] = {}
+        # 只保留最近 max_reports 筆回報，長時間執行不會累積
+        self.reports: Deque[ExecutionReport] = deque(maxlen=max_reports)
+        self.tasks = set()
+
+        self.signer: Optional[Signer] = None
+        self.creds: Optional[ApiCreds] = None
+        self.builder: Optional[OrderBuilder] = None
+        self.signer_lock = asyncio.Lock()
+
+        # 依 neg_risk 區分交易所合約，各建一個簽章器 (建立時需要推導金鑰，成本高)
+        # 簽章器持有已解析的 PrivateKey，避免每次簽章都重新推導公鑰 (約佔簽章時間一半)
+        self.order_builders: Dict[bool, UtilsOrderBuilder] = {}
+
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != EXEC_OFF
+
+    def _ensure_signer(self):
+        if self.signer is not None:
+            return
+
+        if self.mode == EXEC_LIVE:
+            if self.client is None:
+                self.client = PolymarketClient()
+
+            clob = self.client.client
+
+            self.signer = clob.signer
+            self.creds = clob.creds
+            self.builder = clob.builder
+
+        else:
+            private_key = settings.PRIVATE_KEY or f"0x{secrets.token_hex(32)}"
+
+            self.signer = Signer(private_key, settings.CHAIN_ID)
+            self.creds = ApiCreds("dry-run", "ZHJ5LXJ1bg==", "dry-run")
+            self.builder = OrderBuilder(self.signer, sig_type=1, funder=settings.FUNDER or None)
+
+    def _order_builder(self, neg_risk: bool) -> UtilsOrderBuilder:
+        order_builder = self.order_builders.get(neg_risk)
+
+        if order_builder is None:
+            chain_id = self.signer.get_chain_id()
+
+            order_builder = UtilsOrderBuilder(
+                get_contract_config(chain_id, neg_risk).exchange,
+                chain_id,
+                UtilsSigner(key=PrivateKey(HexBytes(self.signer.private_key))),
+            )
+            self.order_builders[neg_risk] = order_builder
+
+        return order_builder
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=300, ttl_dns_cache=300)
+
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=5),
+                json_serialize=json.dumps,
+            )
+
+        return self.session
+
+    async def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+        await self.public.close()
+
+    async def prepare(self, token_ids: List[str]):
+        if not self.enabled:
+            return
+
+        async with self.signer_lock:
+            # live 模式第一次建立 ClobClient 可能需要 derive creds (網路往返)，不在 event loop 上執行
+            if self.signer is None:
+                await asyncio.to_thread(self._ensure_signer)
+
+        pending = [token_id for token_id in token_ids if token_id not in self.contexts]
+
+        if not pending:
+            return
+
+        try:
+            results = await asyncio.gather(*(
+                asyncio.gather(
+                    self.public.get_tick_size(token_id),
+                    self.public.get_neg_risk(token_id),
+                    self.public.get_fee_rate_bps(token_id),
+                )
+                for token_id in pending
+            ))
+
+            for token_id, (tick_size, neg_risk, fee_rate_bps) in zip(pending, results):
+                self.contexts[token_id] = SigningContext(
+                    token_id, tick_size or "0.01", neg_risk, fee_rate_bps, self._order_builder(neg_risk))
+
+            # 暖好下單用的連線，訊號觸發時不必再握手
+            session = await self._get_session()
+
+            async with session.get(f"{self.base_url}/time") as response:
+                await response.read()
+
+            logger.info(f"🖊️ 已備妥 {len(pending)} 個 token 的下單參數 ({self.mode})")
+
+        except Exception as e:
+            logger.error(f"❌ 準備下單參數失敗: {e}")
+
+    def forget(self, token_ids: List[str], market_ids=()):
+        for token_id in token_ids:
+            self.contexts.pop(token_id, None)
+
+        for market_id in market_ids:
+            self.last_fired.pop(market_id, None)
+
+    def resume(self, market_id) -> Optional[ExecutionReport]:
+        report = self.halted.pop(market_id, None)
+
+        if report is not None:
+            logger.warning(f"▶️ 市場 {market_id} 恢復下單")
+
+        return report
+
+    def on_tick_size_change(self, token_id: str, tick_size: float):
+        context = self.contexts.get(token_id)
+        key = f"{tick_size:g}"
+
+        if context is not None and key in ROUNDING_CONFIG:
+            context.tick_size = key
+            context.round_config = ROUNDING_CONFIG[key]
+
+    def on_opportunity(self, opp: ArbitrageOpportunity):
+        # ArbitrageDetector 的 handler，會就地更新 opp，需在此同步複製
+        signal_ns = time.perf_counter_ns()
+
+        if opp.market_id in self.halted:
+            return
+
+        if self.cooldown_ns and signal_ns - self.last_fired.get(opp.market_id, -self.cooldown_ns) < self.cooldown_ns:
+            return
+
+        up = self.contexts.get(opp.up_token)
+        down = self.contexts.get(opp.down_token)
+
+        if up is None or down is None:
+            logger.debug(f"市場 {opp.market_id} 尚未備妥下單參數，略過")
+            return
+
+        size = min(opp.size, self.max_size)
+
+        if size <= 0:
+            return
+
+        self.last_fired[opp.market_id] = signal_ns
+
+        task = asyncio.create_task(self.execute(
+            opp.market_id, opp.latency_ns, signal_ns,
+            ((up, opp.up_ask, size), (down, opp.down_ask, size)),
+        ))
+
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def execute(self, market_id, signal_latency_ns: int, signal_ns: int, legs) -> ExecutionReport:
+        session = await self._get_session()
+
+        results = await asyncio.gather(*(
+            self._send_leg(session, signal_ns, context, price, size) for context, price, size in legs
+        ))
+
+        report = ExecutionReport(market_id, signal_latency_ns, list(results))
+        self.reports.append(report)
+
+        summary = " | ".join(
+            f"{leg.token_id[:8]}… {leg.size:g}@{leg.price:.3f} {leg.status or leg.error} "
+            f"簽章 {leg.sign_ns / 1000:.0f} µs / 回應 {leg.ack_ns / 1e6:.1f} ms"
+            for leg in results
+        )
+
+        if report.ok:
+            logger.info(f"🧾 下單完成 (Market: {market_id}, {self.mode}) {summary}")
+
+        else:
+            # 任一腳失敗時另一腳可能已成交，冷卻結束也不再觸發，避免單邊部位繼續擴大
+            self.halted[market_id] = report
+            logger.error(f"🚨 下單失敗，暫停此市場 (Market: {market_id}, {self.mode}) {summary}")
+
+        return report
+
+    async def _send_leg(self, session, signal_ns: int, context: SigningContext, price: float, size: float) -> LegResult:
+        leg = LegResult(context.token_id, price, size)
+
+        try:
+            sign_start = time.perf_counter_ns()
+
+            side, maker_amount, taker_amount = self.builder.get_order_amounts(BUY, size, price, context.round_config)
+
+            signed = context.order_builder.build_signed_order(OrderData(
+                maker=self.builder.funder,
+                taker=ZERO_ADDRESS,
+                tokenId=context.token_id,
+                makerAmount=str(maker_amount),
+                takerAmount=str(taker_amount),
+                side=side,
+                feeRateBps=context.fee_rate_bps,
+                nonce="0",
+                signer=self.signer.address(),
+                expiration="0",
+                signatureType=self.builder.sig_type,
+            ))
+
+            body = order_to_json(signed, self.creds.api_key, self.order_type)
+            serialized = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+
+            headers = create_level_2_headers(
+                self.signer, self.creds, RequestArgs("POST", POST_ORDER, body, serialized))
+            headers["Content-Type"] = "application/json"
+
+            leg.sign_ns = time.perf_counter_ns() - sign_start
+
+            # 兩腳的簽章在 event loop 上依序完成，送出後才讓出控制權給另一腳
+            async with session.post(f"{self.base_url}{POST_ORDER}", data=serialized, headers=headers) as response:
+                data = await response.json(content_type=None)
+                leg.ack_ns = time.perf_counter_ns() - signal_ns
+
+                if response.status >= 400 or not data.get("success", False):
+                    leg.error = data.get("errorMsg") or data.get("error") or f"HTTP {response.status}"
+
+                leg.status = data.get("status")
+                leg.order_id = data.get("orderID")
+
+        except Exception as e:
+            leg.ack_ns = time.perf_counter_ns() - signal_ns
+            leg.error = str(e) or type(e).__name__
+
+        return leg
@@ -0,0 +1,169 @@
+import logging
+from bisect import bisect_left, insort
+from operator import neg
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.clients.market_decoder import BookEvent, Levels, PriceChangeEvent, TickSizeChangeEvent
+
+logger = logging.getLogger(__name__)
+
+Level = Tuple[float, float]
+
+BUY = "BUY"
+SELL = "SELL"
+
+# 快照中數量為 0 的常見寫法 (數量為原始字串，0 == 0.0 同時涵蓋已轉成數字的情況)
+_ZERO_SIZES = frozenset((0, "0", "0.0", "0.00", "0.000", "0.0000", "0.00000", "0.000000"))
+
+
+# 單一 token 的 L2 訂單簿
+# 價格 -> 數量 存在 dict，另外維護一條遞增排序的價格索引：
+# bids 直接存價格 (最佳買價在尾端)，asks 存負價格 (最佳賣價也在尾端)，
+# 所以 best bid / ask 都是 O(1)，增刪價位只需 O(log n) 搜尋
+# 快照的數量可能是原始字串 (見 market_decoder._parse_levels)，讀取時才轉成 float
+class OrderBook:
+    __slots__ = ("token_id", "bids", "asks", "_bid_keys", "_ask_keys", "timestamp", "tick_size")
+
+    def __init__(self, token_id: str):
+        self.token_id = token_id
+
+        self.bids: Levels = {}
+        self.asks: Levels = {}
+
+        self._bid_keys: List[float] = []
+        self._ask_keys: List[float] = []
+
+        self.timestamp: Optional[int] = None
+        self.tick_size: Optional[float] = None
+
+    # ==========================================
+    # Updates
+    # ==========================================
+    def apply_snapshot(self, bids: Levels, asks: Levels, timestamp: Optional[int] = None):
+        # 直接接管傳入的 dict，呼叫端之後不應再修改；數量為 0 的價位不算在簿上
+        if not _ZERO_SIZES.isdisjoint(bids.values()):
+            bids = {price: size for price, size in bids.items() if float(size) > 0}
+
+        if not _ZERO_SIZES.isdisjoint(asks.values()):
+            asks = {price: size for price, size in asks.items() if float(size) > 0}
+
+        self.bids = bids
+        self.asks = asks
+
+        self._bid_keys = sorted(bids)
+        self._ask_keys = sorted(map(neg, asks))
+
+        self.timestamp = timestamp
+
+    def apply_delta(self, side: str, price: float, size: float, timestamp: Optional[int] = None):
+        if side == BUY:
+            levels, keys, key = self.bids, self._bid_keys, price
+        else:
+            levels, keys, key = self.asks, self._ask_keys, -price
+
+        if size > 0:
+            if price not in levels:
+                insort(keys, key)
+
+            levels[price] = size
+
+        elif price in levels:
+            del levels[price]
+
+            index = bisect_left(keys, key)
+            del keys[index]
+
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+    def clear(self):
+        self.apply_snapshot({}, {})
+
+    # ==========================================
+    # Queries
+    # ==========================================
+    @property
+    def best_bid_price(self) -> Optional[float]:
+        return self._bid_keys[-1] if self._bid_keys else None
+
+    @property
+    def best_bid_size(self) -> Optional[float]:
+        return float(self.bids[self._bid_keys[-1]]) if self._bid_keys else None
+
+    @property
+    def best_ask_price(self) -> Optional[float]:
+        return -self._ask_keys[-1] if self._ask_keys else None
+
+    @property
+    def best_ask_size(self) -> Optional[float]:
+        return float(self.asks[-self._ask_keys[-1]]) if self._ask_keys else None
+
+    def best_bid(self) -> Optional[Level]:
+        if not self._bid_keys:
+            return None
+
+        price = self._bid_keys[-1]
+        return price, float(self.bids[price])
+
+    def best_ask(self) -> Optional[Level]:
+        if not self._ask_keys:
+            return None
+
+        price = -self._ask_keys[-1]
+        return price, float(self.asks[price])
+
+    def top_bids(self, depth: int) -> List[Level]:
+        return [(price, float(self.bids[price])) for price in reversed(self._bid_keys[-depth:])]
+
+    def top_asks(self, depth: int) -> List[Level]:
+        return [(-key, float(self.asks[-key])) for key in reversed(self._ask_keys[-depth:])]
+
+
+class OrderBookManager:
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+
+    def get(self, token_id: str) -> Optional[OrderBook]:
+        return self.books.get(token_id)
+
+    def get_or_create(self, token_id: str) -> OrderBook:
+        book = self.books.get(token_id)
+
+        if book is None:
+            book = OrderBook(token_id)
+            self.books[token_id] = book
+
+        return book
+
+    def remove(self, token_id: str):
+        self.books.pop(token_id, None)
+
+    def apply_book(self, event: BookEvent) -> Optional[str]:
+        book = self.get_or_create(event.asset_id)
+
+        # 重連後的 REST 快照可能比已套用的 WS 增量還舊，不能用它覆蓋較新的狀態
+        # 同一毫秒的快照仍套用: WS 的 book 可能與前一個 price_change 同一個 timestamp
+        if book.timestamp is not None and event.timestamp is not None and event.timestamp < book.timestamp:
+            logger.debug(f"略過過期的 book 快照 ({event.asset_id[:8]}… {event.timestamp} < {book.timestamp})")
+            return None
+
+        book.apply_snapshot(event.bids, event.asks, event.timestamp)
+
+        return event.asset_id
+
+    def apply_price_changes(self, event: PriceChangeEvent) -> Set[str]:
+        touched = set()
+
+        for change in event.changes:
+            book = self.get_or_create(change.asset_id)
+            book.apply_delta(change.side, change.price, change.size, event.timestamp)
+
+            touched.add(change.asset_id)
+
+        return touched
+
+    def apply_tick_size_change(self, event: TickSizeChangeEvent) -> str:
+        book = self.get_or_create(event.asset_id)
+        book.tick_size = event.new_tick_size
+
+        return event.asset_id
@@ -0,0 +1,135 @@
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+FRAME = "F"
+META = "M"
+
+_STOP = object()
+
+
+def window_start(wall_ns: int, window_seconds: int) -> int:
+    seconds = wall_ns // 1_000_000_000
+
+    return seconds - seconds % window_seconds
+
+
+# 原始 WebSocket frame 錄製器
+# 每行格式: "<recv epoch ns>\t<F|M>\t<payload>"，F 為原始 frame，M 為 Collector 的市場切換紀錄
+# 依 window_seconds (預設 15 分鐘) 切檔，gzip 壓縮並以 append 方式寫入；
+# 壓縮與檔案 I/O 都在背景 thread，event loop 只負責丟進 queue
+class FeedRecorder:
+    def __init__(
+        self,
+        directory: str = settings.RECORD_DIR,
+        window_seconds: int = 900,
+        flush_interval: float = 1.0,
+    ):
+        self.directory = Path(directory)
+        self.window_seconds = window_seconds
+        self.flush_interval = flush_interval
+
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.thread: Optional[threading.Thread] = None
+
+        self.current_window: Optional[int] = None
+        self.file = None
+
+        self.frames = 0
+        self.bytes_written = 0
+
+    def start(self):
+        if self.thread:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.thread = threading.Thread(target=self._run, name="feed-recorder", daemon=True)
+        self.thread.start()
+
+        logger.info(f"🎙️ 開始錄製原始訊息: {self.directory}")
+
+    def stop(self):
+        if not self.thread:
+            return
+
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.thread = None
+
+    def record_frame(self, frame: str):
+        self.queue.put((time.time_ns(), FRAME, frame))
+
+    def record_meta(self, payload: dict):
+        self.queue.put((time.time_ns(), META, json.dumps(payload)))
+
+    def path_for(self, window: int) -> Path:
+        return self.directory / f"feed-{window}.log.gz"
+
+    def _run(self):
+        last_flush = time.monotonic()
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                break
+
+            if item is not None:
+                try:
+                    self._write(*item)
+
+                except Exception as e:
+                    logger.error(f"❌ 錄製寫入失敗: {e}")
+
+            now = time.monotonic()
+
+            if self.file and now - last_flush >= self.flush_interval:
+                # Z_SYNC_FLUSH: 即使程式中斷，已 flush 的內容仍可被讀回
+                self.file.flush()
+                last_flush = now
+
+        self._close_file()
+        logger.info(f"🎙️ 錄製結束，共 {self.frames} 則訊息")
+
+    def _write(self, recv_ns: int, kind: str, payload):
+        window = window_start(recv_ns, self.window_seconds)
+
+        if window != self.current_window:
+            self._close_file()
+
+            self.current_window = window
+            self.file = gzip.open(self.path_for(window), "ab", compresslevel=6)
+
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+
+        if "\n" in payload:
+            payload = payload.replace("\n", " ")
+
+        line = f"{recv_ns}\t{kind}\t{payload}\n".encode()
+
+        self.file.write(line)
+
+        self.bytes_written += len(line)
+
+        if kind == FRAME:
+            self.frames += 1
+
+    def _close_file(self):
+        if self.file:
+            self.file.close()
+            self.file = None
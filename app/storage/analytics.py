@@ -0,0 +1,322 @@
+import sqlite3
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.storage.partitions import list_partitions, partition_file
+from app.storage.schema import PRICE_SCALE, SCHEMA_V2, detect_schema_version
+
+# 以 NumPy 陣列一次載入 ticks，所有統計都以向量運算完成，不逐列迴圈
+# 注意: buy_up/buy_down 欄位存的是 Up/Down 的最佳買價 (best bid)
+
+
+class TickArrays:
+    __slots__ = ("market_id", "ts", "up_price", "down_price", "up_size", "down_size")
+
+    def __init__(self, market_id, ts, up_price, down_price, up_size, down_size):
+        self.market_id = market_id
+        self.ts = ts
+        self.up_price = up_price
+        self.down_price = down_price
+        self.up_size = up_size
+        self.down_size = down_size
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> "TickArrays":
+        ticks = cls(
+            np.asarray(columns["market_id"], dtype=np.int64),
+            np.asarray(columns["ts"], dtype=np.int64),
+            np.asarray(columns["buy_up_price"], dtype=np.float64),
+            np.asarray(columns["buy_down_price"], dtype=np.float64),
+            np.asarray(columns["buy_up_size"], dtype=np.float64),
+            np.asarray(columns["buy_down_size"], dtype=np.float64),
+        )
+        ticks._forward_fill()
+
+        return ticks
+
+    def _forward_fill(self):
+        # 每一列只更新其中一邊，另一邊為 NULL 時沿用同市場的上一筆值
+        n = len(self.ts)
+
+        if n == 0:
+            return
+
+        segment_start = _segment_starts(self.market_id)
+
+        for name in ("up_price", "down_price", "up_size", "down_size"):
+            values = getattr(self, name)
+            valid = ~np.isnan(values)
+
+            index = np.where(valid | segment_start, np.arange(n), 0)
+            np.maximum.accumulate(index, out=index)
+
+            setattr(self, name, values[index])
+
+
+def _segment_starts(market_id: np.ndarray) -> np.ndarray:
+    starts = np.empty(len(market_id), dtype=bool)
+
+    if len(market_id):
+        starts[0] = True
+        starts[1:] = market_id[1:] != market_id[:-1]
+
+    return starts
+
+
+def load_ticks(
+    db_path: str,
+    market_id: Optional[int] = None,
+    asset: Optional[str] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+) -> TickArrays:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    try:
+        version = detect_schema_version(row[1] for row in conn.execute("PRAGMA table_info(ticks);"))
+
+        if version == SCHEMA_V2:
+            ts_expr = "t.ts"
+            price_expr = f"t.buy_up_price / {PRICE_SCALE}.0, t.buy_down_price / {PRICE_SCALE}.0"
+            order = "t.market_id, t.ts, t.seq"
+
+        else:
+            ts_expr = "CAST(t.ts AS INTEGER)"
+            price_expr = "t.buy_up_price, t.buy_down_price"
+            # heartbeat / REST 補齊的資料可能不依 ts 順序寫入，不能只靠 id 排序 (與 export 相同)
+            order = "t.market_id, CAST(t.ts AS INTEGER), t.id"
+
+        conditions = []
+        params = []
+
+        if market_id is not None:
+            conditions.append("t.market_id = ?")
+            params.append(market_id)
+
+        if asset is not None:
+            conditions.append("t.market_id IN (SELECT id FROM markets WHERE asset = ?)")
+            params.append(asset.lower())
+
+        if start_ms is not None:
+            conditions.append(f"{ts_expr} >= ?")
+            params.append(start_ms)
+
+        if end_ms is not None:
+            conditions.append(f"{ts_expr} < ?")
+            params.append(end_ms)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        def select(table: str):
+            return conn.execute(f"""
+                SELECT t.market_id, {ts_expr}, {price_expr}, t.buy_up_size, t.buy_down_size
+                FROM {table} t {where}
+                ORDER BY {order}
+            """, params).fetchall()
+
+        partitions = list_partitions(conn, asset, start_ms, end_ms)
+
+        if partitions:
+            # 分區模式: 只讀取時間/資產範圍內的分區檔，markets 仍在主 DB
+            rows = []
+
+            for partition in partitions:
+                conn.execute(
+                    "ATTACH DATABASE ? AS part", (f"file:{partition_file(db_path, partition['path'])}?mode=ro",))
+
+                try:
+                    rows.extend(select("part.ticks"))
+
+                finally:
+                    conn.execute("DETACH DATABASE part")
+
+        else:
+            rows = select("ticks")
+
+    finally:
+        conn.close()
+
+    # None -> NaN，一次轉成 (n, 6) 的 float 陣列
+    data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+    if partitions and len(data):
+        # 跨分區的市場依 (market_id, ts) 重新排序 (stable，保留分區內的順序)
+        data = data[np.lexsort((data[:, 1], data[:, 0]))]
+
+    return TickArrays.from_columns({
+        "market_id": data[:, 0],
+        "ts": data[:, 1],
+        "buy_up_price": data[:, 2],
+        "buy_down_price": data[:, 3],
+        "buy_up_size": data[:, 4],
+        "buy_down_size": data[:, 5],
+    })
+
+
+def load_gaps(db_path: str, market_id: Optional[int] = None) -> np.ndarray:
+    # 回傳 (n, 3) int64 陣列: market_id, start_ms, end_ms (每個受影響市場一列)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'gaps'").fetchone():
+            return np.empty((0, 3), dtype=np.int64)
+
+        where = "WHERE m.value = ?" if market_id is not None else ""
+        params = [market_id] if market_id is not None else []
+
+        rows = conn.execute(f"""
+            SELECT m.value, g.start_ms, g.end_ms
+            FROM gaps g, json_each(g.market_ids) m {where}
+            ORDER BY g.start_ms
+        """, params).fetchall()
+
+    finally:
+        conn.close()
+
+    return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+
+def exclude_gaps(ticks: TickArrays, gaps: np.ndarray) -> TickArrays:
+    # 移除落在斷線缺口 [start_ms, end_ms] 內的 tick (缺口通常只有少數幾筆，逐筆做向量遮罩)
+    keep = np.ones(len(ticks), dtype=bool)
+
+    for market_id, start_ms, end_ms in gaps:
+        keep &= ~((ticks.market_id == market_id) & (ticks.ts >= start_ms) & (ticks.ts <= end_ms))
+
+    return TickArrays(*(getattr(ticks, name)[keep] for name in TickArrays.__slots__))
+
+
+def load_ticks_from_export(export_dir: str, **filters) -> TickArrays:
+    from app.storage.export import read_ticks_numpy
+
+    return TickArrays.from_columns(read_ticks_numpy(export_dir, **filters))
+
+
+def sum_series(ticks: TickArrays) -> np.ndarray:
+    return ticks.up_price + ticks.down_price
+
+
+def spread(ticks: TickArrays) -> np.ndarray:
+    # 與 1.0 (Up + Down 合理價) 的距離，正值代表兩邊加總低於 1
+    return 1.0 - sum_series(ticks)
+
+
+def time_weighted_average(ticks: TickArrays, values: np.ndarray, end_ms: Optional[int] = None) -> float:
+    # 每個值的權重為它維持的時間 (到下一筆 tick，或 end_ms)
+    n = len(ticks)
+
+    if n == 0:
+        return float("nan")
+
+    durations = np.empty(n, dtype=np.float64)
+    durations[:-1] = np.diff(ticks.ts)
+    durations[-1] = (end_ms - ticks.ts[-1]) if end_ms is not None else 0
+
+    # 換市場的那一筆不跨市場計時
+    durations[:-1][_segment_starts(ticks.market_id)[1:]] = 0
+
+    valid = ~np.isnan(values) & (durations > 0)
+    total = durations[valid].sum()
+
+    if total == 0:
+        return float(np.nanmean(values))
+
+    return float((values[valid] * durations[valid]).sum() / total)
+
+
+def resample_ohlc(ticks: TickArrays, interval_ms: int) -> Dict[str, np.ndarray]:
+    n = len(ticks)
+    buckets = ticks.ts - ticks.ts % interval_ms
+
+    change = np.empty(n, dtype=bool)
+
+    if n:
+        change[0] = True
+        change[1:] = (buckets[1:] != buckets[:-1]) | (ticks.market_id[1:] != ticks.market_id[:-1])
+
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n) - 1
+
+    bars = {
+        "market_id": ticks.market_id[starts],
+        "ts": buckets[starts],
+        "ticks": ends - starts + 1,
+    }
+
+    for side in ("up", "down"):
+        price = getattr(ticks, f"{side}_price")
+
+        if n:
+            bars[f"{side}_open"] = price[starts]
+            bars[f"{side}_high"] = np.fmax.reduceat(price, starts)
+            bars[f"{side}_low"] = np.fmin.reduceat(price, starts)
+            bars[f"{side}_close"] = price[ends]
+
+        else:
+            for field in ("open", "high", "low", "close"):
+                bars[f"{side}_{field}"] = np.empty(0)
+
+    return bars
+
+
+def bid_sum_windows(ticks: TickArrays, threshold: float = 1.0) -> Dict[str, np.ndarray]:
+    # Up 最佳買價 + Down 最佳買價 < threshold 的連續區段: 開始/結束時間、持續時間、最低加總與深度
+    # ticks 只存買價，這裡量的是買方報價偏低的區間，不是可成交的套利 (同時買進兩邊要看 ask，見 ArbitrageDetector)
+    n = len(ticks)
+
+    if n == 0:
+        empty_int = np.empty(0, dtype=np.int64)
+        empty_float = np.empty(0, dtype=np.float64)
+
+        return {
+            "market_id": empty_int,
+            "start_ts": empty_int,
+            "end_ts": empty_int,
+            "duration_ms": empty_int,
+            "ticks": empty_int,
+            "min_sum": empty_float,
+            "depth": empty_float,
+        }
+
+    total = sum_series(ticks)
+    below = total < threshold
+
+    segment_start = _segment_starts(ticks.market_id)
+
+    previous = np.zeros(n, dtype=bool)
+    previous[1:] = below[:-1]
+    previous[segment_start] = False
+
+    following = np.zeros(n, dtype=bool)
+    following[:-1] = below[1:]
+    following[np.append(segment_start[1:], True)] = False
+
+    starts = np.flatnonzero(below & ~previous)
+    last = np.flatnonzero(below & ~following)
+
+    # 結束時間為條件不再成立的那一筆；若到市場最後一筆都成立，就以最後一筆為準
+    next_index = np.minimum(last + 1, n - 1)
+    same_market = ticks.market_id[next_index] == ticks.market_id[last]
+    end_ts = np.where(same_market & (last + 1 < n), ticks.ts[next_index], ticks.ts[last])
+
+    if len(starts):
+        # reduceat 以 [start, last + 1) 成對切段，只取偶數位置的結果
+        bounds = np.column_stack([starts, last + 1]).ravel()
+        min_sum = np.fmin.reduceat(np.append(total, np.inf), bounds)[::2]
+
+    else:
+        min_sum = np.empty(0)
+
+    return {
+        "market_id": ticks.market_id[starts],
+        "start_ts": ticks.ts[starts],
+        "end_ts": end_ts,
+        "duration_ms": end_ts - ticks.ts[starts],
+        "ticks": last - starts + 1,
+        "min_sum": min_sum,
+        "depth": threshold - min_sum,
+    }
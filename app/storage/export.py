@@ -0,0 +1,318 @@
+import argparse
+import json
+import logging
+import sqlite3
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.storage.partitions import list_partitions, partition_file
+from app.storage.schema import MARKET_COLUMNS, PRICE_SCALE, SCHEMA_V2, detect_schema_version
+from app.utils.time import WINDOW_INTERVAL
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# 用法: python -m app.storage.export --db data/polymarket.db --out data/export
+# 輸出: <out>/ticks/asset=<asset>/date=<YYYY-MM-DD>/part-<market_id>-<first ts>.parquet
+#       <out>/markets.parquet、<out>/_state.json (每個市場已匯出到的 ts)
+
+TICK_COLUMNS = ("market_id", "ts", "seq", "buy_up_price", "buy_down_price", "buy_up_size", "buy_down_size")
+
+STATE_FILE = "_state.json"
+
+DAY_MS = 86_400_000
+
+# 市場時段前後的緩衝 (預先訂閱、heartbeat 補寫、交易所 timestamp 延遲)
+MARKET_MARGIN_MS = 60_000
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("需要 pyarrow 才能匯出/讀取 Parquet (pip install pyarrow)")
+
+
+def _tick_schema():
+    return pa.schema([
+        ("market_id", pa.int64()),
+        ("ts", pa.int64()),
+        ("seq", pa.int32()),
+        ("buy_up_price", pa.float64()),
+        ("buy_down_price", pa.float64()),
+        ("buy_up_size", pa.float64()),
+        ("buy_down_size", pa.float64()),
+    ])
+
+
+def _load_state(out_dir: Path) -> Dict[str, int]:
+    path = out_dir / STATE_FILE
+
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text())
+
+
+def _save_state(out_dir: Path, state: Dict[str, int]):
+    tmp = out_dir / f"{STATE_FILE}.tmp"
+    tmp.write_text(json.dumps(state))
+    tmp.replace(out_dir / STATE_FILE)
+
+
+def _day(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _tick_query(schema_version: int, table: str = "ticks") -> str:
+    # v1 的 ts 為 epoch ms 字串、價格為 REAL；v2 為整數 ts 與整數 tick
+    # 兩者都依 ts 排序: _write_chunk 以 ts 切分日期，匯出進度也以 ts 記錄
+    if schema_version == SCHEMA_V2:
+        return f"""
+            SELECT market_id, ts, seq,
+                   buy_up_price / {PRICE_SCALE}.0, buy_down_price / {PRICE_SCALE}.0,
+                   buy_up_size, buy_down_size
+            FROM {table}
+            WHERE market_id = ? AND ts > ? AND ts <= ?
+            ORDER BY ts, seq
+        """
+
+    return f"""
+        SELECT market_id, CAST(ts AS INTEGER) AS ts_ms, 0,
+               buy_up_price, buy_down_price, buy_up_size, buy_down_size
+        FROM {table}
+        WHERE market_id = ? AND CAST(ts AS INTEGER) > ? AND CAST(ts AS INTEGER) <= ?
+        ORDER BY ts_ms, id
+    """
+
+
+def _market_bounds(market: Dict) -> Optional[Tuple[int, int]]:
+    # slug 結尾為時段開始的 epoch 秒 (見 gamma.market_slug)；
+    # 時段開始前 WINDOW_PRELOAD_SEC 就已訂閱，結束後 WINDOW_OVERLAP_SEC 內仍會收到資料
+    try:
+        window = int((market.get("slug") or "").rsplit("-", 1)[-1])
+
+    except ValueError:
+        return None
+
+    start = window - settings.WINDOW_PRELOAD_SEC
+    end = window + WINDOW_INTERVAL + settings.WINDOW_OVERLAP_SEC
+
+    return int(start * 1000) - MARKET_MARGIN_MS, int(end * 1000) + MARKET_MARGIN_MS
+
+
+def _needs_export(
+    market: Dict,
+    bounds: Optional[Tuple[int, int]],
+    partition: Optional[Dict],
+    last_ts: int,
+    done_ts: int,
+) -> bool:
+    # 已匯出到本次上界，或已超過市場結束時間
+    if last_ts >= done_ts or (bounds is not None and last_ts >= bounds[1]):
+        return False
+
+    if partition is None:
+        return True
+
+    if (market.get("asset") or "unknown").lower() != partition["asset"]:
+        return False
+
+    # 市場時段與分區時間範圍不重疊
+    return bounds is None or (bounds[0] < partition["end_ms"] and bounds[1] > partition["start_ms"])
+
+
+def _write_chunk(out_dir: Path, asset: str, market_id: int, rows: Sequence[tuple]) -> int:
+    columns = list(zip(*rows))
+    ts_column = columns[1]
+
+    # 依 UTC 日期切開，同一個 chunk 可能跨日
+    start = 0
+    written = 0
+
+    while start < len(rows):
+        day_start = ts_column[start] - ts_column[start] % DAY_MS
+        end = bisect_left(ts_column, day_start + DAY_MS, lo=start)
+
+        table = pa.Table.from_arrays(
+            [pa.array(column[start:end]) for column in columns],
+            schema=_tick_schema(),
+        )
+
+        partition = out_dir / "ticks" / f"asset={asset}" / f"date={_day(day_start)}"
+        partition.mkdir(parents=True, exist_ok=True)
+
+        pq.write_table(table, partition / f"part-{market_id}-{ts_column[start]}.parquet", compression="zstd")
+
+        written += end - start
+        start = end
+
+    return written
+
+
+def export_ticks(db_path: str, out_dir: str, chunk_size: int = 100_000, lag_ms: int = 5000) -> Dict[str, int]:
+    _require_pyarrow()
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    state = _load_state(out)
+
+    # 唯讀連線，不會干擾 Collector 的 WAL 寫入
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    try:
+        schema_version = detect_schema_version(row[1] for row in conn.execute("PRAGMA table_info(ticks);"))
+
+        if schema_version is None:
+            raise RuntimeError(f"{db_path} 沒有 ticks 表")
+
+        market_columns = [row[1] for row in conn.execute("PRAGMA table_info(markets);")]
+        selected = [column for column in MARKET_COLUMNS if column in market_columns]
+        markets = [dict(zip(selected, row)) for row in conn.execute(f"SELECT {', '.join(selected)} FROM markets")]
+
+        pq.write_table(
+            pa.Table.from_pylist(markets),
+            out / "markets.parquet",
+        )
+
+        # 尚未 flush 完的最新資料留到下次匯出，避免同一毫秒的 tick 被切成兩半
+        upper_ts = int(time.time() * 1000) - lag_ms
+
+        total = 0
+
+        bounds = {market["id"]: _market_bounds(market) for market in markets}
+
+        # 分區模式依時間順序逐一掛載分區檔，每個市場的匯出進度仍以 ts 遞增
+        partitions = list_partitions(conn, end_ms=upper_ts + 1)
+
+        for partition in partitions or [None]:
+            # 本次可確定已完整匯出的上界: 分區結束前一毫秒或 upper_ts
+            done_ts = min(upper_ts, partition["end_ms"] - 1) if partition else upper_ts
+
+            pending = [
+                market for market in markets
+                if _needs_export(market, bounds[market["id"]], partition, state.get(str(market["id"]), -1), done_ts)
+            ]
+
+            if not pending:
+                continue
+
+            if partition:
+                conn.execute(
+                    "ATTACH DATABASE ? AS part", (f"file:{partition_file(db_path, partition['path'])}?mode=ro",))
+
+            try:
+                query = _tick_query(schema_version, "part.ticks" if partition else "ticks")
+
+                for market in pending:
+                    market_id = market["id"]
+                    asset = (market.get("asset") or "unknown").lower()
+
+                    cursor = conn.execute(query, (market_id, state.get(str(market_id), -1), upper_ts))
+
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+
+                        if not rows:
+                            break
+
+                        total += _write_chunk(out, asset, market_id, rows)
+
+                    # 查詢範圍內的資料都已寫出，進度直接推進到 done_ts，沒有新資料的市場下次不必再查
+                    state[str(market_id)] = done_ts
+
+                _save_state(out, state)
+
+            finally:
+                if partition:
+                    conn.execute("DETACH DATABASE part")
+
+    finally:
+        conn.close()
+
+    logger.info(f"📦 匯出完成: {total} 筆 ticks -> {out}")
+
+    return {"rows": total, "markets": len(markets)}
+
+
+def read_markets(export_dir: str):
+    _require_pyarrow()
+
+    return pq.read_table(Path(export_dir) / "markets.parquet")
+
+
+def read_ticks(
+    export_dir: str,
+    asset: Optional[str] = None,
+    market_id: Optional[int] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+):
+    _require_pyarrow()
+
+    partitioning = ds.partitioning(pa.schema([("asset", pa.string()), ("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(Path(export_dir) / "ticks", format="parquet", partitioning=partitioning)
+
+    conditions = []
+
+    if asset is not None:
+        conditions.append(ds.field("asset") == asset.lower())
+
+    if market_id is not None:
+        conditions.append(ds.field("market_id") == market_id)
+
+    # 先用 date 分區剪枝，再以 ts 精確過濾
+    if start_ms is not None:
+        conditions.append(ds.field("date") >= _day(start_ms))
+        conditions.append(ds.field("ts") >= start_ms)
+
+    if end_ms is not None:
+        conditions.append(ds.field("date") <= _day(end_ms))
+        conditions.append(ds.field("ts") < end_ms)
+
+    expression = None
+
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    # 檔案讀取順序不保證，有排序欄位時依 (market_id, ts, seq) 排好
+    if {"market_id", "ts", "seq"} <= set(table.column_names):
+        table = table.sort_by([("market_id", "ascending"), ("ts", "ascending"), ("seq", "ascending")])
+
+    return table
+
+
+def read_ticks_numpy(export_dir: str, **filters) -> Dict[str, "object"]:
+    table = read_ticks(export_dir, **filters)
+
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="將 ticks / markets 增量匯出為依資產與日期分區的 Parquet")
+    parser.add_argument("--db", default="data/polymarket.db")
+    parser.add_argument("--out", default="data/export")
+    parser.add_argument("--chunk", type=int, default=100_000, help="每批讀取筆數")
+    parser.add_argument("--lag-ms", type=int, default=5000, help="只匯出早於現在 N ms 的資料")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    export_ticks(args.db, args.out, args.chunk, args.lag_ms)
+
+
+if __name__ == "__main__":
+    main()
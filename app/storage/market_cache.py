@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.clients.gamma import GammaClient, market_slug
+from app.storage.sqlite import SQLiteClient
+from app.utils.time import WINDOW_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class MarketMeta:
+    __slots__ = ("market_id", "slug", "asset", "title", "up_token", "down_token")
+
+    def __init__(self, market_id: int, slug: str, asset: str, title: str, up_token: str, down_token: str):
+        self.market_id = market_id
+        self.slug = slug
+        self.asset = asset
+        self.title = title
+        self.up_token = up_token
+        self.down_token = down_token
+
+    def to_dict(self) -> Dict:
+        return {
+            "market_id": self.market_id,
+            "up_token": self.up_token,
+            "down_token": self.down_token,
+            "slug": self.slug,
+            "asset": self.asset,
+            "title": self.title,
+        }
+
+
+# slug -> 市場資料的快取: 記憶體 -> markets 表 -> Gamma API
+# 只要 markets 表裡有 token 欄位，重啟與重播都不需要網路
+class MarketMetadataCache:
+    def __init__(self, db: SQLiteClient, gamma: Optional[GammaClient] = None):
+        self.db = db
+        self.gamma = gamma
+
+        self.entries: Dict[str, MarketMeta] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def resolve(self, asset: str, start_timestamp: int) -> Optional[MarketMeta]:
+        slug = market_slug(asset, start_timestamp)
+
+        meta = self.entries.get(slug)
+
+        if meta is not None:
+            self.hits += 1
+            return meta
+
+        # 同一個 slug 同時被查詢時 (例如 warm 與排程) 只發一次請求
+        pending = self.inflight.get(slug)
+
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[slug] = future
+
+        try:
+            meta = await self._load(asset.lower(), slug, start_timestamp)
+            future.set_result(meta)
+
+            return meta
+
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+
+        finally:
+            self.inflight.pop(slug, None)
+
+    async def register(self, slug: str, asset: str, title: str, up_token: str, down_token: str) -> Optional[MarketMeta]:
+        market_id = await self.db.upsert_market(slug, asset, title, up_token, down_token)
+
+        if not market_id:
+            return None
+
+        meta = MarketMeta(market_id, slug, asset, title, up_token, down_token)
+        self.entries[slug] = meta
+
+        return meta
+
+    async def warm(self, asset: str, start_timestamp: int, count: int) -> int:
+        timestamps = [start_timestamp + i * WINDOW_INTERVAL for i in range(count)]
+        slugs = [market_slug(asset, ts) for ts in timestamps]
+
+        # 先以一次查詢從 DB 取回已知的市場，其餘才交給 Gamma
+        for row in await self.db.get_markets_by_slugs([slug for slug in slugs if slug not in self.entries]):
+            self._remember(row)
+
+        results = await asyncio.gather(
+            *(self.resolve(asset, ts) for ts in timestamps), return_exceptions=True
+        )
+
+        resolved = sum(1 for result in results if isinstance(result, MarketMeta))
+        logger.info(f"🔥 [{asset}] 預熱 {resolved}/{count} 個時段的市場資料")
+
+        return resolved
+
+    def evict(self, slugs: List[str]):
+        for slug in slugs:
+            self.entries.pop(slug, None)
+
+    async def _load(self, asset: str, slug: str, start_timestamp: int) -> Optional[MarketMeta]:
+        row = await self.db.get_market_by_slug(slug)
+
+        if row and row.get("up_token") and row.get("down_token"):
+            self.db_hits += 1
+            return self._remember(row)
+
+        if self.gamma is None:
+            return None
+
+        self.misses += 1
+
+        market_data = await self.gamma.get_market(asset, start_timestamp)
+
+        if not market_data:
+            return None
+
+        return await self.register(
+            slug,
+            asset,
+            market_data.get("title"),
+            market_data.get("up"),
+            market_data.get("down"),
+        )
+
+    def _remember(self, row: Dict) -> Optional[MarketMeta]:
+        if not row.get("up_token") or not row.get("down_token"):
+            return None
+
+        meta = MarketMeta(
+            row["id"], row["slug"], row["asset"], row["title"], row["up_token"], row["down_token"]
+        )
+        self.entries[meta.slug] = meta
+
+        return meta
@@ -0,0 +1,123 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+
+from app.storage.schema import (
+    INSERT_TICK_SQL,
+    MARKET_COLUMNS,
+    MARKETS_DDL,
+    SCHEMA_V1,
+    SCHEMA_V2,
+    TICKS_DDL,
+    TickSequencer,
+    detect_schema_version,
+    encode_v2,
+)
+
+logger = logging.getLogger(__name__)
+
+# 用法: python -m app.storage.migrate data/polymarket.db data/polymarket_v2.db --chunk 50000
+
+
+def db_size(path: str) -> int:
+    # WAL 模式下尚未 checkpoint 的資料也算在磁碟用量內
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+def migrate_v1_to_v2(src_path: str, dst_path: str, chunk_size: int = 50000) -> dict:
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dst_path)
+
+    try:
+        columns = [row[1] for row in src.execute("PRAGMA table_info(ticks);")]
+
+        if detect_schema_version(columns) != SCHEMA_V1:
+            raise RuntimeError(f"{src_path} 不是 v1 schema，無需轉換")
+
+        if detect_schema_version(row[1] for row in dst.execute("PRAGMA table_info(ticks);")) is not None:
+            raise RuntimeError(f"{dst_path} 已存在 ticks 表，請指定新的目標檔案")
+
+        dst.execute("PRAGMA journal_mode=WAL;")
+        dst.execute("PRAGMA synchronous=NORMAL;")
+
+        for statement in MARKETS_DDL + TICKS_DDL[SCHEMA_V2]:
+            dst.execute(statement)
+
+        dst.execute(f"PRAGMA user_version = {SCHEMA_V2};")
+
+        # markets 保留原本的 id，ticks 的 market_id 才能直接沿用
+        src_market_columns = {row[1] for row in src.execute("PRAGMA table_info(markets);")}
+        market_columns = [column for column in MARKET_COLUMNS if column in src_market_columns]
+
+        dst.executemany(
+            f"INSERT INTO markets ({', '.join(market_columns)}) VALUES ({', '.join('?' for _ in market_columns)})",
+            src.execute(f"SELECT {', '.join(market_columns)} FROM markets ORDER BY id"),
+        )
+        dst.commit()
+
+        sequencer = TickSequencer()
+        insert_sql = INSERT_TICK_SQL[SCHEMA_V2]
+
+        last_id = 0
+        total = 0
+        started = time.perf_counter()
+
+        while True:
+            rows = src.execute("""
+                SELECT id, ts, market_id, buy_up_price, buy_down_price, buy_up_size, buy_down_size
+                FROM ticks WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, chunk_size)).fetchall()
+
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+
+            dst.executemany(insert_sql, encode_v2([row[1:] for row in rows], sequencer))
+            dst.commit()
+
+            total += len(rows)
+            logger.info(f"🔄 已轉換 {total} 筆 (id <= {last_id})")
+
+        elapsed = time.perf_counter() - started
+
+        dst.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+    finally:
+        src.close()
+        dst.close()
+
+    return {
+        "rows": total,
+        "seconds": elapsed,
+        "rows_per_sec": total / elapsed if elapsed > 0 else 0.0,
+        "src_bytes": db_size(src_path),
+        "dst_bytes": db_size(dst_path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="將 ticks 表由 v1 schema 串流轉換為 v2 整數精簡格式")
+    parser.add_argument("src", help="v1 資料庫路徑 (例如 data/polymarket.db)")
+    parser.add_argument("dst", help="輸出的 v2 資料庫路徑")
+    parser.add_argument("--chunk", type=int, default=50000, help="每批讀取/寫入筆數")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    report = migrate_v1_to_v2(args.src, args.dst, args.chunk)
+    rows = max(report["rows"], 1)
+
+    logger.info(
+        f"✅ 轉換完成: {report['rows']} 筆, {report['seconds']:.1f}s ({report['rows_per_sec']:,.0f} rows/s)"
+    )
+    logger.info(
+        f"💾 磁碟用量: {report['src_bytes'] / 1e6:.1f} MB -> {report['dst_bytes'] / 1e6:.1f} MB "
+        f"({report['src_bytes'] / rows:.1f} -> {report['dst_bytes'] / rows:.1f} bytes/row)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.storage.schema import (
+    INSERT_TICK_SQL,
+    PARTITIONS_DDL,
+    SCHEMA_V2,
+    TICKS_DDL,
+    TickSequencer,
+    encode_v2,
+    ts_to_ms,
+)
+
+logger = logging.getLogger(__name__)
+
+# 分區模式: 主 DB 只放 markets 與 partitions 目錄，ticks 依 資產 x 日/週 分檔
+#   data/polymarket.db
+#   data/polymarket-partitions/btc/2026-10-17.db  (day)
+#   data/polymarket-partitions/btc/2026-W42.db    (week)
+# 過期資料以整個檔案刪除，不需要 DELETE + VACUUM
+# 用法: python -m app.storage.partitions list --db data/polymarket.db
+#       python -m app.storage.partitions retain --db data/polymarket.db --days 30
+
+PARTITION_NONE = "none"
+PARTITION_DAY = "day"
+PARTITION_WEEK = "week"
+
+DAY_MS = 86_400_000
+
+PARTITION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+)
+
+
+def partition_root(db_path: str) -> Path:
+    path = Path(db_path)
+
+    return path.parent / f"{path.stem}-partitions"
+
+
+def period_bounds(ts_ms: int, granularity: str) -> Tuple[str, int, int]:
+    day_start = ts_ms - ts_ms % DAY_MS
+
+    if granularity == PARTITION_WEEK:
+        # 1970-01-01 為週四，往前對齊到週一 (ISO week)
+        start = day_start - ((day_start // DAY_MS + 3) % 7) * DAY_MS
+        label = datetime.fromtimestamp(start / 1000, tz=timezone.utc).strftime("%G-W%V")
+
+        return label, start, start + 7 * DAY_MS
+
+    label = datetime.fromtimestamp(day_start / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    return label, day_start, day_start + DAY_MS
+
+
+def has_partitions(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'partitions'"
+    ).fetchone() is not None
+
+
+def list_partitions(
+    conn: sqlite3.Connection,
+    asset: Optional[str] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+) -> List[Dict]:
+    # 查詢路由: 只回傳與 [start_ms, end_ms) 重疊的分區，依時間排序
+    if not has_partitions(conn):
+        return []
+
+    conditions = []
+    params = []
+
+    if asset is not None:
+        conditions.append("asset = ?")
+        params.append(asset.lower())
+
+    if start_ms is not None:
+        conditions.append("end_ms > ?")
+        params.append(start_ms)
+
+    if end_ms is not None:
+        conditions.append("start_ms < ?")
+        params.append(end_ms)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    columns = ("asset", "period", "path", "start_ms", "end_ms")
+
+    rows = conn.execute(
+        f"SELECT {', '.join(columns)} FROM partitions {where} ORDER BY start_ms, asset", params
+    ).fetchall()
+
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def partition_file(db_path: str, relative_path: str) -> Path:
+    return Path(db_path).parent / relative_path
+
+
+class PartitionedTickStore:
+    # 同步 API，供寫入執行緒或 asyncio.to_thread 使用；同一時間只允許一個呼叫者 (內部加鎖)
+    def __init__(
+        self,
+        db_path: str,
+        granularity: str = settings.DB_PARTITION,
+        schema_version: int = settings.DB_SCHEMA_VERSION,
+        max_open: int = 8,
+    ):
+        if granularity not in (PARTITION_DAY, PARTITION_WEEK):
+            raise ValueError(f"不支援的分區方式: {granularity}")
+
+        self.db_path = db_path
+        self.granularity = granularity
+        self.schema_version = schema_version
+        self.max_open = max_open
+
+        self.sql = INSERT_TICK_SQL[schema_version]
+        self.sequencer = TickSequencer()
+
+        self.catalog = sqlite3.connect(db_path, check_same_thread=False)
+
+        for statement in PARTITIONS_DDL:
+            self.catalog.execute(statement)
+
+        self.catalog.commit()
+
+        # 最近使用的分區連線 (通常只有每個資產的當期分區)
+        self.connections: "OrderedDict[Tuple[str, str], sqlite3.Connection]" = OrderedDict()
+        self.market_assets: Dict[int, str] = {}
+
+        self.lock = threading.Lock()
+
+    def write(self, records: Sequence[Tuple]) -> int:
+        # records 為 v1 紀錄格式: (ts, market_id, up_price, down_price, up_size, down_size)
+        groups: Dict[Tuple[str, str, int, int], List[Tuple]] = {}
+
+        with self.lock:
+            for record in records:
+                asset = self._asset_for(record[1])
+                label, start, end = period_bounds(ts_to_ms(record[0]), self.granularity)
+                groups.setdefault((asset, label, start, end), []).append(record)
+
+            written = 0
+
+            for (asset, label, start, end), rows in groups.items():
+                conn = self._connection(asset, label, start, end)
+
+                if self.schema_version == SCHEMA_V2:
+                    rows = encode_v2(rows, self.sequencer)
+
+                cursor = conn.executemany(self.sql, rows)
+                conn.commit()
+
+                if self.schema_version == SCHEMA_V2:
+                    self.sequencer.report_conflicts(len(rows), cursor.rowcount)
+
+                written += len(rows)
+
+            return written
+
+    def evict(self, asset: str, period: str):
+        # 刪除分區檔前先關閉快取中的連線，避免仍持有已刪除的檔案
+        with self.lock:
+            conn = self.connections.pop((asset, period), None)
+
+            if conn is not None:
+                conn.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections.values():
+                conn.close()
+
+            self.connections.clear()
+            self.catalog.close()
+
+    def _asset_for(self, market_id: int) -> str:
+        asset = self.market_assets.get(market_id)
+
+        if asset is None:
+            row = self.catalog.execute("SELECT asset FROM markets WHERE id = ?", (market_id,)).fetchone()
+            asset = (row[0] if row and row[0] else "unknown").lower()
+
+            # 每個時段都是新的 market_id，定期清空讓快取只保留近期市場
+            if len(self.market_assets) >= 1024:
+                self.market_assets.clear()
+
+            self.market_assets[market_id] = asset
+
+        return asset
+
+    def _connection(self, asset: str, label: str, start: int, end: int) -> sqlite3.Connection:
+        key = (asset, label)
+        conn = self.connections.get(key)
+
+        if conn is not None:
+            self.connections.move_to_end(key)
+            return conn
+
+        relative = Path(partition_root(self.db_path).name) / asset / f"{label}.db"
+        path = partition_file(self.db_path, str(relative))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+
+        for pragma in PARTITION_PRAGMAS:
+            conn.execute(pragma)
+
+        for statement in TICKS_DDL[self.schema_version]:
+            conn.execute(statement)
+
+        conn.execute(f"PRAGMA user_version = {self.schema_version};")
+        conn.commit()
+
+        self.catalog.execute("""
+            INSERT OR IGNORE INTO partitions (asset, period, path, start_ms, end_ms, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (asset, label, str(relative), start, end, datetime.now().isoformat()))
+        self.catalog.commit()
+
+        self.connections[key] = conn
+
+        while len(self.connections) > self.max_open:
+            _, oldest = self.connections.popitem(last=False)
+            oldest.close()
+
+        logger.info(f"🗂️ 開啟分區 {asset} {label}: {path}")
+
+        return conn
+
+
+def drop_expired_partitions(
+    db_path: str,
+    retention_days: float,
+    now_ms: Optional[int] = None,
+    store: Optional[PartitionedTickStore] = None,
+) -> List[Dict]:
+    # 保留策略: 整個分區結束時間早於 now - retention_days 就刪除檔案；
+    # 各資產最新的分區一律保留 (可能仍在寫入)
+    # store: 寫入端正在使用的 PartitionedTickStore，刪檔前先關閉它快取的連線
+    if retention_days <= 0:
+        return []
+
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+
+    cutoff = now_ms - int(retention_days * DAY_MS)
+    conn = sqlite3.connect(db_path)
+
+    try:
+        if not has_partitions(conn):
+            return []
+
+        expired = conn.execute("""
+            SELECT asset, period, path, start_ms, end_ms FROM partitions p
+            WHERE end_ms <= ?
+              AND start_ms < (SELECT MAX(start_ms) FROM partitions WHERE asset = p.asset)
+        """, (cutoff,)).fetchall()
+
+        dropped = []
+
+        for asset, period, relative, start, end in expired:
+            path = partition_file(db_path, relative)
+
+            if store is not None:
+                store.evict(asset, period)
+
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+            conn.execute("DELETE FROM partitions WHERE asset = ? AND period = ?", (asset, period))
+            dropped.append({"asset": asset, "period": period, "path": relative})
+
+        conn.commit()
+
+    finally:
+        conn.close()
+
+    if dropped:
+        logger.info(f"🧹 已刪除 {len(dropped)} 個過期分區 (保留 {retention_days} 天)")
+
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ticks 分區管理")
+    parser.add_argument("command", choices=("list", "retain"))
+    parser.add_argument("--db", default="data/polymarket.db")
+    parser.add_argument("--asset", default=None)
+    parser.add_argument("--days", type=float, default=settings.DB_RETENTION_DAYS, help="保留天數 (retain)")
+    args = parser.parse_args()
+
+    if args.command == "retain":
+        for item in drop_expired_partitions(args.db, args.days):
+            print(f"dropped {item['asset']} {item['period']} {item['path']}")
+
+        return
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+
+    try:
+        for item in list_partitions(conn, asset=args.asset):
+            path = partition_file(args.db, item["path"])
+            size = path.stat().st_size if path.exists() else 0
+
+            print(f"{item['asset']:<8} {item['period']:<12} {size / 1e6:>9.2f} MB  {item['path']}")
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
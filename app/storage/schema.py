@@ -0,0 +1,240 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.metrics import TICK_CONFLICTS
+
+logger = logging.getLogger(__name__)
+
+# v1: ts TEXT / 價格 REAL / AUTOINCREMENT id + (market_id, ts) 索引
+# v2: ts 為 epoch ms 整數、價格以整數 tick 儲存、(market_id, ts, seq) 為 WITHOUT ROWID 叢集主鍵
+SCHEMA_V1 = 1
+SCHEMA_V2 = 2
+
+# Polymarket 最小 tick 為 0.0001 (見 py_clob_client ROUNDING_CONFIG)
+PRICE_SCALE = 10000
+
+MARKETS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS markets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        slug TEXT UNIQUE,
+        asset TEXT NOT NULL,
+        title TEXT,
+        created_at TEXT,
+        up_token TEXT,
+        down_token TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_markets_asset ON markets(asset);",
+]
+
+# 舊版 markets 表沒有 token 欄位，連線時補上
+MARKETS_ADDED_COLUMNS = {
+    "up_token": "ALTER TABLE markets ADD COLUMN up_token TEXT;",
+    "down_token": "ALTER TABLE markets ADD COLUMN down_token TEXT;",
+}
+
+MARKET_COLUMNS = ("id", "slug", "asset", "title", "created_at", "up_token", "down_token")
+
+TICKS_DDL = {
+    SCHEMA_V1: [
+        """
+        CREATE TABLE IF NOT EXISTS ticks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            market_id INTEGER NOT NULL,
+            ts TEXT NOT NULL,
+            buy_up_price REAL,
+            buy_down_price REAL,
+            buy_up_size REAL,
+            buy_down_size REAL,
+            FOREIGN KEY(market_id) REFERENCES markets(id)
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_market_ts ON ticks (market_id, ts);",
+    ],
+    SCHEMA_V2: [
+        """
+        CREATE TABLE IF NOT EXISTS ticks (
+            market_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            buy_up_price INTEGER,
+            buy_down_price INTEGER,
+            buy_up_size REAL,
+            buy_down_size REAL,
+            PRIMARY KEY (market_id, ts, seq)
+        ) WITHOUT ROWID;
+        """,
+    ],
+}
+
+# WebSocket 斷線造成的資料缺口 (tokens / market_ids 為 JSON 陣列)，分析時可排除這些區間
+GAPS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS gaps (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        start_ms INTEGER NOT NULL,
+        end_ms INTEGER NOT NULL,
+        connection TEXT,
+        tokens TEXT,
+        market_ids TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_gaps_start ON gaps (start_ms);",
+]
+
+# 分區模式下主 DB 的分區目錄 (path 為相對於主 DB 所在資料夾的路徑)
+PARTITIONS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS partitions (
+        asset TEXT NOT NULL,
+        period TEXT NOT NULL,
+        path TEXT NOT NULL,
+        start_ms INTEGER NOT NULL,
+        end_ms INTEGER NOT NULL,
+        created_at TEXT,
+        PRIMARY KEY (asset, period)
+    ) WITHOUT ROWID;
+    """,
+]
+
+INSERT_TICK_SQL = {
+    SCHEMA_V1: """
+        INSERT INTO ticks (ts, market_id, buy_up_price, buy_down_price, buy_up_size, buy_down_size)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    SCHEMA_V2: """
+        INSERT OR IGNORE INTO ticks (market_id, ts, seq, buy_up_price, buy_down_price, buy_up_size, buy_down_size)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+
+def detect_schema_version(tick_columns: Iterable[str]) -> Optional[int]:
+    columns = set(tick_columns)
+
+    if not columns:
+        return None
+
+    return SCHEMA_V2 if "seq" in columns else SCHEMA_V1
+
+
+def price_to_ticks(price) -> Optional[int]:
+    if price is None:
+        return None
+
+    return int(round(float(price) * PRICE_SCALE))
+
+
+def ticks_to_price(ticks: Optional[int]) -> Optional[float]:
+    if ticks is None:
+        return None
+
+    return ticks / PRICE_SCALE
+
+
+def ts_to_ms(ts) -> int:
+    if ts is None:
+        return int(datetime.now().timestamp() * 1000)
+
+    if isinstance(ts, (int, float)):
+        return int(ts)
+
+    if ts.isdigit():
+        return int(ts)
+
+    return int(datetime.fromisoformat(ts).timestamp() * 1000)
+
+
+class TickRecord(NamedTuple):
+    # v1 紀錄格式，從 Collector 一路交給寫入端；本身就是 tuple，可直接 executemany
+    ts: Optional[int]
+    market_id: int
+    up_price: Optional[float]
+    down_price: Optional[float]
+    up_size: Optional[float]
+    down_size: Optional[float]
+
+
+class TickSequencer:
+    # 同一市場同一毫秒的多筆 tick 以 seq 區分 (例如同一個 price_change 同時更新 Up/Down)
+    # 以 (market, ts) 計數: ts 亂序 (heartbeat 以本機時間補寫、REST 補齊的舊快照) 回到較舊的毫秒時 seq 也不會重複
+    # 每個市場只保留最新 ts 之前 window_ms 內的計數；已經 prune_after_ms 沒有新 tick 的市場整個清掉
+    def __init__(self, window_ms: int = 60_000, prune_after_ms: int = 3_600_000):
+        self.counters: Dict[int, Dict[int, int]] = {}
+        self.latest: Dict[int, int] = {}
+
+        self.window_ms = window_ms
+        self.prune_after_ms = prune_after_ms
+        self.pruned_at = 0
+
+        # 主鍵衝突而被 INSERT OR IGNORE 略過的筆數 (超出 window_ms 的亂序或重啟前已寫入的 ts)
+        self.conflicts = 0
+
+    def next(self, market_id: int, ts_ms: int) -> int:
+        counters = self.counters.get(market_id)
+
+        if counters is None:
+            counters = self.counters[market_id] = {}
+            self.latest[market_id] = ts_ms
+
+        elif ts_ms > self.latest[market_id]:
+            self.latest[market_id] = ts_ms
+
+        seq = counters.get(ts_ms, 0)
+        counters[ts_ms] = seq + 1
+
+        if ts_ms - self.pruned_at > self.window_ms:
+            self.prune(ts_ms)
+            self.pruned_at = ts_ms
+
+        return seq
+
+    def prune(self, now_ms: int):
+        for market_id, latest in list(self.latest.items()):
+            if latest < now_ms - self.prune_after_ms:
+                self.forget(market_id)
+                continue
+
+            counters = self.counters[market_id]
+            cutoff = latest - self.window_ms
+
+            for ts_ms in [ts_ms for ts_ms in counters if ts_ms < cutoff]:
+                del counters[ts_ms]
+
+    def forget(self, market_id: int):
+        self.counters.pop(market_id, None)
+        self.latest.pop(market_id, None)
+
+    def report_conflicts(self, expected: int, inserted: int):
+        # v2 寫入後呼叫: executemany 的 rowcount 少於送出的筆數代表有資料被主鍵衝突略過
+        ignored = expected - inserted
+
+        if ignored <= 0:
+            return
+
+        self.conflicts += ignored
+        TICK_CONFLICTS.inc(ignored)
+
+        logger.warning(f"⚠️ {ignored} 筆 tick 與既有 (market_id, ts, seq) 衝突而未寫入 (累計 {self.conflicts})")
+
+
+def encode_v2(records: Sequence[Tuple], sequencer: TickSequencer) -> List[Tuple]:
+    # v1 紀錄格式: (ts, market_id, up_price, down_price, up_size, down_size)
+    encoded = []
+
+    for ts, market_id, up_price, down_price, up_size, down_size in records:
+        ts_ms = ts_to_ms(ts)
+
+        encoded.append((
+            market_id,
+            ts_ms,
+            sequencer.next(market_id, ts_ms),
+            price_to_ticks(up_price),
+            price_to_ticks(down_price),
+            up_size,
+            down_size,
+        ))
+
+    return encoded
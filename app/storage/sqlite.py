@@ -1,98 +1,202 @@
 import aiosqlite
+import asyncio
+import json
 import logging
+import time
 from datetime import datetime
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+from app.config import settings
+from app.core.profiling import profiler
+from app.storage.partitions import PARTITION_NONE, PartitionedTickStore
+from app.storage.schema import (
+    GAPS_DDL,
+    INSERT_TICK_SQL,
+    MARKET_COLUMNS,
+    MARKETS_ADDED_COLUMNS,
+    MARKETS_DDL,
+    SCHEMA_V2,
+    TICKS_DDL,
+    TickSequencer,
+    detect_schema_version,
+    encode_v2,
+)
 
 logger = logging.getLogger(__name__)
 
+STAGE_EXECUTE = profiler.stage("db_executemany")
+STAGE_COMMIT = profiler.stage("db_commit")
+
 
 class SQLiteClient:
-    def __init__(self, db_path: str = "data/polymarke.db"):
+    def __init__(
+        self,
+        db_path: str = "data/polymarke.db",
+        schema_version: int = settings.DB_SCHEMA_VERSION,
+        partition: str = settings.DB_PARTITION,
+    ):
         self.db_path = db_path
         self.conn = None
 
+        self.schema_version = schema_version
+        self.sequencer = TickSequencer()
+
+        self.partition = partition
+        self.partitions: Optional[PartitionedTickStore] = None
+
     async def connect(self):
         self.conn = await aiosqlite.connect(self.db_path)
 
         await self.conn.execute("PRAGMA journal_mode=WAL;")
         await self._create_tables()
 
-        logger.info(f"💾 SQLite 連線成功: {self.db_path}")
+        logger.info(f"💾 SQLite 連線成功: {self.db_path} (分區: {self.partition})")
 
     async def close(self):
+        if self.partitions:
+            self.partitions.close()
+            self.partitions = None
+
         if self.conn:
             await self.conn.close()
             logger.info("🛑 SQLite 連線已關閉")
 
     async def _create_tables(self):
+        async with self.conn.execute("PRAGMA table_info(ticks);") as cursor:
+            existing_version = detect_schema_version(row[1] for row in await cursor.fetchall())
+
+        if existing_version is not None and existing_version != self.schema_version:
+            raise RuntimeError(
+                f"ticks 表為 v{existing_version} schema，與設定的 v{self.schema_version} 不符 "
+                f"(請使用 python -m app.storage.migrate 轉換)"
+            )
+
         # market table
-        await self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS markets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                slug TEXT UNIQUE,
-                asset TEXT NOT NULL,
-                title TEXT,
-                created_at TEXT
-            );
-        """)
-
-        await self.conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_markets_asset ON markets(asset);
-        """)
+        for statement in MARKETS_DDL:
+            await self.conn.execute(statement)
+
+        async with self.conn.execute("PRAGMA table_info(markets);") as cursor:
+            market_columns = {row[1] for row in await cursor.fetchall()}
+
+        for column, statement in MARKETS_ADDED_COLUMNS.items():
+            if column not in market_columns:
+                await self.conn.execute(statement)
 
         # ticks table
-        await self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS ticks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                market_id INTEGER NOT NULL,
-                ts TEXT NOT NULL,
-                buy_up_price REAL,
-                buy_down_price REAL,
-                buy_up_size REAL,
-                buy_down_size REAL,
-                FOREIGN KEY(market_id) REFERENCES markets(id)
-            );
-        """)
-
-        await self.conn.execute("CREATE INDEX IF NOT EXISTS idx_market_ts ON ticks (market_id, ts);")
+        for statement in TICKS_DDL[self.schema_version]:
+            await self.conn.execute(statement)
+
+        for statement in GAPS_DDL:
+            await self.conn.execute(statement)
+
+        await self.conn.execute(f"PRAGMA user_version = {self.schema_version};")
         await self.conn.commit()
 
-    async def get_or_create_market(self, slug: str, asset: str, title: str) -> Optional[int]:
+    async def get_market_by_slug(self, slug: str) -> Optional[Dict]:
+        if not self.conn:
+            return None
+
+        async with self.conn.execute(
+            f"SELECT {', '.join(MARKET_COLUMNS)} FROM markets WHERE slug = ?", (slug,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        return dict(zip(MARKET_COLUMNS, row)) if row else None
+
+    async def get_markets_by_slugs(self, slugs: List[str]) -> List[Dict]:
+        if not self.conn or not slugs:
+            return []
+
+        placeholders = ", ".join("?" for _ in slugs)
+
+        async with self.conn.execute(
+            f"SELECT {', '.join(MARKET_COLUMNS)} FROM markets WHERE slug IN ({placeholders})", slugs
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        return [dict(zip(MARKET_COLUMNS, row)) for row in rows]
+
+    async def upsert_market(
+        self, slug: str, asset: str, title: str, up_token: str, down_token: str
+    ) -> Optional[int]:
         if not self.conn:
             return None
 
         created_at = datetime.now().isoformat()
 
         try:
+            # 已存在的市場只補上缺少的欄位，id 不變
+            await self.conn.execute("""
+                INSERT INTO markets (slug, asset, title, created_at, up_token, down_token)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(slug) DO UPDATE SET
+                    title = COALESCE(markets.title, excluded.title),
+                    up_token = COALESCE(markets.up_token, excluded.up_token),
+                    down_token = COALESCE(markets.down_token, excluded.down_token)
+            """, (slug, asset, title, created_at, up_token, down_token))
+
+            await self.conn.commit()
+
             async with self.conn.execute("SELECT id FROM markets WHERE slug = ?", (slug,)) as cursor:
                 row = await cursor.fetchone()
 
-                if row:
-                    return row[0]
+            return row[0] if row else None
 
-            cursor = await self.conn.execute("""
-                INSERT INTO markets (slug, asset, title, created_at)
-                VALUES (?, ?, ?, ?)
-            """, (slug, asset, title, created_at))
+        except Exception as e:
+            logger.error(f"❌ 儲存 Market 失敗: {e}")
+            return None
+
+    async def save_gap(
+        self, start_ms: int, end_ms: int, connection: str, tokens: List[str], market_ids: List[int]
+    ):
+        if not self.conn:
+            return
+
+        try:
+            await self.conn.execute("""
+                INSERT INTO gaps (start_ms, end_ms, connection, tokens, market_ids)
+                VALUES (?, ?, ?, ?, ?)
+            """, (start_ms, end_ms, connection, json.dumps(tokens), json.dumps(market_ids)))
 
             await self.conn.commit()
-            return cursor.lastrowid
 
         except Exception as e:
-            logger.error(f"❌ 儲存 Market 失敗: {e}")
-            return None
+            logger.error(f"❌ 儲存資料缺口失敗: {e}")
 
     async def save_ticks_batch(self, records: List[Tuple]):
         if not self.conn or not records:
             return
 
+        if self.partition != PARTITION_NONE:
+            try:
+                # 只在實際由 aiosqlite 寫入 ticks 時才建立 (thread 模式由 TickWriter 自己持有一份)
+                if self.partitions is None:
+                    self.partitions = PartitionedTickStore(self.db_path, self.partition, self.schema_version)
+
+                await asyncio.to_thread(self.partitions.write, records)
+
+            except Exception as e:
+                logger.error(f"❌ 分區寫入失敗: {e}")
+
+            return
+
+        if self.schema_version == SCHEMA_V2:
+            records = encode_v2(records, self.sequencer)
+
         try:
-            await self.conn.executemany("""
-                INSERT INTO ticks (ts, market_id, buy_up_price, buy_down_price, buy_up_size, buy_down_size)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, records)
+            execute_start = time.perf_counter_ns()
+            cursor = await self.conn.executemany(INSERT_TICK_SQL[self.schema_version], records)
 
+            commit_start = time.perf_counter_ns()
             await self.conn.commit()
+
+            if self.schema_version == SCHEMA_V2:
+                self.sequencer.report_conflicts(len(records), cursor.rowcount)
+
+            if profiler.enabled:
+                STAGE_EXECUTE.add(commit_start - execute_start)
+                STAGE_COMMIT.add(time.perf_counter_ns() - commit_start)
+
             logger.debug(f"💾 成功寫入 {len(records)} 筆資料")
 
         except Exception as e:
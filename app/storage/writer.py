@@ -0,0 +1,259 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.core.metrics import BATCH_ROWS, SAVE_SECONDS
+from app.core.profiling import profiler
+from app.storage.partitions import PARTITION_NONE, PartitionedTickStore
+from app.storage.schema import INSERT_TICK_SQL, SCHEMA_V2, TickSequencer, encode_v2
+
+logger = logging.getLogger(__name__)
+
+STAGE_EXECUTE = profiler.stage("db_executemany")
+STAGE_COMMIT = profiler.stage("db_commit")
+
+# 寫入專用連線的 pragma: WAL + synchronous=NORMAL 下 commit 不必等 fsync，
+# 斷電最多遺失最後幾個 transaction，但 DB 不會損毀
+# page cache 會隨 DB 成長一路填滿到上限 (常駐記憶體)，append 寫入只需要索引尾端的頁面
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    f"PRAGMA cache_size=-{settings.DB_WRITER_CACHE_MB * 1024};",
+    "PRAGMA wal_autocheckpoint=10000;",
+)
+
+
+class TickWriter:
+    # ticks 寫入子系統: 專屬執行緒 + 專屬 sqlite3 連線，event loop 只負責 append
+    # - handoff: collections.deque 的 append / popleft 在 CPython 中為原子操作，不需要鎖
+    # - group commit: 累積到 batch_target 筆或距上次 commit 超過 max_delay_ms 即寫入
+    # - batch_target 依流入速率調整 (約為 max_delay_ms 內會收到的筆數)
+    # schema 由 SQLiteClient.connect() 建立，需在其之後 start()
+    # 執行緒啟動或寫入迴圈失敗時記錄在 error，之後 submit() 回傳 False，由呼叫端取回未寫入的資料改走其他路徑
+    def __init__(
+        self,
+        db_path: str,
+        schema_version: int = settings.DB_SCHEMA_VERSION,
+        max_delay_ms: int = settings.DB_WRITER_MAX_DELAY_MS,
+        min_batch: int = 50,
+        max_batch: int = settings.DB_WRITER_MAX_BATCH,
+        partition: str = settings.DB_PARTITION,
+    ):
+        self.db_path = db_path
+        self.schema_version = schema_version
+        self.max_delay = max_delay_ms / 1000
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+
+        self.sql = INSERT_TICK_SQL[schema_version]
+        self.sequencer = TickSequencer()
+
+        # 分區模式下由 PartitionedTickStore 依資產與時間分檔寫入
+        self.partition = partition
+        self.store: Optional[PartitionedTickStore] = None
+
+        self.queue: deque = deque()
+        self.batch_target = min_batch
+
+        # commit 後於寫入執行緒呼叫 (壓測用來量測延遲)
+        self.on_commit: Optional[Callable[[Sequence[Tuple]], None]] = None
+
+        self.submitted = 0
+        self.written = 0
+        self.commits = 0
+        self.errors = 0
+
+        self.error: Optional[BaseException] = None
+
+        self._wakeup = threading.Event()
+        self._ready = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def backlog(self) -> int:
+        return self.submitted - self.written - self.errors
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float = 10):
+        # 等待連線與 pragma 設定完成，初始化失敗時直接拋出
+        self._thread = threading.Thread(target=self._run, name="tick-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+
+        if self.error is not None:
+            raise self.error
+
+        logger.info(f"💾 Tick 寫入執行緒啟動 (最長延遲 {self.max_delay * 1000:.0f} ms)")
+
+    def submit(self, records: List[Tuple]) -> bool:
+        # 由 event loop 呼叫，不會阻塞；寫入執行緒已停止時不再收資料，回傳 False
+        if not records:
+            return True
+
+        if not self.alive:
+            return False
+
+        self.queue.append(records)
+        self.submitted += len(records)
+
+        if self.backlog >= self.batch_target:
+            self._wakeup.set()
+
+        return True
+
+    def take_unwritten(self) -> List[Tuple]:
+        # 寫入執行緒停止後取回尚未寫入的資料
+        records: List[Tuple] = []
+
+        while self.queue:
+            records.extend(self.queue.popleft())
+
+        self.submitted -= len(records)
+
+        return records
+
+    def stop(self, timeout: float = 30):
+        # 阻塞直到剩餘資料寫完，從 event loop 呼叫時請透過 asyncio.to_thread
+        self._closing = True
+        self._wakeup.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+
+        logger.info(f"💾 Tick 寫入執行緒結束 {self.stats()}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "commits": self.commits,
+            "errors": self.errors,
+            "batch_target": self.batch_target,
+        }
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_path)
+
+            for pragma in WRITER_PRAGMAS:
+                conn.execute(pragma)
+
+            if self.partition != PARTITION_NONE:
+                self.store = PartitionedTickStore(self.db_path, self.partition, self.schema_version)
+
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ Tick 寫入執行緒初始化失敗: {e}", exc_info=True)
+            return
+
+        finally:
+            self._ready.set()
+
+        pending: List[Tuple] = []
+        last_commit = time.monotonic()
+        rate = 0.0
+
+        try:
+            while True:
+                self._wakeup.wait(self.max_delay)
+                self._wakeup.clear()
+
+                while self.queue:
+                    pending.extend(self.queue.popleft())
+
+                now = time.monotonic()
+                elapsed = now - last_commit
+
+                if pending and (len(pending) >= self.batch_target or elapsed >= self.max_delay or self._closing):
+                    # 以 EWMA 估計每秒流入筆數，batch 目標 = 一個 max_delay 內的預期筆數
+                    rate = 0.8 * rate + 0.2 * (len(pending) / max(elapsed, 1e-3))
+                    self.batch_target = int(min(self.max_batch, max(self.min_batch, rate * self.max_delay)))
+
+                    for start in range(0, len(pending), self.max_batch):
+                        self._write(conn, pending[start:start + self.max_batch])
+
+                    pending = []
+                    last_commit = now
+
+                if self._closing and not self.queue and not pending:
+                    return
+
+        except Exception as e:
+            # 放回佇列前端，讓呼叫端以 take_unwritten() 取回
+            if pending:
+                self.queue.appendleft(pending)
+
+            self.error = e
+            logger.error(f"❌ Tick 寫入執行緒異常終止: {e}", exc_info=True)
+
+        finally:
+            if self.store:
+                self.store.close()
+
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, records: List[Tuple]):
+        if self.store:
+            self._write_partitioned(records)
+            return
+
+        if self.schema_version == SCHEMA_V2:
+            rows = encode_v2(records, self.sequencer)
+
+        else:
+            rows = records
+
+        try:
+            execute_start = time.perf_counter_ns()
+            cursor = conn.executemany(self.sql, rows)
+
+            commit_start = time.perf_counter_ns()
+            conn.commit()
+            commit_end = time.perf_counter_ns()
+
+        except Exception as e:
+            conn.rollback()
+            self.errors += len(records)
+            logger.error(f"❌ 批次寫入失敗 ({len(records)} 筆): {e}")
+            return
+
+        if self.schema_version == SCHEMA_V2:
+            self.sequencer.report_conflicts(len(rows), cursor.rowcount)
+
+        if profiler.enabled:
+            STAGE_EXECUTE.add(commit_start - execute_start)
+            STAGE_COMMIT.add(commit_end - commit_start)
+
+        self._committed(records, commit_end - execute_start)
+
+    def _write_partitioned(self, records: List[Tuple]):
+        write_start = time.perf_counter_ns()
+
+        try:
+            self.store.write(records)
+
+        except Exception as e:
+            self.errors += len(records)
+            logger.error(f"❌ 分區寫入失敗 ({len(records)} 筆): {e}")
+            return
+
+        self._committed(records, time.perf_counter_ns() - write_start)
+
+    def _committed(self, records: List[Tuple], elapsed_ns: int):
+        self.written += len(records)
+        self.commits += 1
+
+        BATCH_ROWS.observe(len(records))
+        SAVE_SECONDS.observe(elapsed_ns / 1e9)
+
+        if self.on_commit:
+            self.on_commit(records)
@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.config import settings
+from app.orderbook.book import OrderBookManager
+
+logger = logging.getLogger(__name__)
+
+
+class ArbitrageOpportunity:
+    __slots__ = (
+        "market_id",
+        "up_token",
+        "down_token",
+        "up_ask",
+        "down_ask",
+        "up_size",
+        "down_size",
+        "size",
+        "cost",
+        "edge",
+        "timestamp",
+        "opened_ns",
+        "latency_ns",
+        "active",
+    )
+
+    def __init__(self, market_id, up_token: str, down_token: str):
+        self.market_id = market_id
+        self.up_token = up_token
+        self.down_token = down_token
+
+        self.up_ask = 0.0
+        self.down_ask = 0.0
+        self.up_size = 0.0
+        self.down_size = 0.0
+
+        self.size = 0.0
+        self.cost = 0.0
+        self.edge = 0.0
+
+        self.timestamp: Optional[int] = None
+        self.opened_ns = 0
+        self.latency_ns = 0
+        self.active = False
+
+
+# Up + Down 兩邊的最佳賣價 (含手續費) 低於 1 即可同時買進鎖定利潤
+# 每個市場只配置一個 ArbitrageOpportunity 並就地更新，熱路徑上不產生新物件；
+# handler 若要保留事件內容需自行複製
+class ArbitrageDetector:
+    def __init__(
+        self,
+        order_books: OrderBookManager,
+        fee_rate: float = settings.ARB_FEE_RATE,
+        min_edge: float = settings.ARB_MIN_EDGE,
+    ):
+        self.order_books = order_books
+
+        self.fee_multiplier = 1.0 + fee_rate
+        self.threshold = 1.0 - min_edge
+
+        self.opportunities: Dict[object, ArbitrageOpportunity] = {}
+        self.handlers: List[Callable[[ArbitrageOpportunity], None]] = []
+
+        self.signals = 0
+
+    def add_handler(self, handler: Callable[[ArbitrageOpportunity], None]):
+        self.handlers.append(handler)
+
+    def register_market(self, market_id, up_token: str, down_token: str):
+        self.opportunities[market_id] = ArbitrageOpportunity(market_id, up_token, down_token)
+
+    def remove_market(self, market_id):
+        self.opportunities.pop(market_id, None)
+
+    def on_book_update(self, market_id, recv_ns: int, timestamp: Optional[int] = None) -> bool:
+        opp = self.opportunities.get(market_id)
+
+        if opp is None:
+            return False
+
+        up_book = self.order_books.get(opp.up_token)
+        down_book = self.order_books.get(opp.down_token)
+
+        if up_book is None or down_book is None:
+            return False
+
+        up_ask = up_book.best_ask_price
+        down_ask = down_book.best_ask_price
+
+        if up_ask is None or down_ask is None:
+            return self._close(opp)
+
+        cost = (up_ask + down_ask) * self.fee_multiplier
+
+        if cost >= self.threshold:
+            return self._close(opp)
+
+        # 快照的數量可能仍是原始字串
+        up_size = float(up_book.asks[up_ask])
+        down_size = float(down_book.asks[down_ask])
+
+        # 同一個價格/數量的機會只通知一次
+        if (
+            opp.active
+            and opp.up_ask == up_ask
+            and opp.down_ask == down_ask
+            and opp.up_size == up_size
+            and opp.down_size == down_size
+        ):
+            return True
+
+        now_ns = time.perf_counter_ns()
+
+        if not opp.active:
+            opp.active = True
+            opp.opened_ns = now_ns
+
+        opp.up_ask = up_ask
+        opp.down_ask = down_ask
+        opp.up_size = up_size
+        opp.down_size = down_size
+
+        opp.size = up_size if up_size < down_size else down_size
+        opp.cost = cost
+        opp.edge = 1.0 - cost
+        opp.timestamp = timestamp
+        opp.latency_ns = now_ns - recv_ns
+
+        self.signals += 1
+
+        for handler in self.handlers:
+            try:
+                handler(opp)
+
+            except Exception as e:
+                logger.error(f"❌ 套利事件處理失敗: {e}")
+
+        return True
+
+    def _close(self, opp: ArbitrageOpportunity) -> bool:
+        if opp.active:
+            opp.active = False
+
+            duration_ms = (time.perf_counter_ns() - opp.opened_ns) / 1e6
+            logger.info(f"🔚 套利機會結束 (Market: {opp.market_id}, 持續 {duration_ms:.1f} ms)")
+
+        return False
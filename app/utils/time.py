@@ -1,11 +1,11 @@
 import time
 
+WINDOW_INTERVAL = 900  # 15 * 60 sec
+
 
 def get_current_window_timestamp():
     now = time.time()
 
-    INTERVAL = 900  # 15 * 60 sec
-
-    window_start = int((now // INTERVAL) * INTERVAL)
+    window_start = int((now // WINDOW_INTERVAL) * WINDOW_INTERVAL)
 
-    return window_start 
+    return window_start
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Collector 與 DB 寫入之間的緩衝區，滿載時以「最新值覆蓋」取代丟棄
+# - interval_ms == 0: 每個 tick 都保留；超過 max_rows 後改為每個市場只保留最新一筆
+# - interval_ms > 0 : 每個市場每 interval_ms 最多寫入一筆 (未寫入的快照直接被覆蓋)
+# 記憶體上限為 max_rows + 市場數量，與訊息速率無關
+class ConflatingBuffer:
+    def __init__(
+        self,
+        interval_ms: int = settings.COLLECTOR_CONFLATE_MS,
+        max_rows: int = settings.COLLECTOR_BUFFER_MAX,
+        flush_size: int = 50,
+    ):
+        self.interval_ms = interval_ms
+        self.max_rows = max_rows
+        self.flush_size = flush_size
+
+        # 依序保留的 tick (interval_ms == 0)
+        self.rows: List[Any] = []
+
+        # 以市場為 key、就地覆蓋的待寫入快照
+        self.latest: Dict[Any, Any] = {}
+
+        self.received = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.flushed = 0
+
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.rows) + len(self.latest)
+
+    @property
+    def conflating(self) -> bool:
+        return self.interval_ms > 0
+
+    def put(self, market_id, row):
+        if self.closed:
+            self.dropped += 1
+            return
+
+        self.received += 1
+
+        if self.interval_ms <= 0 and len(self.rows) < self.max_rows:
+            self.rows.append(row)
+
+        else:
+            if market_id in self.latest:
+                self.conflated += 1
+
+            self.latest[market_id] = row
+
+        if len(self) >= self.flush_size:
+            self._ready.set()
+
+    def drain(self) -> List[Any]:
+        rows = self.rows
+
+        if self.latest:
+            rows.extend(self.latest.values())
+            self.latest = {}
+
+        self.rows = []
+        self.flushed += len(rows)
+
+        return rows
+
+    async def wait(self, timeout: float):
+        # interval 模式固定節奏出清；tick 模式累積到 flush_size 或逾時就出清
+        if self.conflating:
+            await asyncio.sleep(min(self.interval_ms / 1000, timeout))
+            return
+
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+
+        except asyncio.TimeoutError:
+            pass
+
+        self._ready.clear()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self),
+            "received": self.received,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+        }
@@ -1,64 +1,174 @@
 import logging
 import asyncio
-import json
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 
-from app.clients.polymarket import PolymarketClient
-from app.clients.polymarket_ws import PolymarketWSClient
+from app.clients.clob_public import ClobPublicClient
+from app.clients.gamma import GammaClient
+from app.clients.ws_pool import PolymarketWSPool
+from app.clients.market_decoder import (
+    BookEvent,
+    MarketEvent,
+    MarketMessageDecoder,
+    PriceChangeEvent,
+    TickSizeChangeEvent,
+)
+from app.orderbook.book import OrderBookManager
+from app.strategy.arbitrage import ArbitrageDetector, ArbitrageOpportunity
+from app.config import settings
+from app.core.metrics import (
+    BATCH_ROWS,
+    DECODE_SECONDS,
+    FRAMES_RECEIVED,
+    GAP_SECONDS,
+    METRICS_ENABLED,
+    SAVE_SECONDS,
+    MetricsServer,
+    registry,
+)
+from app.core.profiling import profiler
+from app.replay.engine import ReplayEngine
+from app.replay.recorder import FeedRecorder
+from app.storage.market_cache import MarketMetadataCache
+from app.storage.partitions import PARTITION_NONE, drop_expired_partitions
+from app.storage.schema import TickRecord
 from app.storage.sqlite import SQLiteClient
-from app.utils.time import get_current_window_timestamp
+from app.storage.writer import TickWriter
+from app.workers.buffer import ConflatingBuffer
+from app.workers.snapshot import MarketSnapshot
+from app.utils.time import WINDOW_INTERVAL, get_current_window_timestamp
 
 logger = logging.getLogger(__name__)
 
+STAGE_DECODE = profiler.stage("decode")
+STAGE_BOOK = profiler.stage("book_apply")
+STAGE_DETECT = profiler.stage("arb_detect")
+STAGE_SNAPSHOT = profiler.stage("snapshot")
+
 
 class Collector:
-    def __init__(self, asset: str):
-        self.asset = asset
-        self.client = PolymarketClient()
-        self.ws_client = PolymarketWSClient()
-        self.db = SQLiteClient("data/polymarket.db")
-
-        self.queue = asyncio.Queue(maxsize=10000)
-        self.batch_buffer: List[Dict] = []
+    def __init__(self, assets: List[str], db_path: str = "data/polymarket.db", record: bool = settings.RECORD_FEED):
+        self.assets = [asset.upper() for asset in assets]
+        self.gamma = GammaClient()
+        self.recorder = FeedRecorder() if record else None
+        self.clob = ClobPublicClient()
+        self.ws_client = PolymarketWSPool(recorder=self.recorder)
+        self.ws_client.on_disconnect = self._on_ws_disconnect
+        self.ws_client.book_source = self.clob.get_books
+        self.ws_client.on_reconnect = self._on_ws_reconnect
+        self.db = SQLiteClient(db_path)
+        self.writer = TickWriter(db_path) if settings.DB_WRITER == "thread" else None
+        self.markets = MarketMetadataCache(self.db, self.gamma)
+
         self.BATCH_SIZE = 50
+        self.buffer = ConflatingBuffer(flush_size=self.BATCH_SIZE)
+
+        # 去重: 最佳買價/數量未變動的 tick 不寫入，僅計數
+        self.dedup = settings.COLLECTOR_DEDUP
+        self.suppressed_rows = 0
+        self.heartbeat_rows = 0
+        self.persisted_markets = set()
 
         self.running = False
-        self.current_window_timestamp = None
+        self.db_task: Optional[asyncio.Task] = None
+        self.current_window_timestamps: Dict[str, Optional[int]] = {
+            asset: None for asset in self.assets
+        }
 
         self.token_map = {}
-        self.price_snapshots = {}
+        self.price_snapshots: Dict[int, MarketSnapshot] = {}
+        self.order_books = OrderBookManager()
+        self.decoder = MarketMessageDecoder(self.token_map)
+
+        self.detector = ArbitrageDetector(self.order_books)
+        self.detector.add_handler(self._on_arbitrage)
+
+        # 下單路徑 (EXEC_MODE=off 時不建立，也不匯入 py_clob_client)
+        self.executor = None
+
+        if settings.EXEC_MODE != "off":
+            from app.execution.executor import OrderExecutor
+
+            self.executor = OrderExecutor()
+            self.detector.add_handler(self.executor.on_opportunity)
+
+        self.active_tokens: Dict[str, List[str]] = {
+            asset: [] for asset in self.assets
+        }
+        self.active_slugs: Dict[str, str] = {}
+        self.background_tasks = set()
+
+        self.metrics_server = MetricsServer() if METRICS_ENABLED else None
+        self._register_metrics()
+
+    def _register_metrics(self):
+        # 熱路徑只做整數加一；深度、累計值等在 scrape 時才讀取
+        self.event_counters = {
+            BookEvent: FRAMES_RECEIVED.labels("book"),
+            PriceChangeEvent: FRAMES_RECEIVED.labels("price_change"),
+            TickSizeChangeEvent: FRAMES_RECEIVED.labels("tick_size_change"),
+        }
 
-        self.active_tokens: List[str] = []
+        registry.counter(
+            "collector_frames_skipped_total", "未訂閱或無法辨識而略過的訊息數",
+            fn=lambda: self.decoder.skipped)
+        registry.counter(
+            "collector_decode_errors_total", "解碼失敗的訊息數",
+            fn=lambda: self.decoder.errors)
+        registry.gauge(
+            "collector_dispatch_queue_depth", "FrameDispatcher 佇列中待處理的訊息數",
+            fn=lambda: self.ws_client.dispatcher.depth() if self.ws_client.dispatcher else 0)
+        registry.counter(
+            "collector_dispatch_backpressure_total", "FrameDispatcher 佇列滿載次數",
+            fn=lambda: self.ws_client.dispatcher.backpressure_events if self.ws_client.dispatcher else 0)
+        registry.gauge(
+            "collector_buffer_depth", "等待寫入 DB 的筆數",
+            fn=lambda: len(self.buffer))
+        registry.counter(
+            "collector_rows_conflated_total", "被最新快照覆蓋的筆數",
+            fn=lambda: self.buffer.conflated)
+        registry.counter(
+            "collector_rows_dropped_total", "Buffer 關閉後被丟棄的筆數",
+            fn=lambda: self.buffer.dropped)
+        registry.counter(
+            "collector_rows_suppressed_total", "因最佳買價/數量未變動而略過的筆數",
+            fn=lambda: self.suppressed_rows)
+        registry.counter(
+            "collector_heartbeat_rows_total", "heartbeat 補寫的筆數",
+            fn=lambda: self.heartbeat_rows)
+        registry.gauge(
+            "collector_writer_backlog", "已交付寫入執行緒但尚未 commit 的筆數",
+            fn=lambda: self.writer.backlog if self.writer else 0)
+        registry.gauge(
+            "collector_subscribed_tokens", "目前訂閱中的 token 數",
+            fn=lambda: len(self.ws_client.current_subscriptions))
 
     async def start(self):
-        logger.info(f"🚀 Collector 啟動 (Asset: {self.asset})")
-        self.running = True
+        logger.info(f"🚀 Collector 啟動 (Assets: {', '.join(self.assets)})")
 
-        await self.db.connect()
+        await self._start_pipeline()
 
-        asyncio.create_task(self.ws_client.start(self.on_message))
-        db_task = asyncio.create_task(self._db_worker())
+        if self.metrics_server:
+            await self.metrics_server.start()
 
-        try:
-            while self.running:
-                target_timestamp = get_current_window_timestamp()
+        if self.recorder:
+            self.recorder.start()
 
-                if target_timestamp != self.current_window_timestamp:
-                    logger.info(f"⚡ 偵測到新時段目標: {target_timestamp}")
+        asyncio.create_task(self.ws_client.start(self.on_message))
 
-                    success = await self._switch_to_new_market(target_timestamp)
+        if self.dedup and settings.COLLECTOR_HEARTBEAT_SEC > 0:
+            self._spawn(self._heartbeat_loop(settings.COLLECTOR_HEARTBEAT_SEC))
 
-                    if success:
-                        self.current_window_timestamp = target_timestamp
-                        await asyncio.sleep(0.1)
+        if settings.DB_PARTITION != PARTITION_NONE and settings.DB_RETENTION_DAYS > 0:
+            self._spawn(self._retention_loop(settings.DB_RETENTION_DAYS))
 
-                    else:
-                        logger.warning("⏳ 訂閱未成功，5秒後重試...")
-                        await asyncio.sleep(5)
+        schedule_tasks = [
+            asyncio.create_task(self._asset_schedule(asset)) for asset in self.assets
+        ]
 
-                else:
-                    await asyncio.sleep(0.5)
+        try:
+            await asyncio.gather(*schedule_tasks)
 
         except asyncio.CancelledError:
             logger.info("🛑 Collector 收到停止訊號")
@@ -67,131 +177,398 @@ class Collector:
             logger.error(f"❌ 發生錯誤: {e}")
 
         finally:
-            logger.info("⏳ 等待剩餘資料寫入...")
+            for task in schedule_tasks + list(self.background_tasks):
+                task.cancel()
 
-            self.running = False
+            if self.recorder:
+                self.recorder.stop()
 
-            await db_task
-            await self.db.close()
+            if self.metrics_server:
+                await self.metrics_server.stop()
+
+            await self._stop_pipeline()
+
+    async def replay(self, engine: ReplayEngine):
+        logger.info(f"⏯️ Collector 重播模式 ({len(engine.files)} 個檔案)")
+
+        await self._start_pipeline()
 
-    async def on_message(self, raw_msg: str):
         try:
-            data = json.loads(raw_msg)
-            event_type = data.get("event_type")
+            await engine.run(self.on_message, self._apply_replay_meta)
 
-            if event_type == "book":
-                asset_id = data.get("asset_id")
-                token_info = self.token_map.get(asset_id)
+        finally:
+            await self._stop_pipeline()
 
-                if not token_info:
-                    return
+    async def _start_pipeline(self):
+        self.running = True
 
-                market_id = token_info.get("market_id")
-                token_type = token_info.get("type")
+        await self.db.connect()
+
+        if self.writer:
+            try:
+                self.writer.start()
 
-                timestamp = data.get("timestamp")
+            except Exception as e:
+                logger.error(f"❌ Tick 寫入執行緒無法啟動，改由 aiosqlite 寫入: {e}")
+                self.writer = None
 
-                bids = data.get("bids", [])
+        self.db_task = asyncio.create_task(self._db_worker())
 
-                if not bids:
-                    return
+    async def _stop_pipeline(self):
+        logger.info("⏳ 等待剩餘資料寫入...")
 
-                best_bid = max(bids, key=lambda bid: float(bid["price"]))
+        self.running = False
+        self.buffer.close()
 
-                new_price = best_bid.get("price")
-                new_size = best_bid.get("size")
+        await self.db_task
 
-                # update snapshot
-                snapshot = self.price_snapshots.get(market_id)
+        if self.writer:
+            await asyncio.to_thread(self.writer.stop)
 
-                if token_type == "UP":
-                    snapshot["buy_up_price"] = new_price
-                    snapshot["buy_up_size"] = new_size
+        await self.db.close()
+        await self.gamma.close()
+        await self.clob.close()
 
-                else:
-                    snapshot["buy_down_price"] = new_price
-                    snapshot["buy_down_size"] = new_size
+        if self.executor:
+            await self.executor.close()
 
-                # queue
-                row_data = {
-                    "ts": timestamp,
-                    "market_id": market_id,
-                    **snapshot
-                }
+    async def _apply_replay_meta(self, meta: Dict):
+        if meta.get("type") == "retire":
+            tokens = meta.get("tokens", [])
 
-                try:
-                    self.queue.put_nowait(row_data)
+            # 舊錄檔的 retire 沒有 slug，改以 token 反查快取
+            slugs = [meta["slug"]] if meta.get("slug") else [
+                slug for slug, market in self.markets.entries.items()
+                if market.up_token in tokens or market.down_token in tokens
+            ]
 
-                except:
-                    logger.warning("⚠️ Queue 已滿，正在丟棄資料...")
+            self.markets.evict(slugs)
+            self._retire_tokens(tokens)
+            return
 
-        except Exception as e:
-            logger.debug(f"處理訊息略過: {e}")
+        if meta.get("type") != "market":
+            return
 
-    async def _switch_to_new_market(self, timestamp: int) -> bool:
+        # 重播的目標 DB 可能與錄製時不同，market_id 需重新對應
+        market = await self.markets.register(
+            meta.get("slug"),
+            meta.get("asset"),
+            meta.get("title"),
+            meta.get("up_token"),
+            meta.get("down_token"),
+        )
 
-        market_data = await self._prepare_market_metadata(timestamp)
+        if not market:
+            return
 
-        if not market_data:
-            return False
+        self._update_local_state(market.to_dict())
 
-        if self.active_tokens:
-            logger.info(f"退訂舊市場 Tokens: {self.active_tokens}")
-            await self.ws_client.unsubscribe(self.active_tokens)
-            
-            for token in self.active_tokens:
-                self.token_map.pop(token, None)
+    async def on_message(self, raw_msg: str, recv_ns: Optional[int] = None):
+        if recv_ns is None:
+            recv_ns = time.perf_counter_ns()
 
-        self._update_local_state(market_data)
+        profiling = profiler.enabled
+
+        if METRICS_ENABLED or profiling:
+            decode_start = time.perf_counter_ns()
+            events = self.decoder.decode(raw_msg)
+            elapsed = time.perf_counter_ns() - decode_start
+
+            if METRICS_ENABLED:
+                DECODE_SECONDS.observe(elapsed / 1e9)
+
+            if profiling:
+                STAGE_DECODE.add(elapsed)
+
+        else:
+            events = self.decoder.decode(raw_msg)
+
+        for event in events:
+            self.event_counters[type(event)].inc()
+
+            try:
+                self._handle_event(event, recv_ns)
+
+            except Exception as e:
+                logger.error(f"❌ 處理 {event.event_type} 事件失敗: {e}", exc_info=True)
+
+    def _handle_event(self, event: MarketEvent, recv_ns: int):
+        event_type = type(event)
+        profiling = profiler.enabled
+        apply_start = time.perf_counter_ns() if profiling else 0
+
+        if event_type is BookEvent:
+            token_id = self.order_books.apply_book(event)
+            token_ids = (token_id,) if token_id else ()
+
+        elif event_type is PriceChangeEvent:
+            token_ids = self.order_books.apply_price_changes(event)
+
+        elif event_type is TickSizeChangeEvent:
+            self.order_books.apply_tick_size_change(event)
+            token_ids = ()
+
+            if self.executor:
+                self.executor.on_tick_size_change(event.asset_id, event.new_tick_size)
+
+        else:
+            return
+
+        if profiling:
+            STAGE_BOOK.add(time.perf_counter_ns() - apply_start)
+
+        for token_id in token_ids:
+            self._on_book_update(token_id, event.timestamp, recv_ns)
+
+    def _on_book_update(self, token_id: str, timestamp: Optional[int], recv_ns: int):
+        token_info = self.token_map.get(token_id)
+        book = self.order_books.get(token_id)
+
+        if not token_info or book is None:
+            return
+
+        profiling = profiler.enabled
+
+        if profiling:
+            detect_start = time.perf_counter_ns()
+
+        self.detector.on_book_update(token_info["market_id"], recv_ns, timestamp)
+
+        if profiling:
+            detect_end = time.perf_counter_ns()
+            STAGE_DETECT.add(detect_end - detect_start)
+
+        best_bid = book.best_bid()
+
+        if best_bid is None:
+            return
+
+        new_price, new_size = best_bid
+
+        market_id = token_info["market_id"]
+
+        # update snapshot
+        snapshot = self.price_snapshots.get(market_id)
+
+        if snapshot is None:
+            return
+
+        if token_info["type"] == "UP":
+            # 只動到深層掛單的事件不影響寫入的欄位
+            if self.dedup and snapshot.up_price == new_price and snapshot.up_size == new_size:
+                self.suppressed_rows += 1
+                return
+
+            snapshot.up_price = new_price
+            snapshot.up_size = new_size
+
+        else:
+            if self.dedup and snapshot.down_price == new_price and snapshot.down_size == new_size:
+                self.suppressed_rows += 1
+                return
+
+            snapshot.down_price = new_price
+            snapshot.down_size = new_size
+
+        # buffer (滿載或 interval 模式時以最新快照覆蓋，不會丟掉最新資料)
+        self.buffer.put(market_id, TickRecord(
+            timestamp, market_id, snapshot.up_price, snapshot.down_price, snapshot.up_size, snapshot.down_size))
+
+        if self.dedup:
+            self.persisted_markets.add(market_id)
+
+        if profiling:
+            STAGE_SNAPSHOT.add(time.perf_counter_ns() - detect_end)
+
+    def _on_ws_disconnect(self, connection: str, tokens: List[str]):
+        # 斷線期間不再沿用舊的 order book 與快照，等 REST / WS 快照重新補齊
+        for token in tokens:
+            book = self.order_books.get(token)
+
+            if book is not None:
+                book.clear()
+
+            token_info = self.token_map.get(token)
+            snapshot = self.price_snapshots.get(token_info["market_id"]) if token_info else None
+
+            if snapshot is None:
+                continue
+
+            if token_info["type"] == "UP":
+                snapshot.up_price = None
+                snapshot.up_size = None
+
+            else:
+                snapshot.down_price = None
+                snapshot.down_size = None
+
+        logger.warning(f"⚠️ [{connection}] 斷線，{len(tokens)} 個 token 的狀態已標記失效")
+
+    async def _on_ws_reconnect(self, connection: str, tokens: List[str], down_since: float, resumed_at: float):
+        market_ids = sorted({self.token_map[token]["market_id"] for token in tokens if token in self.token_map})
+
+        GAP_SECONDS.observe(resumed_at - down_since)
+        logger.warning(
+            f"🕳️ [{connection}] 資料缺口 {resumed_at - down_since:.2f}s "
+            f"(markets: {market_ids}, tokens: {len(tokens)})")
+
+        await self.db.save_gap(int(down_since * 1000), int(resumed_at * 1000), connection, tokens, market_ids)
+
+    def _on_arbitrage(self, opp: ArbitrageOpportunity):
+        logger.info(
+            f"💰 套利機會 (Market: {opp.market_id}) "
+            f"Up {opp.up_ask:.3f} + Down {opp.down_ask:.3f} = {opp.cost:.4f} | "
+            f"Edge {opp.edge:.4f} x {opp.size:.2f} | 延遲 {opp.latency_ns / 1000:.0f} µs"
+        )
+
+    async def _asset_schedule(self, asset: str):
+        # 每個資產一條排程: 在邊界前 WINDOW_PRELOAD_SEC 秒解析並訂閱下一個時段，
+        # 舊市場則在邊界後 WINDOW_OVERLAP_SEC 秒由計時器精準退訂
+        window = get_current_window_timestamp()
+
+        while self.running:
+            market_data = await self._prepare_market_metadata(asset, window)
+
+            if not market_data:
+                if time.time() >= window + WINDOW_INTERVAL:
+                    logger.warning(f"⏭️ [{asset}] 時段 {window} 已結束仍未取得市場，改追目前時段")
+                    window = get_current_window_timestamp()
+
+                else:
+                    logger.warning(f"⏳ [{asset}] 訂閱未成功，5秒後重試...")
+                    await asyncio.sleep(5)
+
+                continue
+
+            await self._activate_market(asset, window, market_data)
+
+            window += WINDOW_INTERVAL
+            await self._sleep_until(window - settings.WINDOW_PRELOAD_SEC)
+
+    async def _activate_market(self, asset: str, window: int, market_data: Dict):
+        old_tokens = self.active_tokens[asset]
+        old_slug = self.active_slugs.get(asset)
 
         up_token = market_data.get("up_token")
         down_token = market_data.get("down_token")
 
-        token_ids = [up_token, down_token]
-        await self.ws_client.subscribe(token_ids)
+        self._update_local_state(market_data)
 
-        self.active_tokens = token_ids
+        if self.recorder:
+            self.recorder.record_meta({"type": "market", **market_data})
 
-        market_id = market_data.get("market_id")
-        logger.info(f"✅ 成功切換至市場 ID: {market_id}")
+        await self.ws_client.subscribe([up_token, down_token])
 
-        return True
+        if self.executor:
+            self._spawn(self.executor.prepare([up_token, down_token]))
 
-    async def _prepare_market_metadata(self, timestamp: int) -> Optional[Dict]:
-        logger.info(f"🔍 開始尋找市場資料 (TS: {timestamp})")
+        self.active_tokens[asset] = [up_token, down_token]
+        self.active_slugs[asset] = market_data.get("slug")
+        self.current_window_timestamps[asset] = window
 
-        # gamma api
-        market_data = self.client.get_market(self.asset, timestamp)
+        lead = window - time.time()
+        logger.info(
+            f"✅ [{asset}] 已訂閱市場 ID: {market_data.get('market_id')} "
+            f"(時段 {window}，{'提前' if lead > 0 else '延後'} {abs(lead):.1f}s)"
+        )
 
-        if not market_data:
-            return False
+        if old_tokens:
+            self._spawn(self._retire_at(asset, old_tokens, old_slug, window + settings.WINDOW_OVERLAP_SEC))
 
-        title = market_data.get("title")
-        up_token = market_data.get("up")
-        down_token = market_data.get("down")
+        # 背景預先解析之後的時段，排程到時直接命中快取
+        if settings.MARKET_WARM_WINDOWS > 0:
+            self._spawn(self.markets.warm(asset, window + WINDOW_INTERVAL, settings.MARKET_WARM_WINDOWS))
 
-        asset = self.asset.lower()
-        slug = f"{asset}-updown-15m-{timestamp}"
+    async def _heartbeat_loop(self, interval: float):
+        # 去重後安靜的市場不會有新資料列，定期補寫目前快照以區分「沒變動」與「沒收到資料」
+        while self.running:
+            await asyncio.sleep(interval)
 
-        # DB
-        market_id = await self.db.get_or_create_market(
-            slug=slug,
-            asset=asset,
-            title=title,
-        )
+            now_ms = int(time.time() * 1000)
+            active_markets = {info["market_id"] for info in self.token_map.values()}
+
+            for market_id in active_markets - self.persisted_markets:
+                snapshot = self.price_snapshots.get(market_id)
+
+                if snapshot is None or snapshot.empty:
+                    continue
+
+                self.buffer.put(market_id, snapshot.record(now_ms))
+                self.heartbeat_rows += 1
 
-        if not market_id:
-            logger.error("❌ 無法取得 Market ID")
+            self.persisted_markets.clear()
+
+    async def _retention_loop(self, retention_days: float, interval: float = 3600):
+        # 分區模式下以刪檔方式清除過期資料，每小時檢查一次
+        while self.running:
+            try:
+                store = self.writer.store if self.writer else self.db.partitions
+                await asyncio.to_thread(drop_expired_partitions, self.db.db_path, retention_days, None, store)
+
+            except Exception as e:
+                logger.error(f"❌ 清除過期分區失敗: {e}")
+
+            await asyncio.sleep(interval)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def _retire_at(self, asset: str, tokens: List[str], slug: Optional[str], retire_timestamp: float):
+        await self._sleep_until(retire_timestamp)
+
+        if slug:
+            self.markets.evict([slug])
+
+        logger.info(f"退訂 [{asset}] 舊市場 Tokens: {tokens}")
+        await self.ws_client.unsubscribe(tokens)
+
+        self._retire_tokens(tokens)
+
+        if self.recorder:
+            self.recorder.record_meta({"type": "retire", "tokens": tokens, "slug": slug})
+
+    async def _sleep_until(self, wall_timestamp: float):
+        # asyncio 計時器以 monotonic clock 為準，醒來後再以 wall clock 校正剩餘時間
+        while True:
+            delay = wall_timestamp - time.time()
+
+            if delay <= 0:
+                return
+
+            await asyncio.sleep(delay)
+
+    async def _prepare_market_metadata(self, asset: str, timestamp: int) -> Optional[Dict]:
+        logger.info(f"🔍 [{asset}] 開始尋找市場資料 (TS: {timestamp})")
+
+        # 快取 -> DB -> gamma api
+        meta = await self.markets.resolve(asset, timestamp)
+
+        if not meta:
             return None
 
-        result = {
-            "market_id": market_id,
-            "up_token": up_token,
-            "down_token": down_token,
-            "slug": slug
-        }
+        return meta.to_dict()
+
+    def _retire_tokens(self, tokens: List[str]):
+        # 時段結束後清掉該市場在記憶體中的所有狀態，長時間執行時不會隨時段數累積
+        market_ids = set()
+
+        for token in tokens:
+            token_info = self.token_map.pop(token, None)
+            self.order_books.remove(token)
+
+            if token_info:
+                market_ids.add(token_info["market_id"])
+
+        for market_id in market_ids:
+            self.detector.remove_market(market_id)
+            self.price_snapshots.pop(market_id, None)
+            self.persisted_markets.discard(market_id)
 
-        return result
+        if self.executor:
+            self.executor.forget(tokens, market_ids)
 
     def _update_local_state(self, data: Dict):
         market_id = data.get("market_id")
@@ -201,53 +578,57 @@ class Collector:
         self.token_map[up_token] = {"market_id": market_id, "type": "UP"}
         self.token_map[down_token] = {"market_id": market_id, "type": "DOWN"}
 
+        self.detector.register_market(market_id, up_token, down_token)
+
         if market_id not in self.price_snapshots:
-            self.price_snapshots[market_id] = {
-                "buy_up_price": None,
-                "buy_down_price": None,
-                "buy_up_size": None,
-                "buy_down_size": None,
-            }
+            self.price_snapshots[market_id] = MarketSnapshot(market_id)
 
     async def _db_worker(self):
-        logger.info("💾 DB 寫入工兵啟動")
+        logger.info(f"💾 DB 寫入工兵啟動 (conflate: {self.buffer.interval_ms} ms)")
 
-        while self.running or not self.queue.empty():
-            try:
-                item = await asyncio.wait_for(self.queue.get(), timeout=1)
-                self.batch_buffer.append(item)
+        last_conflated = 0
 
-                if len(self.batch_buffer) >= self.BATCH_SIZE:
-                    await self._flush_to_db()
+        while self.running or len(self.buffer):
+            try:
+                await self.buffer.wait(timeout=1)
 
-                self.queue.task_done()
+                # tick 模式下出現覆蓋代表寫入跟不上
+                if not self.buffer.conflating and self.buffer.conflated > last_conflated:
+                    logger.warning(
+                        f"⚠️ Buffer 已滿，累計 {self.buffer.conflated} 筆被最新快照覆蓋")
+                    last_conflated = self.buffer.conflated
 
-            except asyncio.TimeoutError:
-                if self.batch_buffer:
-                    await self._flush_to_db()
+                rows = self.buffer.drain()
 
-                continue
+                if rows:
+                    await self._flush_to_db(rows)
 
             except Exception as e:
                 logger.error(f"❌ DB Worker 錯誤: {e}")
 
-    async def _flush_to_db(self):
-        if not self.batch_buffer:
-            return
-        
-        data = self.batch_buffer[:]
-        self.batch_buffer.clear()
-
-        record = []
-
-        for item in data:
-            record.append((
-                item["ts"],
-                item["market_id"],
-                item["buy_up_price"],
-                item["buy_down_price"],
-                item["buy_up_size"],
-                item["buy_down_size"]
-            ))
-
-        await self.db.save_ticks_batch(record)
+        logger.info(f"💾 DB 寫入工兵結束 {self.buffer.stats()}")
+
+        if self.dedup:
+            logger.info(f"💾 去重略過 {self.suppressed_rows} 筆，heartbeat 補寫 {self.heartbeat_rows} 筆")
+
+    async def _flush_to_db(self, records: List[TickRecord]):
+        # TickRecord 本身就是 tuple，直接交給寫入端，不再複製
+        if self.writer:
+            if self.writer.submit(records):
+                # 寫入執行緒跟不上時暫停交付，新資料留在 buffer 中以最新快照覆蓋
+                while self.writer.backlog > settings.DB_WRITER_MAX_BACKLOG and self.writer.alive:
+                    await asyncio.sleep(0.01)
+
+                return
+
+            # 寫入執行緒已停止: 取回未寫入的資料，之後改由 aiosqlite 寫入
+            logger.error(f"❌ Tick 寫入執行緒已停止 ({self.writer.error!r})，改由 aiosqlite 寫入")
+
+            records = self.writer.take_unwritten() + list(records)
+            self.writer = None
+
+        save_start = time.perf_counter()
+        await self.db.save_ticks_batch(records)
+
+        BATCH_ROWS.observe(len(records))
+        SAVE_SECONDS.observe(time.perf_counter() - save_start)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from app.storage.schema import TickRecord
+
+
+class MarketSnapshot:
+    # 每個市場 Up / Down 最佳買價與數量，每次變動產生一筆 TickRecord
+    __slots__ = ("market_id", "up_price", "down_price", "up_size", "down_size")
+
+    def __init__(self, market_id: int):
+        self.market_id = market_id
+
+        self.up_price: Optional[float] = None
+        self.down_price: Optional[float] = None
+        self.up_size: Optional[float] = None
+        self.down_size: Optional[float] = None
+
+    @property
+    def empty(self) -> bool:
+        return self.up_price is None and self.down_price is None
+
+    def record(self, ts: Optional[int]) -> TickRecord:
+        return TickRecord(ts, self.market_id, self.up_price, self.down_price, self.up_size, self.down_size)
@@ -0,0 +1,73 @@
+import argparse
+import os
+import tempfile
+import time
+
+from app.storage.analytics import bid_sum_windows, load_ticks, resample_ohlc, spread, time_weighted_average
+from app.storage.schema import SCHEMA_V1, SCHEMA_V2
+from benchmarks.bench_schema import build_records, insert_rate
+
+# 用法: python -m benchmarks.bench_analytics --rows 200000
+
+
+def python_loop(db_path: str, market_id: int) -> int:
+    # 對照組: notebook 常見的逐列迴圈，只算 sub-1.0 區段
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT ts, buy_up_price, buy_down_price FROM ticks WHERE market_id = ? ORDER BY ts", (market_id,)
+    ).fetchall()
+    conn.close()
+
+    windows = 0
+    inside = False
+
+    for _, up, down in rows:
+        below = up is not None and down is not None and float(up) + float(down) < 1.0
+
+        if below and not inside:
+            windows += 1
+
+        inside = below
+
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量化分析 API 效能")
+    parser.add_argument("--rows", type=int, default=200000, help="單一市場的 tick 數")
+    args = parser.parse_args()
+
+    records = build_records(args.rows, markets=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, version in (("v1", SCHEMA_V1), ("v2", SCHEMA_V2)):
+            path = os.path.join(tmp, f"{name}.db")
+            insert_rate(path, version, records, 5000)
+
+            started = time.perf_counter()
+            ticks = load_ticks(path, market_id=1)
+            loaded = time.perf_counter()
+
+            for interval in (1000, 5000, 60000):
+                resample_ohlc(ticks, interval)
+
+            time_weighted_average(ticks, spread(ticks))
+            windows = bid_sum_windows(ticks)
+
+            done = time.perf_counter()
+
+            loop_started = time.perf_counter()
+            python_loop(path, 1)
+            loop_elapsed = time.perf_counter() - loop_started
+
+            print(
+                f"{name}: {len(ticks):,} ticks | load {(loaded - started) * 1000:.0f} ms | "
+                f"bars+twap+windows {(done - loaded) * 1000:.0f} ms | "
+                f"{len(windows['start_ts']):,} sub-1.0 windows | python row loop {loop_elapsed * 1000:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
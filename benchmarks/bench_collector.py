@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from app.config import settings
+from app.core.logger import setup_logger
+from app.core.profiling import profiler
+
+# 端對端壓測: 本機 stand-in 伺服器 + 真正的 Collector + 暫存 SQLite
+# 用法: python -m benchmarks.bench_collector --rate 5000 --depth 20 --duration 30 --assets BTC ETH SOL
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+
+    return ordered[index]
+
+
+def start_standin(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.standin",
+            "--ws-port", str(args.ws_port),
+            "--http-port", str(args.http_port),
+            "--rate", str(args.rate),
+            "--depth", str(args.depth),
+            "--book-ratio", str(args.book_ratio),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    # 等 stand-in 準備好再啟動 Collector
+    if process.stdout.readline().strip() != "READY":
+        process.kill()
+        raise RuntimeError("stand-in 伺服器啟動失敗")
+
+    return process
+
+
+async def run_collector(args, db_path: str) -> dict:
+    from app.workers.collector import Collector
+
+    collector = Collector(args.assets, db_path=db_path, record=False)
+
+    if args.profile:
+        profiler.enable()
+
+    frames = 0
+    commit_latencies_ms: List[float] = []
+    rows_written = 0
+
+    on_message = collector.on_message
+
+    async def counting_on_message(raw_msg, recv_ns=None):
+        nonlocal frames
+        frames += 1
+        await on_message(raw_msg, recv_ns)
+
+    collector.on_message = counting_on_message
+
+    def record_commit(records):
+        nonlocal rows_written
+
+        # stand-in 的 timestamp 是送出當下的 epoch ms
+        now_ms = time.time() * 1000
+        rows_written += len(records)
+
+        for record in records:
+            commit_latencies_ms.append(now_ms - int(record[0]))
+
+    if collector.writer:
+        # 寫入執行緒在 commit 後回呼
+        collector.writer.on_commit = record_commit
+
+    else:
+        save_ticks_batch = collector.db.save_ticks_batch
+
+        async def timed_save(records):
+            await save_ticks_batch(records)
+            record_commit(records)
+
+        collector.db.save_ticks_batch = timed_save
+
+    task = asyncio.create_task(collector.start())
+
+    # 等訂閱完成並有資料流入後才開始計時
+    while frames == 0:
+        await asyncio.sleep(0.05)
+
+    await asyncio.sleep(args.warmup)
+
+    start_frames = frames
+    commit_latencies_ms.clear()
+    started = time.perf_counter()
+
+    await asyncio.sleep(args.duration)
+
+    elapsed = time.perf_counter() - started
+    measured_frames = frames - start_frames
+
+    await collector.ws_client.stop()
+    task.cancel()
+
+    try:
+        await task
+
+    except asyncio.CancelledError:
+        pass
+
+    profiler.shutdown()
+
+    buffer_stats = collector.buffer.stats()
+    dispatch_stats = collector.ws_client.dispatcher.stats() if collector.ws_client.dispatcher else {}
+
+    return {
+        "frames": measured_frames,
+        "msg_per_sec": measured_frames / elapsed,
+        "rows_written": rows_written,
+        "commit_p50_ms": percentile(commit_latencies_ms, 50),
+        "commit_p99_ms": percentile(commit_latencies_ms, 99),
+        "dropped_rows": buffer_stats["conflated"] + buffer_stats["dropped"],
+        "suppressed_rows": collector.suppressed_rows,
+        "backpressure_events": dispatch_stats.get("backpressure_events", 0),
+        "ws_connections": len(collector.ws_client.connections),
+        # Linux 上 ru_maxrss 單位為 KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collector 端對端吞吐量壓測")
+    parser.add_argument("--assets", nargs="+", default=["BTC", "ETH", "SOL"])
+    parser.add_argument("--rate", type=float, default=2000, help="stand-in 每條連線每秒送出的事件數")
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--book-ratio", type=float, default=0.3)
+    parser.add_argument("--duration", type=float, default=20, help="量測秒數")
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--profile", action="store_true", default=settings.PROFILE,
+                        help="同時輸出各階段延遲與 folded stacks (見 PROFILE_DIR)")
+    parser.add_argument("--ws-port", type=int, default=8765)
+    parser.add_argument("--http-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    setup_logger(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    settings.WS_URL = f"ws://127.0.0.1:{args.ws_port}"
+    settings.GAMMA_URL = f"http://127.0.0.1:{args.http_port}"
+    settings.CLOB_URL = f"http://127.0.0.1:{args.http_port}"
+
+    standin = start_standin(args)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = asyncio.run(run_collector(args, os.path.join(tmp, "bench.db")))
+
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    print(f"assets={' '.join(args.assets)} rate={args.rate:g}/s depth={args.depth} duration={args.duration:g}s")
+
+    for key, value in result.items():
+        print(f"{key:<20} {value:,.2f}" if isinstance(value, float) else f"{key:<20} {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+from app.clients.market_decoder import JSON_BACKEND, BookEvent, MarketMessageDecoder, PriceChangeEvent
+from app.orderbook.book import OrderBookManager
+
+# 用法: python -m benchmarks.bench_decode --messages 50000 --depth 20
+
+
+def _levels(rng: random.Random, depth: int, low: float, high: float) -> List[dict]:
+    prices = sorted({round(rng.uniform(low, high), 2) for _ in range(depth * 2)})[:depth]
+
+    return [{"price": f"{price:.2f}", "size": f"{rng.uniform(5, 5000):.2f}"} for price in prices]
+
+
+def build_frames(count: int, depth: int, subscribed: List[str], foreign: List[str], seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    frames = []
+
+    for i in range(count):
+        token = rng.choice(subscribed) if rng.random() < 0.8 else rng.choice(foreign)
+        timestamp = str(1760000000000 + i)
+        kind = rng.random()
+
+        if kind < 0.45:
+            frames.append(json.dumps({
+                "event_type": "book",
+                "asset_id": token,
+                "market": "0xmarket",
+                "bids": _levels(rng, depth, 0.01, 0.49),
+                "asks": _levels(rng, depth, 0.51, 0.99),
+                "timestamp": timestamp,
+                "hash": "0xhash",
+            }))
+
+        elif kind < 0.95:
+            frames.append(json.dumps({
+                "event_type": "price_change",
+                "market": "0xmarket",
+                "price_changes": [{
+                    "asset_id": token,
+                    "price": f"{rng.uniform(0.01, 0.99):.2f}",
+                    "size": f"{rng.choice([0, rng.uniform(5, 500)]):.2f}",
+                    "side": rng.choice(["BUY", "SELL"]),
+                    "hash": "0xhash",
+                }],
+                "timestamp": timestamp,
+            }))
+
+        else:
+            frames.append(json.dumps([{
+                "event_type": "book",
+                "asset_id": t,
+                "market": "0xmarket",
+                "bids": _levels(rng, depth, 0.01, 0.49),
+                "asks": _levels(rng, depth, 0.51, 0.99),
+                "timestamp": timestamp,
+            } for t in subscribed]))
+
+    return frames
+
+
+def legacy_path(subscribed: List[str]) -> Callable[[str], None]:
+    # 舊版 Collector.on_message: json.loads + dict.get + 每則訊息 max(float)
+    token_map = {token: {"market_id": 1, "type": "UP"} for token in subscribed}
+    snapshot = {"buy_up_price": None, "buy_up_size": None}
+
+    def handle(raw_msg: str):
+        try:
+            data = json.loads(raw_msg)
+
+            if data.get("event_type") == "book":
+                token_info = token_map.get(data.get("asset_id"))
+
+                if not token_info:
+                    return
+
+                bids = data.get("bids", [])
+
+                if not bids:
+                    return
+
+                best_bid = max(bids, key=lambda bid: float(bid["price"]))
+                snapshot["buy_up_price"] = best_bid.get("price")
+                snapshot["buy_up_size"] = best_bid.get("size")
+
+                {"ts": data.get("timestamp"), "market_id": token_info["market_id"], **snapshot}
+
+        except Exception:
+            pass
+
+    return handle
+
+
+def legacy_book_path(subscribed: List[str]) -> Callable[[str], None]:
+    # 同樣維護完整訂單簿 (bids/asks + price_change)，但走 json.loads + dict 取值 + 逐筆 float()
+    token_map = {token: {"market_id": 1, "type": "UP"} for token in subscribed}
+    books = {}
+
+    def handle_event(data: dict):
+        event_type = data.get("event_type")
+
+        if event_type == "book":
+            if data.get("asset_id") not in token_map:
+                return
+
+            bids = {float(level["price"]): float(level["size"]) for level in data.get("bids", [])}
+            asks = {float(level["price"]): float(level["size"]) for level in data.get("asks", [])}
+            books[data.get("asset_id")] = (bids, asks, sorted(bids), sorted(asks))
+
+        elif event_type == "price_change":
+            for change in data.get("price_changes", []):
+                book = books.get(change.get("asset_id"))
+
+                if change.get("asset_id") not in token_map or book is None:
+                    continue
+
+                levels = book[0] if change.get("side") == "BUY" else book[1]
+                price = float(change.get("price"))
+                size = float(change.get("size"))
+
+                if size > 0:
+                    levels[price] = size
+
+                else:
+                    levels.pop(price, None)
+
+                max(book[0]) if book[0] else None
+                min(book[1]) if book[1] else None
+
+    def handle(raw_msg: str):
+        try:
+            data = json.loads(raw_msg)
+
+            for event in data if isinstance(data, list) else [data]:
+                handle_event(event)
+
+        except Exception:
+            pass
+
+    return handle
+
+
+def decoder_path(subscribed: List[str]) -> Callable[[str], None]:
+    decoder = MarketMessageDecoder(set(subscribed))
+    books = OrderBookManager()
+
+    def handle(raw_msg: str):
+        for event in decoder.decode(raw_msg):
+            if type(event) is BookEvent:
+                books.apply_book(event)
+
+            elif type(event) is PriceChangeEvent:
+                books.apply_price_changes(event)
+
+    return handle
+
+
+def run(name: str, handler: Callable[[str], None], frames: List[str], rounds: int) -> float:
+    best = 0.0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for frame in frames:
+            handler(frame)
+
+        elapsed = time.perf_counter() - start
+        best = max(best, len(frames) / elapsed)
+
+    print(f"{name:<28} {best:>12,.0f} msg/s")
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 訊息解碼 microbenchmark")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    subscribed = [str(10 ** 70 + i) for i in range(2)]
+    foreign = [str(10 ** 71 + i) for i in range(6)]
+    frames = build_frames(args.messages, args.depth, subscribed, foreign)
+
+    print(f"frames={len(frames)} depth={args.depth} json_backend={JSON_BACKEND}")
+
+    # legacy 只處理 book 事件的 best bid，其餘訊息解析完即丟棄；
+    # legacy + full book 則與新路徑做同樣的事，才是同工作量的比較
+    legacy = run("legacy (json + max float)", legacy_path(subscribed), frames, args.rounds)
+    legacy_book = run("legacy + full book", legacy_book_path(subscribed), frames, args.rounds)
+    fast = run("decoder + order book", decoder_path(subscribed), frames, args.rounds)
+
+    print(f"speedup vs legacy:           {fast / legacy:.2f}x")
+    print(f"speedup vs legacy full book: {fast / legacy_book:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
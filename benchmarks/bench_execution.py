@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from app.config import settings
+from app.core.logger import setup_logger
+from benchmarks.standin import token_ids_for_slug
+
+# 下單路徑比較 (對本機 stand-in CLOB):
+#   naive: 每腳 ClobClient.create_order + post_order 依序執行 (每次重建簽章器、同步 requests)
+#   executor: OrderExecutor 預先備妥簽章參數，兩腳並行送出、共用 keep-alive 連線
+# 量測訊號到各腳收到回應的時間 (ack) 與簽章耗時
+# 用法: python -m benchmarks.bench_execution --iterations 200 --order-latency-ms 2
+
+
+def start_standin(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.standin",
+            "--ws-port", str(args.ws_port),
+            "--http-port", str(args.http_port),
+            "--order-latency-ms", str(args.order_latency_ms),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    if process.stdout.readline().strip() != "READY":
+        process.kill()
+        raise RuntimeError("stand-in 伺服器啟動失敗")
+
+    return process
+
+
+def summarize(values_ns: List[int]) -> Dict[str, float]:
+    values = sorted(values_ns)
+
+    return {
+        "p50": values[len(values) // 2] / 1e6,
+        "p99": values[min(len(values) - 1, int(len(values) * 0.99))] / 1e6,
+        "mean": statistics.fmean(values) / 1e6,
+    }
+
+
+def run_naive(tokens, iterations: int, price: float, size: float) -> Dict[str, List[int]]:
+    from py_clob_client.client import ClobClient
+    from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType
+    from py_clob_client.order_builder.constants import BUY
+
+    client = ClobClient(
+        settings.EXEC_DRY_RUN_URL,
+        key=settings.PRIVATE_KEY,
+        chain_id=settings.CHAIN_ID,
+        creds=ApiCreds("dry-run", "ZHJ5LXJ1bg==", "dry-run"),
+        signature_type=1,
+        funder=settings.FUNDER,
+    )
+
+    # 先各下一次單，tick size / neg_risk 進入 ClobClient 快取，只比較熱路徑
+    for token in tokens:
+        client.post_order(client.create_order(OrderArgs(token, price, size, BUY)), OrderType.FOK)
+
+    sign, ack = [], []
+
+    for _ in range(iterations):
+        signal_ns = time.perf_counter_ns()
+
+        for token in tokens:
+            sign_start = time.perf_counter_ns()
+            order = client.create_order(OrderArgs(token, price, size, BUY))
+            sign.append(time.perf_counter_ns() - sign_start)
+
+            client.post_order(order, OrderType.FOK)
+            ack.append(time.perf_counter_ns() - signal_ns)
+
+    return {"sign": sign, "ack": ack}
+
+
+async def run_executor(tokens, iterations: int, price: float, size: float) -> Dict[str, List[int]]:
+    from app.execution.executor import EXEC_DRY_RUN, OrderExecutor
+
+    executor = OrderExecutor(mode=EXEC_DRY_RUN, cooldown_sec=0)
+    await executor.prepare(tokens)
+
+    legs = [(executor.contexts[token], price, size) for token in tokens]
+    sign, ack, errors = [], [], 0
+
+    try:
+        for _ in range(iterations):
+            report = await executor.execute("bench", 0, time.perf_counter_ns(), legs)
+
+            for leg in report.legs:
+                sign.append(leg.sign_ns)
+                ack.append(leg.ack_ns)
+                errors += leg.error is not None
+
+    finally:
+        await executor.close()
+
+    if errors:
+        print(f"executor errors: {errors}")
+
+    return {"sign": sign, "ack": ack}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="下單路徑延遲比較")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--order-latency-ms", type=float, default=2, help="stand-in 模擬撮合延遲")
+    parser.add_argument("--price", type=float, default=0.48)
+    parser.add_argument("--size", type=float, default=5)
+    parser.add_argument("--ws-port", type=int, default=8785)
+    parser.add_argument("--http-port", type=int, default=8786)
+    args = parser.parse_args()
+
+    setup_logger(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    settings.EXEC_DRY_RUN_URL = f"http://127.0.0.1:{args.http_port}"
+    settings.PRIVATE_KEY = settings.PRIVATE_KEY or f"0x{secrets.token_hex(32)}"
+
+    up, down, _ = token_ids_for_slug("bench-execution")
+    tokens = [up, down]
+
+    standin = start_standin(args)
+
+    try:
+        naive = run_naive(tokens, args.iterations, args.price, args.size)
+        fast = asyncio.run(run_executor(tokens, args.iterations, args.price, args.size))
+
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    print(f"iterations={args.iterations} order_latency={args.order_latency_ms:g}ms (2 legs)")
+    print(f"{'path':<10} {'sign_p50_us':>12} {'ack_p50_ms':>11} {'ack_p99_ms':>11} {'ack_mean_ms':>12}")
+
+    for name, result in (("naive", naive), ("executor", fast)):
+        ack = summarize(result["ack"])
+        sign_p50 = sorted(result["sign"])[len(result["sign"]) // 2] / 1000
+
+        print(f"{name:<10} {sign_p50:>12,.0f} {ack['p50']:>11.2f} {ack['p99']:>11.2f} {ack['mean']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List
+
+from app.core.logger import FORMATTER, RateLimitFilter, _LogPipeline
+
+# logging 對 event loop 的影響: 熱路徑連續 log 時，每次呼叫的耗時與 loop 最大延遲
+#   sync:  RotatingFileHandler + stdout 直接掛在 logger 上 (舊做法，I/O 在呼叫端執行緒)
+#   queue: QueueHandler + 背景 QueueListener (目前做法)，另測有無 rate limit
+# stdout 導向 /dev/null，檔案寫到暫存目錄
+# 用法: python -m benchmarks.bench_logging --calls 50000
+
+
+def build_handlers(path: str, stream) -> List[logging.Handler]:
+    file_handler = RotatingFileHandler(path, maxBytes=50 * 1024 * 1024, backupCount=1, encoding="utf-8")
+    file_handler.setFormatter(FORMATTER)
+
+    console_handler = logging.StreamHandler(stream)
+    console_handler.setFormatter(FORMATTER)
+
+    return [file_handler, console_handler]
+
+
+async def hot_loop(log: logging.Logger, calls: int) -> Dict[str, float]:
+    # 模擬 on_message 中每則訊息都觸發一次 warning
+    durations = []
+    worst_gap = 0.0
+    last = time.perf_counter()
+
+    for i in range(calls):
+        started = time.perf_counter_ns()
+        log.warning(f"⚠️ 訊息解碼失敗 (ValueError: bad frame {i})")
+        durations.append(time.perf_counter_ns() - started)
+
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+
+            now = time.perf_counter()
+            worst_gap = max(worst_gap, now - last)
+            last = now
+
+    durations.sort()
+
+    return {
+        "p50_us": durations[len(durations) // 2] / 1000,
+        "p99_us": durations[int(len(durations) * 0.99)] / 1000,
+        "max_us": durations[-1] / 1000,
+        "total_ms": sum(durations) / 1e6,
+        "loop_gap_ms": worst_gap * 1000,
+    }
+
+
+def run_case(name: str, calls: int, tmp: str, devnull) -> Dict[str, float]:
+    log = logging.getLogger(f"bench.{name}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+
+    handlers = build_handlers(os.path.join(tmp, f"{name}.log"), devnull)
+    pipeline = None
+
+    if name == "sync":
+        for handler in handlers:
+            log.addHandler(handler)
+
+    else:
+        burst = 0 if name == "queue" else 20
+        pipeline = _LogPipeline(handlers, RateLimitFilter(window=10, burst=burst))
+        log.addHandler(pipeline.handler)
+
+    result = asyncio.run(hot_loop(log, calls))
+
+    started = time.perf_counter()
+
+    if pipeline:
+        pipeline.stop()
+
+    result["drain_ms"] = (time.perf_counter() - started) * 1000
+
+    for handler in handlers:
+        handler.close()
+
+    with open(os.path.join(tmp, f"{name}.log"), encoding="utf-8") as f:
+        result["lines"] = sum(1 for _ in f)
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="logging 熱路徑延遲")
+    parser.add_argument("--calls", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        results = {name: run_case(name, args.calls, tmp, devnull) for name in ("sync", "queue", "queue+limit")}
+
+    print(f"calls={args.calls}", file=sys.stderr)
+    print(f"{'mode':<12} {'p50_us':>8} {'p99_us':>8} {'max_us':>9} {'total_ms':>9} {'loop_gap_ms':>12} {'drain_ms':>9} {'lines':>7}")
+
+    for name, r in results.items():
+        print(
+            f"{name:<12} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} {r['max_us']:>9.0f} {r['total_ms']:>9.0f} "
+            f"{r['loop_gap_ms']:>12.2f} {r['drain_ms']:>9.0f} {r['lines']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from app.core.logger import setup_logger
+from app.utils.time import WINDOW_INTERVAL
+from benchmarks.standin import token_ids_for_slug
+
+# 長時間執行的記憶體: 模擬一週 (每資產 672 個 15 分鐘時段)，每個時段
+#   註冊新市場 -> 送入 book / price_change -> 退訂上一個時段
+# 不經過網路，直接呼叫 Collector.on_message，寫入暫存 SQLite
+# 每模擬一天輸出 RSS 與各項狀態的大小，時段結束後的狀態應被清除，RSS 維持平穩
+# 用法: python -m benchmarks.bench_memory --days 7 --frames 100 --assets BTC ETH SOL
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def book_frame(token: str, ts_ms: int, rng: random.Random) -> str:
+    mid = rng.uniform(0.2, 0.8)
+
+    return json.dumps({
+        "event_type": "book",
+        "asset_id": token,
+        "market": "0x0",
+        "timestamp": str(ts_ms),
+        "bids": [{"price": f"{mid - i / 100:.2f}", "size": f"{rng.uniform(1, 500):.2f}"} for i in range(1, 11)],
+        "asks": [{"price": f"{mid + i / 100:.2f}", "size": f"{rng.uniform(1, 500):.2f}"} for i in range(1, 11)],
+    })
+
+
+def price_change_frame(tokens: List[str], ts_ms: int, rng: random.Random) -> str:
+    return json.dumps({
+        "event_type": "price_change",
+        "market": "0x0",
+        "timestamp": str(ts_ms),
+        "price_changes": [
+            {
+                "asset_id": token,
+                "side": rng.choice(("BUY", "SELL")),
+                "price": f"{rng.uniform(0.05, 0.95):.2f}",
+                "size": f"{rng.uniform(0, 500):.2f}",
+            }
+            for token in tokens
+        ],
+    })
+
+
+def state_sizes(collector) -> Dict[str, int]:
+    sequencer = collector.writer.sequencer if collector.writer else collector.db.sequencer
+
+    return {
+        "tokens": len(collector.token_map),
+        "snapshots": len(collector.price_snapshots),
+        "books": len(collector.order_books.books),
+        "opportunities": len(collector.detector.opportunities),
+        "market_cache": len(collector.markets.entries),
+        "sequencer": len(sequencer.counters),
+    }
+
+
+async def simulate(args, db_path: str):
+    from app.workers.collector import Collector
+
+    collector = Collector(args.assets, db_path=db_path, record=False)
+    rng = random.Random(7)
+
+    await collector._start_pipeline()
+
+    start = 1_760_000_400 - 1_760_000_400 % WINDOW_INTERVAL
+    windows_per_day = 86_400 // WINDOW_INTERVAL
+    previous: Dict[str, List[str]] = {}
+    next_market_id = 1
+
+    print(f"{'day':>4} {'rss_mb':>8} {'rows':>10} " + " ".join(f"{key:>13}" for key in state_sizes(collector)))
+
+    try:
+        for window_index in range(args.days * windows_per_day):
+            window = start + window_index * WINDOW_INTERVAL
+
+            for asset in collector.assets:
+                up, down, _ = token_ids_for_slug(f"{asset.lower()}-updown-15m-{window}")
+
+                collector._update_local_state({"market_id": next_market_id, "up_token": up, "down_token": down})
+                next_market_id += 1
+
+                base_ms = window * 1000
+
+                for token in (up, down):
+                    await collector.on_message(book_frame(token, base_ms, rng))
+
+                for i in range(args.frames):
+                    ts_ms = base_ms + (i + 1) * WINDOW_INTERVAL * 1000 // (args.frames + 1)
+                    await collector.on_message(price_change_frame([up, down], ts_ms, rng))
+
+                if asset in previous:
+                    collector._retire_tokens(previous[asset])
+
+                previous[asset] = [up, down]
+
+            await asyncio.sleep(0)
+
+            if (window_index + 1) % windows_per_day == 0:
+                # 等寫入端追上再量測，避免把尚未寫出的 buffer 算進去
+                while len(collector.buffer) or (collector.writer and collector.writer.backlog):
+                    await asyncio.sleep(0.01)
+
+                gc.collect()
+
+                rows = collector.writer.written if collector.writer else collector.buffer.flushed
+                sizes = state_sizes(collector)
+                day = (window_index + 1) // windows_per_day
+
+                print(f"{day:>4} {rss_mb():>8.1f} {rows:>10,} " + " ".join(f"{value:>13,}" for value in sizes.values()))
+
+    finally:
+        await collector._stop_pipeline()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模擬一週時段輪替的記憶體用量")
+    parser.add_argument("--assets", nargs="+", default=["BTC", "ETH", "SOL"])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--frames", type=int, default=100, help="每個時段每個資產的 price_change 訊息數")
+    args = parser.parse_args()
+
+    setup_logger(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(simulate(args, os.path.join(tmp, "memory.db")))
+
+    print(f"elapsed {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import List, Tuple
+
+from app.storage.migrate import db_size, migrate_v1_to_v2
+from app.storage.schema import (
+    INSERT_TICK_SQL,
+    MARKETS_DDL,
+    SCHEMA_V1,
+    SCHEMA_V2,
+    TICKS_DDL,
+    TickSequencer,
+    encode_v2,
+)
+
+# 用法: python -m benchmarks.bench_schema --rows 500000 --batch 50
+
+
+def build_records(count: int, markets: int, seed: int = 7) -> List[Tuple]:
+    rng = random.Random(seed)
+    ts = 1760000000000
+    records = []
+
+    for _ in range(count):
+        ts += rng.choice((0, 0, 1, 3, 15, 120))
+
+        records.append((
+            str(ts),
+            rng.randint(1, markets),
+            f"{rng.randint(1, 99) / 100:.2f}",
+            f"{rng.randint(1, 99) / 100:.2f}",
+            f"{rng.uniform(5, 5000):.2f}",
+            f"{rng.uniform(5, 5000):.2f}",
+        ))
+
+    return records
+
+
+def insert_rate(path: str, version: int, records: List[Tuple], batch: int) -> float:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+
+    for statement in MARKETS_DDL + TICKS_DDL[version]:
+        conn.execute(statement)
+
+    conn.commit()
+
+    sequencer = TickSequencer()
+    sql = INSERT_TICK_SQL[version]
+
+    started = time.perf_counter()
+
+    # 與 Collector 相同：每 batch 筆 commit 一次
+    for i in range(0, len(records), batch):
+        chunk = records[i:i + batch]
+
+        if version == SCHEMA_V2:
+            chunk = encode_v2(chunk, sequencer)
+
+        conn.executemany(sql, chunk)
+        conn.commit()
+
+    elapsed = time.perf_counter() - started
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    conn.close()
+
+    return len(records) / elapsed
+
+
+def range_scan(path: str, market_id: int) -> float:
+    conn = sqlite3.connect(path)
+    started = time.perf_counter()
+
+    conn.execute("SELECT count(*), avg(buy_up_price) FROM ticks WHERE market_id = ?", (market_id,)).fetchone()
+
+    elapsed = time.perf_counter() - started
+    conn.close()
+
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ticks v1 / v2 schema 寫入速度與磁碟用量比較")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--markets", type=int, default=96)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    records = build_records(args.rows, args.markets)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        v1_path = os.path.join(tmp, "v1.db")
+        v2_path = os.path.join(tmp, "v2.db")
+        migrated_path = os.path.join(tmp, "migrated.db")
+
+        v1_rate = insert_rate(v1_path, SCHEMA_V1, records, args.batch)
+        v2_rate = insert_rate(v2_path, SCHEMA_V2, records, args.batch)
+
+        report = migrate_v1_to_v2(v1_path, migrated_path)
+
+        print(f"rows={args.rows} markets={args.markets} batch={args.batch}")
+        print(f"{'schema':<10} {'insert rows/s':>14} {'size MB':>9} {'bytes/row':>10} {'scan ms':>9}")
+
+        for name, path, rate in (("v1", v1_path, v1_rate), ("v2", v2_path, v2_rate)):
+            size = db_size(path)
+
+            print(
+                f"{name:<10} {rate:>14,.0f} {size / 1e6:>9.2f} {size / args.rows:>10.1f} "
+                f"{range_scan(path, 1):>9.2f}"
+            )
+
+        print(f"migrate v1->v2: {report['rows_per_sec']:,.0f} rows/s, {report['dst_bytes'] / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 冷啟動時間: 新的 Python 程序從啟動到收到第一則 WebSocket 訊息
+#   lazy:  目前的 Collector (不匯入 py_clob_client、不做認證)
+#   eager: 啟動時先建立已認證的 ClobClient (舊行為: 匯入 + derive creds，無快取)
+# 每次都是全新程序，包含直譯器啟動與所有 import
+# 用法: python -m benchmarks.bench_startup --runs 5
+
+
+def start_standin(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.standin",
+            "--ws-port", str(args.ws_port),
+            "--http-port", str(args.http_port),
+            "--rate", "200",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    if process.stdout.readline().strip() != "READY":
+        process.kill()
+        raise RuntimeError("stand-in 伺服器啟動失敗")
+
+    return process
+
+
+def child(mode: str, spawned_at: float, db_path: str):
+    # 在子程序內執行: 量測 import、初始化與第一則訊息的時間點 (相對於父程序 spawn 的時間)
+    imported_at = time.time()
+
+    from app.core.logger import setup_logger
+    from app.workers.collector import Collector
+
+    setup_logger(level="WARNING")
+
+    if mode == "eager":
+        from app.clients.polymarket import PolymarketClient
+
+        PolymarketClient(creds_path=None).client
+
+    collector = Collector(["BTC"], db_path=db_path, record=False)
+    ready_at = time.time()
+
+    async def run():
+        first_frame = asyncio.get_running_loop().create_future()
+        on_message = collector.on_message
+
+        async def timed_on_message(raw_msg, recv_ns=None):
+            if not first_frame.done():
+                first_frame.set_result(time.time())
+
+            await on_message(raw_msg, recv_ns)
+
+        collector.on_message = timed_on_message
+        task = asyncio.create_task(collector.start())
+
+        first_at = await asyncio.wait_for(first_frame, timeout=30)
+
+        await collector.ws_client.stop()
+        task.cancel()
+
+        try:
+            await task
+
+        except asyncio.CancelledError:
+            pass
+
+        return first_at
+
+    first_at = asyncio.run(run())
+
+    print(json.dumps({
+        "interpreter": imported_at - spawned_at,
+        "init": ready_at - spawned_at,
+        "first_frame": first_at - spawned_at,
+    }))
+
+
+def run_once(mode: str, args, tmp: str, index: int) -> dict:
+    env = dict(
+        os.environ,
+        WS_URL=f"ws://127.0.0.1:{args.ws_port}",
+        GAMMA_URL=f"http://127.0.0.1:{args.http_port}",
+        CLOB_URL=f"http://127.0.0.1:{args.http_port}",
+        PRIVATE_KEY=os.environ.get("PRIVATE_KEY") or f"0x{os.urandom(32).hex()}",
+        EXEC_MODE="off",
+        METRICS_PORT="0",
+    )
+
+    db_path = os.path.join(tmp, f"{mode}-{index}.db")
+
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, str(time.time()), db_path],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        return child(sys.argv[2], float(sys.argv[3]), sys.argv[4])
+
+    parser = argparse.ArgumentParser(description="Collector 冷啟動時間")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ws-port", type=int, default=8805)
+    parser.add_argument("--http-port", type=int, default=8806)
+    args = parser.parse_args()
+
+    standin = start_standin(args)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {
+                mode: [run_once(mode, args, tmp, i) for i in range(args.runs)]
+                for mode in ("eager", "lazy")
+            }
+
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    print(f"runs={args.runs} (median, seconds since process spawn)")
+    print(f"{'mode':<8} {'interpreter':>12} {'init':>8} {'first_frame':>12}")
+
+    for mode, runs in results.items():
+        row = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+        print(f"{mode:<8} {row['interpreter']:>12.3f} {row['init']:>8.3f} {row['first_frame']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
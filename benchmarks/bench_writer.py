@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+from app.storage.schema import SCHEMA_V1, SCHEMA_V2
+from app.storage.sqlite import SQLiteClient
+from app.storage.writer import TickWriter
+from benchmarks.bench_schema import build_records
+
+# 寫入路徑比較: aiosqlite 每 batch commit (舊路徑) vs 專屬寫入執行緒 (group commit)
+# 同時量測 event loop 最大延遲，確認寫入不會卡住 loop
+# 用法: python -m benchmarks.bench_writer --rows 200000 --batch 50 --schema 2
+
+
+async def loop_lag_probe(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+
+    return worst * 1000
+
+
+async def run_async(path: str, version: int, records: List[Tuple], batch: int) -> Tuple[float, float]:
+    db = SQLiteClient(path, schema_version=version)
+    await db.connect()
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop))
+
+    started = time.perf_counter()
+
+    for i in range(0, len(records), batch):
+        await db.save_ticks_batch(records[i:i + batch])
+
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    lag = await probe
+    await db.close()
+
+    return len(records) / elapsed, lag
+
+
+async def run_thread(path: str, version: int, records: List[Tuple], batch: int) -> Tuple[float, float]:
+    db = SQLiteClient(path, schema_version=version)
+    await db.connect()
+
+    writer = TickWriter(path, schema_version=version)
+    writer.start()
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop))
+
+    started = time.perf_counter()
+
+    # 與 Collector 相同: 每 batch 筆交付一次，交付之間讓出 loop
+    for i in range(0, len(records), batch):
+        writer.submit(records[i:i + batch])
+
+        if i % (batch * 20) == 0:
+            await asyncio.sleep(0)
+
+    await asyncio.to_thread(writer.stop)
+
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    lag = await probe
+    await db.close()
+
+    return len(records) / elapsed, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ticks 寫入路徑吞吐量比較")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--markets", type=int, default=96)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--schema", type=int, choices=(SCHEMA_V1, SCHEMA_V2), default=SCHEMA_V1)
+    args = parser.parse_args()
+
+    records = build_records(args.rows, args.markets)
+
+    print(f"rows={args.rows} markets={args.markets} batch={args.batch} schema=v{args.schema}")
+    print(f"{'writer':<10} {'rows/s':>12} {'max loop lag ms':>16}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, runner in (("async", run_async), ("thread", run_thread)):
+            rate, lag = asyncio.run(runner(os.path.join(tmp, f"{name}.db"), args.schema, records, args.batch))
+            print(f"{name:<10} {rate:>12,.0f} {lag:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from app.config import settings
+from app.core.logger import setup_logger
+
+# 斷線情境: stand-in 定期切斷連線並短暫拒絕重連，確認
+#   1. 第一次重連立即發生、之後指數退避
+#   2. 重連後以 REST /books 補齊 order book，且 ticks 持續寫入
+#   3. 每次中斷都寫入 gaps 表
+# 用法: python -m benchmarks.scenario_reconnect --drop-every 4 --down-for 1 --duration 20
+
+
+def start_standin(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.standin",
+            "--ws-port", str(args.ws_port),
+            "--http-port", str(args.http_port),
+            "--rate", str(args.rate),
+            "--drop-every", str(args.drop_every),
+            "--down-for", str(args.down_for),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    if process.stdout.readline().strip() != "READY":
+        process.kill()
+        raise RuntimeError("stand-in 伺服器啟動失敗")
+
+    return process
+
+
+async def run(args, db_path: str) -> dict:
+    from app.core.metrics import WS_RECONNECTS
+    from app.workers.collector import Collector
+
+    collector = Collector(args.assets, db_path=db_path, record=False)
+
+    resynced = 0
+    book_source = collector.ws_client.book_source
+
+    async def counting_book_source(tokens):
+        nonlocal resynced
+
+        books = await book_source(tokens)
+        resynced += len(books)
+
+        return books
+
+    collector.ws_client.book_source = counting_book_source
+
+    task = asyncio.create_task(collector.start())
+    await asyncio.sleep(args.duration)
+
+    await collector.ws_client.stop()
+    task.cancel()
+
+    try:
+        await task
+
+    except asyncio.CancelledError:
+        pass
+
+    return {"reconnects": WS_RECONNECTS.labels().value, "resynced_books": resynced}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 斷線重連與資料缺口情境")
+    parser.add_argument("--assets", nargs="+", default=["BTC", "ETH"])
+    parser.add_argument("--rate", type=float, default=200)
+    parser.add_argument("--drop-every", type=float, default=4)
+    parser.add_argument("--down-for", type=float, default=1)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--ws-port", type=int, default=8775)
+    parser.add_argument("--http-port", type=int, default=8776)
+    args = parser.parse_args()
+
+    setup_logger(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    settings.WS_URL = f"ws://127.0.0.1:{args.ws_port}"
+    settings.GAMMA_URL = f"http://127.0.0.1:{args.http_port}"
+    settings.CLOB_URL = f"http://127.0.0.1:{args.http_port}"
+
+    standin = start_standin(args)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "scenario.db")
+            result = asyncio.run(run(args, db_path))
+
+            conn = sqlite3.connect(db_path)
+            gaps = conn.execute("SELECT start_ms, end_ms, market_ids FROM gaps ORDER BY start_ms").fetchall()
+            last_tick = conn.execute("SELECT MAX(CAST(ts AS INTEGER)) FROM ticks").fetchone()[0] or 0
+            conn.close()
+
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    durations = [end - start for start, end, _ in gaps]
+
+    print(f"drop_every={args.drop_every:g}s down_for={args.down_for:g}s duration={args.duration:g}s")
+    print(f"{'reconnects':<20} {result['reconnects']}")
+    print(f"{'gaps_recorded':<20} {len(gaps)}")
+    print(f"{'resynced_books':<20} {result['resynced_books']}")
+
+    if durations:
+        print(f"{'gap_mean_ms':<20} {sum(durations) / len(durations):,.0f}")
+        print(f"{'gap_max_ms':<20} {max(durations):,.0f}")
+
+    # 最後一個缺口結束後仍有 tick 寫入，代表重連後資料流恢復
+    recovered = bool(gaps) and last_tick > gaps[-1][1]
+
+    print(f"{'recovered':<20} {'yes' if recovered else 'no'}")
+    sys.exit(0 if recovered and result["resynced_books"] > 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Set
+
+import websockets
+
+# 本機版 Polymarket: market channel WebSocket + Gamma / CLOB (認證、/books、下單) HTTP 端點
+# 用法: python -m benchmarks.standin --ws-port 8765 --http-port 8766 --rate 2000 --depth 20
+# 斷線情境: --drop-every 5 --down-for 1 (每條連線 5 秒後被切斷，之後 1 秒內拒絕新連線)
+# 下單: POST /order 一律回應 matched，--order-latency-ms 模擬撮合延遲
+
+
+def token_ids_for_slug(slug: str):
+    digest = hashlib.sha256(slug.encode()).hexdigest()
+
+    up = str(int(digest[:30], 16))
+    down = str(int(digest[30:60], 16))
+
+    return up, down, f"0x{digest}"
+
+
+class MarketFeed:
+    def __init__(
+        self, rate: float, depth: int, book_ratio: float, seed: int = 7, drop_every: float = 0, down_for: float = 0
+    ):
+        self.rate = rate
+        self.depth = depth
+        self.book_ratio = book_ratio
+        self.rng = random.Random(seed)
+
+        self.drop_every = drop_every
+        self.down_for = down_for
+        self.down_until = 0.0
+
+        # token -> condition id (market)
+        self.markets: Dict[str, str] = {}
+
+        self.sent = 0
+
+    def register_slug(self, slug: str):
+        up, down, market = token_ids_for_slug(slug)
+
+        self.markets[up] = market
+        self.markets[down] = market
+
+        return up, down
+
+    def book(self, token: str) -> dict:
+        rng = self.rng
+        mid = rng.randint(20, 80)
+
+        bids = [{"price": f"{(mid - i) / 100:.2f}", "size": f"{rng.uniform(5, 5000):.2f}"}
+                for i in range(1, self.depth + 1) if mid - i > 0]
+        asks = [{"price": f"{(mid + i) / 100:.2f}", "size": f"{rng.uniform(5, 5000):.2f}"}
+                for i in range(0, self.depth) if mid + i < 100]
+
+        return {
+            "event_type": "book",
+            "asset_id": token,
+            "market": self.markets.get(token, f"0x{token[:16]}"),
+            "bids": list(reversed(bids)),
+            "asks": list(reversed(asks)),
+            "timestamp": str(int(time.time() * 1000)),
+            "hash": "0x0",
+        }
+
+    def price_change(self, token: str) -> dict:
+        rng = self.rng
+        size = 0 if rng.random() < 0.2 else rng.uniform(5, 500)
+
+        return {
+            "event_type": "price_change",
+            "market": self.markets.get(token, f"0x{token[:16]}"),
+            "price_changes": [{
+                "asset_id": token,
+                "price": f"{rng.randint(1, 99) / 100:.2f}",
+                "size": f"{size:.2f}",
+                "side": rng.choice(("BUY", "SELL")),
+                "hash": "0x0",
+            }],
+            "timestamp": str(int(time.time() * 1000)),
+        }
+
+    def next_event(self, tokens) -> dict:
+        token = self.rng.choice(tokens)
+
+        if self.rng.random() < self.book_ratio:
+            return self.book(token)
+
+        return self.price_change(token)
+
+
+class StandInHTTPHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才能 keep-alive，下單路徑依賴連線重用
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    feed: MarketFeed = None
+    order_latency: float = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/markets/slug/"):
+            slug = self.path.rsplit("/", 1)[-1]
+            up, down = self.feed.register_slug(slug)
+
+            return self._send_json({
+                "slug": slug,
+                "question": f"Stand-in {slug}",
+                "outcomes": json.dumps(["Up", "Down"]),
+                "clobTokenIds": json.dumps([up, down]),
+            })
+
+        if self.path.startswith("/auth/derive-api-key"):
+            return self._send_json({"apiKey": "standin", "secret": "c3RhbmRpbg==", "passphrase": "standin"})
+
+        if self.path.startswith("/tick-size"):
+            return self._send_json({"minimum_tick_size": 0.01})
+
+        if self.path.startswith("/neg-risk"):
+            return self._send_json({"neg_risk": False})
+
+        if self.path.startswith("/fee-rate"):
+            return self._send_json({"base_fee": 0})
+
+        if self.path.startswith("/time"):
+            return self._send_json(int(time.time()))
+
+        self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if self.path.startswith("/auth/api-key"):
+            return self._send_json({"apiKey": "standin", "secret": "c3RhbmRpbg==", "passphrase": "standin"})
+
+        if self.path.startswith("/books"):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            books = []
+
+            # REST 回傳的 book 沒有 event_type 欄位
+            for item in json.loads(body or b"[]"):
+                book = self.feed.book(item["token_id"])
+                book.pop("event_type")
+                books.append(book)
+
+            return self._send_json(books)
+
+        if self.path.startswith("/order"):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            if self.order_latency:
+                time.sleep(self.order_latency)
+
+            # /orders 為批次下單，回傳與 /order 相同格式的陣列
+            orders = body if isinstance(body, list) else [body]
+            results = [
+                {
+                    "success": True,
+                    "errorMsg": "",
+                    "orderID": f"0x{hashlib.sha256(json.dumps(order).encode()).hexdigest()}",
+                    "status": "matched",
+                }
+                for order in orders
+            ]
+
+            return self._send_json(results if isinstance(body, list) else results[0])
+
+        self._send_json({"error": "not found"}, 404)
+
+
+async def handle_connection(websocket, feed: MarketFeed):
+    subscribed: Set[str] = set()
+    lock = asyncio.Lock()
+
+    if time.time() < feed.down_until:
+        await websocket.close(code=1013, reason="stand-in down")
+        return
+
+    async def producer():
+        interval = 0.001
+        started = time.perf_counter()
+        produced = 0
+
+        while True:
+            await asyncio.sleep(interval)
+
+            if not subscribed:
+                started = time.perf_counter()
+                produced = 0
+                continue
+
+            due = int((time.perf_counter() - started) * feed.rate) - produced
+            tokens = list(subscribed)
+
+            async with lock:
+                for _ in range(due):
+                    await websocket.send(json.dumps(feed.next_event(tokens)))
+
+            produced += due
+            feed.sent += due
+
+    async def dropper():
+        # 模擬伺服器端異常斷線
+        await asyncio.sleep(feed.drop_every)
+
+        feed.down_until = time.time() + feed.down_for
+        await websocket.close(code=1011, reason="stand-in drop")
+
+    producer_task = asyncio.create_task(producer())
+    dropper_task = asyncio.create_task(dropper()) if feed.drop_every > 0 else None
+
+    try:
+        async for message in websocket:
+            try:
+                data = json.loads(message)
+
+            except ValueError:
+                continue
+
+            if data.get("type") == "ping":
+                await websocket.send("PONG")
+                continue
+
+            asset_ids = data.get("assets_ids") or []
+
+            if data.get("operation") == "unsubscribe":
+                subscribed.difference_update(asset_ids)
+                continue
+
+            new_tokens = [token for token in asset_ids if token not in subscribed]
+            subscribed.update(asset_ids)
+
+            # 與正式環境相同：訂閱後先送一批 book 快照 (list)
+            if new_tokens:
+                async with lock:
+                    await websocket.send(json.dumps([feed.book(token) for token in new_tokens]))
+
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+    finally:
+        producer_task.cancel()
+
+        if dropper_task:
+            dropper_task.cancel()
+
+
+def serve_http(port: int, feed: MarketFeed) -> ThreadingHTTPServer:
+    StandInHTTPHandler.feed = feed
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHTTPHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+async def main_async(args):
+    feed = MarketFeed(
+        args.rate, args.depth, args.book_ratio, drop_every=args.drop_every, down_for=args.down_for)
+    StandInHTTPHandler.order_latency = args.order_latency_ms / 1000
+    serve_http(args.http_port, feed)
+
+    async with websockets.serve(lambda ws, *_: handle_connection(ws, feed), "127.0.0.1", args.ws_port, max_size=None):
+        print("READY", flush=True)
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本機 Polymarket market channel 模擬伺服器")
+    parser.add_argument("--ws-port", type=int, default=8765)
+    parser.add_argument("--http-port", type=int, default=8766)
+    parser.add_argument("--rate", type=float, default=1000, help="每秒送出的事件數 (每條連線)")
+    parser.add_argument("--depth", type=int, default=20, help="book 事件每邊的檔數")
+    parser.add_argument("--book-ratio", type=float, default=0.3, help="book 事件佔比，其餘為 price_change")
+    parser.add_argument("--drop-every", type=float, default=0, help="每條連線存活秒數後被切斷 (0 = 不切斷)")
+    parser.add_argument("--down-for", type=float, default=0, help="切斷後拒絕新連線的秒數")
+    parser.add_argument("--order-latency-ms", type=float, default=0, help="POST /order 的模擬回應延遲")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main_async(args))
+
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
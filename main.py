@@ -6,6 +6,10 @@ import json
 import threading
 from datetime import datetime
 
+from app.clients.market_decoder import BookEvent, MarketMessageDecoder, PriceChangeEvent
+from app.orderbook.book import OrderBookManager
+from app.strategy.arbitrage import ArbitrageDetector
+
 class PolyMarketClient:
     def __init__(self, asset: str):
         self.asset = asset.lower()
@@ -16,6 +20,11 @@ class PolyMarketClient:
         self.best_buy_up = {"price": 0, "size": 0}
         self.best_buy_down = {"price": 0, "size": 0}
 
+        self.order_books = OrderBookManager()
+        self.decoder = MarketMessageDecoder()
+        self.detector = ArbitrageDetector(self.order_books)
+        self.detector.add_handler(self._print_arbitrage)
+
         self.market_start_timestamp = 0
         self.current_timestamp = 0
 
@@ -53,35 +62,49 @@ class PolyMarketClient:
         token_ids = {"up": up_token_id, "down": down_token_id}
 
         self.token_ids = token_ids
+        self.decoder.subscribed = set(token_ids.values())
+        self.detector.register_market(self.market_start_timestamp, up_token_id, down_token_id)
 
         return token_ids
     
-    def _update_best_up_down(self, data: dict):
-        token_id = data.get("asset_id")
+    def _print_arbitrage(self, opp):
+        print(f"ARB Up: {opp.up_ask: .3f} + Down: {opp.down_ask: .3f} = {opp.cost: .4f} | size {opp.size: .2f} | {opp.latency_ns / 1000: .0f} us")
+
+    def _update_best_up_down(self, event, recv_ns: int):
+        if isinstance(event, BookEvent):
+            token_id = self.order_books.apply_book(event)
+
+            # 過期的快照不會套用
+            if token_id is None:
+                return
 
-        self.current_timestamp = int(data.get("timestamp")) / 1000
-        
-        asks = data.get("asks")
+            touched = {token_id}
 
-        if not asks:
-            print("No asks data available.")
+        elif isinstance(event, PriceChangeEvent):
+            touched = self.order_books.apply_price_changes(event)
+
+        else:
             return
 
-        if token_id == self.token_ids["up"]:
-            best_buy_up = min(asks, key=lambda x: float(x["price"]))
+        if event.timestamp is not None:
+            self.current_timestamp = int(event.timestamp) / 1000
+
+        for token_id in touched:
+            best_ask = self.order_books.get(token_id).best_ask()
 
-            price = float(best_buy_up["price"])
-            size = float(best_buy_up["size"])
+            if best_ask is None:
+                print("No asks data available.")
+                continue
 
-            self.best_buy_up = {"price": price, "size": size}
+            price, size = best_ask
 
-        elif token_id == self.token_ids["down"]:
-            best_buy_down = min(asks, key=lambda x: float(x["price"]))
+            if token_id == self.token_ids["up"]:
+                self.best_buy_up = {"price": price, "size": size}
 
-            price = float(best_buy_down["price"])
-            size = float(best_buy_down["size"])
+            elif token_id == self.token_ids["down"]:
+                self.best_buy_down = {"price": price, "size": size}
 
-            self.best_buy_down = {"price": price, "size": size}
+        self.detector.on_book_update(self.market_start_timestamp, recv_ns, event.timestamp)
 
         time = datetime.fromtimestamp(self.current_timestamp)
         formatted_time = time.strftime('%Y-%m-%d %H:%M:%S')
@@ -105,13 +128,10 @@ class PolyMarketClient:
 
                 try:
                     message = await asyncio.wait_for(ws.recv(), timeout=5)
-                    data = json.loads(message)
-
-                    if isinstance(data, list):
-                        continue
+                    recv_ns = time.perf_counter_ns()
 
-                    if data.get("event_type") == "book":
-                        self._update_best_up_down(data)
+                    for event in self.decoder.decode(message):
+                        self._update_best_up_down(event, recv_ns)
 
                 except asyncio.TimeoutError:
                     print("No message received in the last 5 seconds, sending ping...")
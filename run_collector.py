@@ -1,16 +1,29 @@
 import asyncio
 import logging
 import argparse
+import signal
+from typing import List
+from app.config import settings
 from app.workers.collector import Collector
 from app.core.logger import setup_logger 
+from app.core.profiling import profiler
 
 setup_logger()
 logger = logging.getLogger("Main")
 
-async def main(asset: str):
-    logger.info(f"🔥 準備啟動 Collector: {asset}")
+async def main(assets: List[str], profile: bool = False):
+    logger.info(f"🔥 準備啟動 Collector: {', '.join(assets)}")
+
+    # run_collector.sh 以 SIGTERM 停止 (背景程序忽略 SIGINT)，取消主任務讓 Collector 寫完剩餘資料再結束
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    if profile:
+        profiler.enable()
+
+        # kill -USR1 <pid> 可在不停機的情況下輸出目前的 profiling 結果
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, profiler.dump)
     
-    collector = Collector(asset)
+    collector = Collector(assets)
     
     try:
         await collector.start()
@@ -21,19 +34,31 @@ async def main(asset: str):
     except Exception as e:
         logger.error(f"❌ 程式發生錯誤: {e}", exc_info=True)
 
+    finally:
+        profiler.shutdown()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="啟動 Polymarket 資料收集器")
     parser.add_argument(
-        "--asset", 
-        type=str, 
-        default="BTC", 
-        help="指定要監控的資產 (例如: BTC, ETH, SOL)"
+        "--assets",
+        "--asset",
+        dest="assets",
+        type=str,
+        nargs="+",
+        default=["BTC", "ETH", "SOL"],
+        help="指定要監控的資產，可一次指定多個 (例如: BTC ETH SOL)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=settings.PROFILE,
+        help="開啟 profiling，結束時 (或收到 SIGUSR1) 輸出各階段延遲與 folded stacks"
     )
     
     args = parser.parse_args()
 
     try:
-        asyncio.run(main(asset=args.asset))
+        asyncio.run(main(assets=args.assets, profile=args.profile))
 
     except KeyboardInterrupt:
         logger.info("👋 使用者手動停止 (KeyboardInterrupt)")
\ No newline at end of file
@@ -2,37 +2,32 @@
 
 ASSETS=("BTC" "ETH" "SOL")
 
-pids=()
+echo "🚀 [System] 正在啟動 Collector (${ASSETS[*]})..."
 
-echo "🚀 [System] 正在啟動所有 Collector..."
+# 單一程序同時處理所有資產，共用 WebSocket 連線與 DB 寫入
+python run_collector.py --assets "${ASSETS[@]}" &
 
-for asset in "${ASSETS[@]}"; do
-    python run_collector.py --asset "$asset" &
-    
-    pids+=($!)
-    echo "   ✅ 啟動 $asset Collector (PID: $!)"
-    
-    sleep 1
-done
+pid=$!
+echo "   ✅ 啟動 Collector (PID: $pid)"
 
 echo "---------------------------------------------------"
-echo "🎉 所有 Collector 已在背景執行！"
-echo "🛑 按下 Ctrl+C 可以一次停止所有程式"
+echo "🎉 Collector 已在背景執行！"
+echo "🛑 按下 Ctrl+C 可以停止程式"
 echo "---------------------------------------------------"
 
 cleanup() {
     echo ""
-    echo "🛑 [System] 正在關閉所有 Collector..."
-    for pid in "${pids[@]}"; do
-        if kill -0 "$pid" 2>/dev/null; then
-            kill "$pid"
-            echo "   已停止 PID: $pid"
-        fi
-    done
+    echo "🛑 [System] 正在關閉 Collector..."
+    if kill -0 "$pid" 2>/dev/null; then
+        kill "$pid"
+        # 等待 Collector 寫完剩餘資料
+        wait "$pid"
+        echo "   已停止 PID: $pid"
+    fi
     echo "結束運行"
     exit 0
 }
 
 trap cleanup SIGINT SIGTERM
 
-wait
\ No newline at end of file
+wait
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import argparse
+from app.config import settings
+from app.workers.collector import Collector
+from app.core.profiling import profiler
+from app.replay.engine import ReplayEngine, find_feed_files
+from app.core.logger import setup_logger
+
+setup_logger()
+logger = logging.getLogger("Replay")
+
+async def main(source: str, speed: float, db_path: str, profile: bool = False):
+    files = find_feed_files(source)
+
+    if not files:
+        logger.error(f"❌ 找不到錄製檔: {source}")
+        return
+
+    collector = Collector([], db_path=db_path, record=False)
+    engine = ReplayEngine(files, speed=speed)
+
+    if profile:
+        profiler.enable()
+
+    try:
+        await collector.replay(engine)
+
+    finally:
+        profiler.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重播錄製的 Polymarket 原始訊息")
+    parser.add_argument(
+        "source",
+        type=str,
+        nargs="?",
+        default="data/feeds",
+        help="錄製檔或資料夾 (預設: data/feeds)"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="重播倍速，1 = 原始速度，0 = 全速 (預設: 0)"
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        default="data/replay.db",
+        help="重播寫入的 SQLite 路徑 (預設: data/replay.db)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=settings.PROFILE,
+        help="開啟 profiling，結束時輸出各階段延遲與 folded stacks"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args.source, args.speed, args.db, args.profile))
+
+    except KeyboardInterrupt:
+        logger.info("👋 使用者手動停止 (KeyboardInterrupt)")